@@ -0,0 +1,99 @@
+"""Time the prelude's definitions on a fixed set of programs.
+
+Run from the project root with
+
+python -m bench
+
+The results can be saved as JSON with --output, and later runs can be
+checked against such a file with --compare, which reports the cases
+that got slower, hungrier or longer than before, and exits with a
+non-zero status if there are any. With --versus, the cases are run
+again with another strategy, and the two are compared.
+
+"""
+
+import argparse
+import json
+import sys
+
+import lbd.evaluate as evl
+from bench.cases import CASES
+from bench.runner import compare, run_all, versus
+
+ap = argparse.ArgumentParser(
+    prog="python -m bench",
+    description="""Benchmark reduction on the prelude's definitions."""
+)
+
+ap.add_argument("-o", "--output", help="""Write the results, as JSON, to
+this file.""")
+
+ap.add_argument("-c", "--compare", metavar="BASELINE", help="""Compare the
+results against those saved in BASELINE.""")
+
+ap.add_argument("-s", "--strategy", default=evl.Strategy.NORMAL,
+                type=evl.Strategy, choices=list(evl.Strategy), help="""The
+reduction strategy to use.""")
+
+ap.add_argument("-r", "--repeat", type=int, default=5, help="""The number
+of timed runs per case; the best one counts.""")
+
+ap.add_argument("-t", "--threshold", type=float, default=0.25, help="""How
+much slower or hungrier a case may get, as a fraction, before it's
+flagged.""")
+
+ap.add_argument("-g", "--group", action="append", help="""Only run the
+cases for this definition; may be given more than once.""")
+
+ap.add_argument("-v", "--versus", type=evl.Strategy, choices=list(evl.Strategy),
+                help="""Also run the cases with this strategy, and show how
+much faster the main one is on each.""")
+
+ap.add_argument("--timeout", type=float, default=60, help="""Give up on a
+case after this many seconds.""")
+
+
+def main():
+    args = ap.parse_args()
+    cases = CASES
+
+    if args.group:
+        cases = [case for case in cases if case.group in args.group]
+
+    report = run_all(cases, args.strategy, args.repeat, args.timeout)
+
+    if args.versus is not None:
+        print(f"\nAgainst {args.versus}:")
+        other = run_all(cases, args.versus, args.repeat, args.timeout)
+
+        print(f"\nSpeedup of {args.strategy} over {args.versus}:")
+
+        for line in versus(report, other):
+            print(f"  {line}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is None:
+        return
+
+    with open(args.compare, "r") as f:
+        baseline = json.load(f)
+
+    regressions = compare(report, baseline, args.threshold)
+
+    if not regressions:
+        print(f"\nNo regressions against {args.compare}.")
+        return
+
+    print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+
+    for regression in regressions:
+        print(f"  {regression}")
+
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
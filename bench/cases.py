@@ -0,0 +1,84 @@
+"""The programs timed by the benchmark suite."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class Case():
+    """A program to time, along with the prelude it needs.
+
+    GROUP names the definition being exercised, so that the cases for
+    one definition at different input sizes can be told apart from
+    the rest.
+
+    """
+
+    group: str
+    program: str
+    prelude: str = "prelude"
+
+    @property
+    def key(self) -> str:
+        return f"{self.prelude}: {self.program}"
+
+
+def _pred_chain(length: int, numeral: str) -> str:
+    """Return LENGTH applications of 'pred' to NUMERAL."""
+
+    return "(pred " * length + numeral + ")" * length
+
+
+def _succ_chain(length: int) -> str:
+    """Return LENGTH applications of 'succ' to 'one'.
+
+    This is the only way to get at larger numbers with the lite
+    prelude, which stops at 'one'.
+
+    """
+
+    return "(succ " * length + "one" + ")" * length
+
+
+# Under normal order, the largest case in each group takes a second or
+# two, and one size further along most of them take minutes. Other
+# strategies get through all of them in milliseconds, which is why
+# the runner reduces each program as often as it takes to fill
+# MIN_SECONDS, rather than timing single reductions.
+CASES = [
+    Case("add", "(add five five)"),
+    Case("add", "(add ten ten)"),
+    Case("add", "(add (sub ten five) (add five five))"),
+
+    Case("sub", "(sub ten five)"),
+    Case("sub", "(sub ten ten)"),
+    Case("sub", "(sub (add ten five) ten)"),
+
+    Case("mult", "(mult three two)"),
+    Case("mult", "(mult three three)"),
+    Case("mult", "(mult four three)"),
+
+    Case("div", "(div eight four)"),
+    Case("div", "(div ten two)"),
+    Case("div", "(div (add ten two) three)"),
+
+    Case("equal", "(equal five five)"),
+    Case("equal", "(equal ten ten)"),
+    Case("equal", "(equal (add five five) ten)"),
+
+    Case("summation", "(summation three)"),
+    Case("summation", "(summation four)"),
+
+    Case("sq", "(sq three)"),
+    Case("sq", "(sq (add two one))"),
+
+    Case("fun_sum", "(fun_sum sq three)"),
+    Case("fun_sum", "(fun_sum sq (sub five two))"),
+
+    Case("pred", _pred_chain(5, "ten")),
+    Case("pred", _pred_chain(10, "ten")),
+    Case("pred", _pred_chain(10, "(add five five)")),
+
+    Case("pred", _pred_chain(5, _succ_chain(5)), "prelude_lite"),
+    Case("pred", _pred_chain(10, _succ_chain(10)), "prelude_lite"),
+    Case("pred", _pred_chain(15, _succ_chain(15)), "prelude_lite"),
+]
@@ -0,0 +1,103 @@
+"""Time loading a large library, serially and with worker processes.
+
+Run from the project root with
+
+python -m bench.load
+
+The library is the prelude followed by --definitions generated ones,
+each a few hundred tokens long, written to a temporary file. It's
+loaded into an empty gamma serially, and then with each number of
+workers given. Only parsing is spread across the workers; decoding
+what comes back, renumbering its globals and evaluating it are still
+done one chunk after another by the loading process, so this only
+gets faster when parsing is most of the work.
+
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import lbd.gamma as g
+import load
+
+PRELUDE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "prelude")
+
+ap = argparse.ArgumentParser(
+    prog="python -m bench.load",
+    description="""Benchmark loading a large library."""
+)
+
+ap.add_argument("-d", "--definitions", type=int, default=2000, help="""The
+number of definitions to generate.""")
+
+ap.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 2, 4],
+                help="""The numbers of workers to try.""")
+
+ap.add_argument("-r", "--repeat", type=int, default=3, help="""The number
+of timed loads for each number of workers.""")
+
+
+def library(count: int) -> str:
+    """Return COUNT definitions, each of them long."""
+
+    lines = []
+
+    for i in range(count):
+        # A long body that's cheap to evaluate: assigning it only
+        # stores it.
+        body = " ".join(f"(pair x{j} (succ y{j}))" for j in range(8))
+        params = " ".join(f"x{j} y{j}" for j in range(8))
+        lines.append(f"def generated{i} {params} := (list {body});")
+
+    return "\n".join(lines) + "\n"
+
+
+def time_loads(filenames: list[str], workers: int | None,
+               repeat: int) -> list[float]:
+    """Load FILENAMES REPEAT times, returning the time each load took."""
+
+    times = []
+
+    for _ in range(repeat):
+        g.clear_gamma()
+        load.forget()
+
+        start = time.perf_counter()
+        err = load.load(filenames, workers=workers)
+        times.append(time.perf_counter() - start)
+
+        if err is not None:
+            raise RuntimeError(str(err))
+
+    return times
+
+
+def report(name: str, times: list[float]) -> None:
+    print(f"{name:>12}: best {min(times) * 1000:8.1f} ms, "
+          f"median {statistics.median(times) * 1000:8.1f} ms")
+
+
+def main():
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        generated = os.path.join(directory, "generated")
+
+        with open(generated, "w") as f:
+            f.write(library(args.definitions))
+
+        filenames = [PRELUDE, generated]
+
+        report("serial", time_loads(filenames, None, args.repeat))
+
+        for workers in args.workers:
+            report(f"{workers} workers",
+                   time_loads(filenames, workers, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Time strong normalization spread across worker processes.
+
+Run from the project root with
+
+python -m bench.parallel
+
+The program is normalized as 'beta_reduce' does in strong mode, and
+then by 'parallel_reduce' with each number of workers given, which
+should get faster as workers are added, up to the number of arguments
+there are to hand out. Each parallel run after the first reuses the
+pool of the one before; the time taken to start the pool is reported
+separately, as the first run. The workers keep what they cache from
+one run to the next, as does the caller, in gamma, for the serial runs.
+
+The default program applies a variable to several arguments, each
+taking a while to normalize. Arguments smaller than --threshold nodes
+are normalized in place, which for these arguments (whose terms are
+small, though their normal forms take work to reach) would leave
+nothing to the workers; hence the default of 1.
+
+"""
+
+import argparse
+import os
+import statistics
+import time
+from collections.abc import Callable
+
+import lbd.beta as beta
+import lbd.evaluate as evl
+import lbd.parallel as parallel
+import lbd.term as term
+import lbd.tokenize as tkz
+from lbd.error import LambdaError
+from load import load
+
+PRELUDE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "prelude")
+
+PROGRAM = ("\\x.(x (mult three three) (mult ten two) (mult nine two) "
+           "(mult eight two))")
+
+ap = argparse.ArgumentParser(
+    prog="python -m bench.parallel",
+    description="""Benchmark strong normalization across worker
+processes."""
+)
+
+ap.add_argument("-p", "--program", default=PROGRAM, help="""The program to
+normalize, against the prelude.""")
+
+ap.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 2, 4],
+                help="""The numbers of workers to try.""")
+
+ap.add_argument("-t", "--threshold", type=int, default=1, help="""The size
+of the smallest argument handed to a worker.""")
+
+ap.add_argument("-r", "--repeat", type=int, default=3, help="""The number
+of timed runs for each number of workers.""")
+
+
+def report(name: str, times: list[float]) -> None:
+    print(f"{name:>16}: best {min(times) * 1000:8.1f} ms, "
+          f"median {statistics.median(times) * 1000:8.1f} ms")
+
+
+def time_runs(run: Callable[[], term.AST], repeat: int) -> list[float]:
+    """Call RUN REPEAT times, returning the time each call took."""
+
+    times = []
+
+    for _ in range(repeat):
+        beta.clear_contractions()
+
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main():
+    args = ap.parse_args()
+
+    err = load([PRELUDE])
+
+    if err is not None:
+        raise RuntimeError(f"Couldn't load {PRELUDE}:\n{err}")
+
+    tokens = tkz.tokenize(args.program)
+    ast = tokens if isinstance(tokens, LambdaError) else evl.parse_tokens(tokens)
+
+    if isinstance(ast, LambdaError):
+        raise SystemExit(str(ast))
+
+    report("serial", time_runs(lambda: beta.beta_reduce(ast, strong=True),
+                               args.repeat))
+
+    for workers in args.workers:
+        def run() -> term.AST:
+            return parallel.parallel_reduce(ast, workers, args.threshold)
+
+        parallel.close_pool()
+
+        report(f"{workers} first", time_runs(run, 1))
+        report(f"{workers} reused", time_runs(run, args.repeat))
+
+    parallel.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Run benchmark cases, and compare their results with a baseline."""
+
+import gc
+import multiprocessing
+import platform
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+import lbd.beta as beta
+import lbd.evaluate as evl
+import lbd.gamma as g
+from bench.cases import Case
+from lbd.error import LambdaError
+from lbd.limits import Limits
+from lbd.stats import Stats
+from load import load
+
+
+# A run reduces its program as many times as it takes to fill this many
+# seconds, since timer noise would swamp a reduction that's over in a
+# millisecond, and a --compare threshold of 25% along with it.
+MIN_SECONDS = 0.1
+
+
+@dataclass
+class Result():
+    """The measurements taken for a single case.
+
+    SECONDS is the best time per reduction over all the runs, STEPS
+    the number of steps in one reduction, and PEAK_BYTES the most
+    memory allocated at once while reducing.
+
+    If the case failed, for example by running out of time, ERROR
+    says why, and the measurements are meaningless.
+
+    """
+
+    key: str
+    group: str
+    seconds: float
+    steps: int
+    peak_bytes: int
+    error: str | None = None
+
+
+def _fresh_start(prelude: str) -> None:
+    """Set up a clean interpreter, with only PRELUDE loaded.
+
+    Reducing a program writes the results back into the definitions it
+    used, and leaves contractions behind to be looked up, both of which
+    would make every run after the first one faster.
+
+    """
+
+    g.clear_gamma()
+    beta.clear_contractions()
+    gc.collect()
+
+    err = load([prelude])
+
+    if err is not None:
+        raise RuntimeError(f"Couldn't load {prelude}:\n{err}")
+
+
+def run_case(case: Case,
+             strategy: evl.Strategy,
+             repeat: int,
+             timeout: float) -> Result:
+    """Time CASE's program over REPEAT runs, plus once more for memory.
+
+    Each run reduces the program at least once, and as often as needed
+    to take MIN_SECONDS, starting from the freshly loaded prelude every
+    time; its time is the average over those reductions.
+
+    """
+
+    limits = Limits(seconds=timeout)
+    best = float("inf")
+    stats = Stats()
+
+    for _ in range(repeat):
+        _fresh_start(case.prelude)
+        symbols = g.snapshot()
+        elapsed = 0.0
+        count = 0
+
+        while elapsed < MIN_SECONDS:
+            # Restoring the snapshot is much quicker than loading the
+            # prelude again, and undoes the same changes.
+            g.restore(symbols)
+            beta.clear_contractions()
+            stats = Stats()
+
+            start = time.perf_counter()
+            ast = evl.eval_raw_term(case.program, strategy=strategy,
+                                    limits=limits, stats=stats)
+            elapsed += time.perf_counter() - start
+            count += 1
+
+            if isinstance(ast, LambdaError):
+                return Result(case.key, case.group, elapsed, stats.steps, 0,
+                              str(ast))
+
+        best = min(best, elapsed / count)
+
+    # Tracing allocations slows everything down, so memory gets a run
+    # of its own.
+    _fresh_start(case.prelude)
+    tracemalloc.start()
+
+    try:
+        evl.eval_raw_term(case.program, strategy=strategy, limits=limits)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(case.key, case.group, best, stats.steps, peak)
+
+
+def run_all(cases: list[Case],
+            strategy: evl.Strategy,
+            repeat: int,
+            timeout: float) -> dict:
+    """Run CASES, returning a report ready to be saved as JSON.
+
+    Each case runs in a process of its own, so that what earlier cases
+    left behind (such as the size of the term store, or terms that are
+    still alive) can't skew its measurements.
+
+    """
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+
+    for case in cases:
+        with ProcessPoolExecutor(1, context) as executor:
+            future = executor.submit(run_case, case, strategy, repeat, timeout)
+            result = future.result()
+
+        results.append(result)
+
+        if result.error is None:
+            print(f"{case.key:60} {result.seconds:10.6f}s "
+                  f"{result.steps:10} steps {result.peak_bytes:12} bytes")
+        else:
+            print(f"{case.key:60} failed: {result.error.splitlines()[0]}")
+
+    return {
+        "python": platform.python_version(),
+        "strategy": str(strategy),
+        "repeat": repeat,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Compare REPORT with BASELINE, listing the regressions found.
+
+    A case regresses if it now fails, takes more steps, or takes more
+    than THRESHOLD (as a fraction) longer or more memory than before.
+    Cases missing from either report are skipped.
+
+    """
+
+    before = {result["key"]: result for result in baseline["results"]}
+    regressions = []
+
+    if report["strategy"] != baseline["strategy"]:
+        regressions.append(
+            f"strategy differs: {report['strategy']} against "
+            f"{baseline['strategy']}")
+
+    for now in report["results"]:
+        then = before.get(now["key"])
+
+        if then is None or then["error"] is not None:
+            continue
+
+        key = now["key"]
+
+        if now["error"] is not None:
+            regressions.append(f"{key}: now fails ({now['error']})")
+            continue
+
+        if now["steps"] > then["steps"]:
+            regressions.append(
+                f"{key}: {now['steps']} steps, up from {then['steps']}")
+
+        for field, unit in (("seconds", "s"), ("peak_bytes", " bytes")):
+            if now[field] > then[field] * (1 + threshold):
+                regressions.append(
+                    f"{key}: {now[field]:.6g}{unit}, up from "
+                    f"{then[field]:.6g}{unit} "
+                    f"({now[field] / then[field] - 1:+.0%})")
+
+    return regressions
+
+
+def versus(report: dict, other: dict) -> list[str]:
+    """Compare the times in REPORT with those in OTHER, case by case.
+
+    The two are expected to come from different strategies; each line
+    gives how many times faster REPORT's strategy was than OTHER's.
+
+    """
+
+    before = {result["key"]: result for result in other["results"]}
+    lines = []
+
+    for now in report["results"]:
+        then = before.get(now["key"])
+
+        if then is None or now["error"] is not None or then["error"] is not None:
+            continue
+
+        lines.append(f"{now['key']:60} {then['seconds'] / now['seconds']:8.2f}x")
+
+    return lines
@@ -0,0 +1,78 @@
+"""Time how long lambdaterm.py takes to start up and exit.
+
+Run from the project root with
+
+python -m bench.startup
+
+The REPL is started with nothing to read, so it exits as soon as it's
+ready. The time it takes is reported along with that of a bare Python
+interpreter, which it can't do better than. With --load, the files
+given are loaded first, and with --image as well, their image is
+saved on the first run and restored on the others.
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "lambdaterm.py")
+
+ap = argparse.ArgumentParser(
+    prog="python -m bench.startup",
+    description="""Benchmark the startup time of the REPL."""
+)
+
+ap.add_argument("-r", "--repeat", type=int, default=10, help="""The number
+of timed runs of each command.""")
+
+ap.add_argument("-l", "--load", nargs="+", default=[], help="""Load these
+files at startup.""")
+
+ap.add_argument("-i", "--image", action="store_true", help="""Use an image
+of the loaded files.""")
+
+
+def time_command(command: list[str], repeat: int, cwd: str) -> list[float]:
+    """Run COMMAND REPEAT times in CWD, returning the time each run took."""
+
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdin=subprocess.DEVNULL,
+                       stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main():
+    args = ap.parse_args()
+
+    load = ["-l", *map(os.path.abspath, args.load)] if args.load else []
+
+    if args.image:
+        load.append("-i")
+
+    commands = {
+        "python": [sys.executable, "-c", "pass"],
+        "lambdaterm.py": [sys.executable, SCRIPT, *load],
+    }
+
+    # The REPL saves its history in the current directory.
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, command in commands.items():
+            times = time_command(command, args.repeat, cwd)
+
+            print(f"{name:>14}: best {min(times) * 1000:8.1f} ms, "
+                  f"median {statistics.median(times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
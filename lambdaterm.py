@@ -3,27 +3,53 @@
 import argparse
 
 import lbd.repl as repl
-from load import load
+from load import load, reload
+
+
+def positive_int(text: str) -> int:
+    """Parse TEXT as a number of at least one, for argparse."""
+
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"not a positive integer: '{text}'")
+
+    return value
+
 
 ap = argparse.ArgumentParser(
     description="""A lightweight programming language, based on functional paradigms."""
 )
 
-ap.add_argument("-l", "--load", nargs=1, default=[], help="""Execute, as well as load any
-defintions into REPL.""")
+ap.add_argument("-l", "--load", nargs="+", default=[], help="""Execute, as well as load any
+defintions into REPL, the files given, in order.""")
+
+ap.add_argument("-j", "--jobs", type=positive_int, default=None, help="""Parse the
+loaded files with this many processes.""")
+
+ap.add_argument("-i", "--image", action="store_true", help="""Save the
+definitions of the loaded files in an image next to the first of them,
+and restore them from there on later runs, while the files are
+unchanged.""")
+
+ap.add_argument("-w", "--watch", action="store_true", help="""Reload the
+loaded files whenever they change, re-evaluating only what changed.""")
 
 args = ap.parse_args()
 
 
 def main():
-    err_msg = load(args.load)
+    err_msg = load(args.load, image=args.image, workers=args.jobs)
 
     # Don't launch the REPL if any file had an error.
     if err_msg is not None:
         print(err_msg)
         return
 
-    repl.repl()
+    repl.repl(args.load, args.watch, reload)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+import collections
+import concurrent.futures as cf
+import itertools
+import os
+from collections.abc import Iterable, Iterator
+
+import lbd.binary as binary
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.parallel as parallel
+import lbd.term as term
+from lbd.error import Err, LambdaError
+from lbd.limits import Limits
+
+# Evaluating many independent expressions at once.
+#
+# Gamma is encoded once, and every worker process starts from a copy
+# of it. Each expression is evaluated against that copy as it stood
+# when the batch began: should an expression change a definition, the
+# worker's copy is put back before its next expression, and nothing
+# is sent back to the caller's gamma.
+#
+# Results come back encoded, as in 'parallel', and errors as they are.
+#
+# Expressions are handed out CHUNKSIZE at a time, and only so many
+# chunks are handed out ahead of the results being taken, so that a
+# long (or endless) iterable of expressions isn't read, and held, all
+# at once.
+
+# How many chunks each worker may have waiting for it.
+_AHEAD = 2
+
+_snapshot: g.Snapshot = []
+_generation = -1
+
+_strategy = evl.Strategy.NORMAL
+_limits: Limits | None = None
+_strong = False
+
+
+def _start(symbols: parallel.EncodedSnapshot,
+           strategy: evl.Strategy,
+           limits: Limits | None,
+           strong: bool) -> None:
+    """Set up a worker process to evaluate expressions against SYMBOLS."""
+
+    global _snapshot, _generation, _strategy, _limits, _strong
+
+    _snapshot = parallel.decode_snapshot(symbols)
+    g.restore(_snapshot)
+    _generation = g.generation()
+
+    _strategy = strategy
+    _limits = limits
+    _strong = strong
+
+
+def _evaluate(expression: str) -> bytes | LambdaError:
+    """Evaluate EXPRESSION in a worker process."""
+
+    global _generation
+
+    # Whatever goes wrong with one expression is reported in its
+    # place, rather than losing the rest of its chunk.
+    try:
+        result = evl.eval_raw_term(expression, strategy=_strategy,
+                                   limits=_limits, strong=_strong)
+    except Exception as e:
+        result = LambdaError(Err.UNSPECIFIED, -1, str(e))
+
+    if g.generation() != _generation:
+        g.restore(_snapshot)
+        _generation = g.generation()
+
+    if isinstance(result, LambdaError):
+        return result
+
+    return binary.dumps(result)
+
+
+def _evaluate_chunk(expressions: list[str]) -> list[bytes | LambdaError]:
+    """Evaluate EXPRESSIONS, in order, in a worker process."""
+
+    return [_evaluate(expression) for expression in expressions]
+
+
+def eval_many(expressions: Iterable[str],
+              workers: int | None = None,
+              strategy: evl.Strategy = evl.Strategy.NORMAL,
+              limits: Limits | None = None,
+              strong: bool = False,
+              chunksize: int = 16) -> Iterator[term.AST | LambdaError]:
+    """Evaluate EXPRESSIONS against gamma as it stands, in parallel.
+
+    Yield the result of each expression in turn, as 'eval_raw_term'
+    would return it, as soon as it and those before it are done. An
+    expression failing doesn't stop the others; its LambdaError is
+    yielded in its place.
+
+    The expressions are evaluated by at most WORKERS processes (by
+    default, as many as there are CPUs), which take them CHUNKSIZE at
+    a time. Only a few chunks per worker are read from EXPRESSIONS
+    ahead of the results yielded so far, so it may be long, or
+    endless. STRATEGY, LIMITS and STRONG are as for 'eval_raw_term',
+    and apply to each expression separately.
+
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    executor = cf.ProcessPoolExecutor(
+        workers, initializer=_start,
+        initargs=(parallel.encode_snapshot(), strategy, limits, strong))
+
+    remaining = iter(expressions)
+    pending: collections.deque[cf.Future] = collections.deque()
+
+    def submit() -> bool:
+        chunk = list(itertools.islice(remaining, chunksize))
+
+        if chunk:
+            pending.append(executor.submit(_evaluate_chunk, chunk))
+
+        return bool(chunk)
+
+    try:
+        while len(pending) < workers * _AHEAD and submit():
+            pass
+
+        while pending:
+            results = pending.popleft().result()
+            submit()
+
+            for result in results:
+                if isinstance(result, LambdaError):
+                    yield result
+                else:
+                    yield binary.loads(result)
+    finally:
+        executor.shutdown(cancel_futures=True)
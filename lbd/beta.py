@@ -1,5 +1,56 @@
+import enum
+import weakref
+from typing import Any
+
+import lbd.cache as nfc
 import lbd.gamma as g
+import lbd.limits as lim
 import lbd.term as term
+from lbd.stats import Stats
+
+# None of the functions in this module recurse. Deep terms and long
+# reduction chains would otherwise run into Python's recursion limit,
+# so each function drives an explicit stack instead.
+#
+# The tree walks below are the innermost loops of the interpreter, so
+# they dispatch on exact node types held in local variables, rather
+# than on 'match' class patterns, which are noticeably slower here.
+#
+# Each walk pushes a compound node twice: once to take it apart, and
+# once more, flagged with a depth of -1, to put it back together from
+# the finished subterms on the results stack. Names are handled
+# directly where they occur, rather than being pushed. Subterms that
+# come back unchanged are shared rather than copied.
+
+
+def rebuild(node: term.AST, results: list[term.AST]) -> term.AST:
+    """Rebuild NODE from the finished subterms on top of RESULTS."""
+
+    kind = type(node)
+
+    if kind is term.Application:
+        right = results.pop()
+        left = results.pop()
+
+        if left is not node.left or right is not node.right:
+            return term.Application(left, right)
+
+    elif kind is term.Abstraction:
+        body = results.pop()
+
+        if body is not node.body:
+            return term.Abstraction(body)
+
+    elif kind is term.Assignment:
+        value = results.pop()
+        name = results.pop()
+
+        assert isinstance(name, term.Name)
+
+        if name is not node.name or value is not node.value:
+            return term.Assignment(name, value)
+
+    return node
 
 
 def _shift(ast: term.AST, amount: int, minimum: int) -> term.AST:
@@ -10,37 +61,76 @@ def _shift(ast: term.AST, amount: int, minimum: int) -> term.AST:
 
     """
 
-    match ast:
-        case term.Name() as name:
-            if ast.index >= minimum:
-                return term.Name(name.index + amount)
+    Name = term.Name
+    Application = term.Application
+    Abstraction = term.Abstraction
+
+    # Many of the terms shifted during reduction are bare names.
+    if type(ast) is Name:
+        return Name(ast.index + amount) if ast.index >= minimum else ast
+
+    stack: list[tuple[term.AST, int]] = [(ast, minimum)]
+    results: list[term.AST] = []
+
+    while stack:
+        node, minimum = stack.pop()
+        kind = type(node)
+
+        if minimum < 0:
+            if kind is Application:
+                right = results.pop()
+                left = results.pop()
+
+                if left is not node.left or right is not node.right:
+                    node = Application(left, right)
 
-            return ast
+                results.append(node)
+            else:
+                results.append(rebuild(node, results))
 
-        case term.Abstraction() as abstr:
-            new_body = _shift(abstr.body, amount, minimum + 1)
+        elif kind is Application:
+            left = node.left
+            right = node.right
 
-            return term.Abstraction(new_body)
+            if type(left) is not Name or type(right) is not Name:
+                stack.append((node, -1))
+                stack.append((right, minimum))
+                stack.append((left, minimum))
+                continue
 
-        case term.Application() as app:
-            new_left = _shift(app.left, amount, minimum)
-            new_right = _shift(app.right, amount, minimum)
+            if left.index >= minimum:
+                left = Name(left.index + amount)
 
-            return term.Application(new_left, new_right)
+            if right.index >= minimum:
+                right = Name(right.index + amount)
 
-        case term.Assignment() as assign:
-            new_name = _shift(assign.name, amount, minimum)
-            new_value = _shift(assign.value, amount, minimum)
+            if left is not node.left or right is not node.right:
+                node = Application(left, right)
 
-            assert isinstance(new_name, term.Name)
+            results.append(node)
 
-            return term.Assignment(new_name, new_value)
+        elif kind is Name:
+            if node.index >= minimum:
+                node = Name(node.index + amount)
 
-        case term.Empty():
-            return ast
+            results.append(node)
 
-        case _:
-            raise ValueError(f"Fatal: invalid ast-kind: {ast}")
+        elif kind is Abstraction:
+            stack.append((node, -1))
+            stack.append((node.body, minimum + 1))
+
+        elif kind is term.Assignment:
+            stack.append((node, -1))
+            stack.append((node.value, minimum))
+            stack.append((node.name, minimum))
+
+        elif kind is term.Empty:
+            results.append(node)
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+    return results.pop()
 
 
 def inc(ast: term.AST, minimum: int) -> term.AST:
@@ -60,48 +150,361 @@ def replace(ast: term.AST, argument: term.AST, target_index: int) -> term.AST:
 
     Return the modified AST."""
 
-    match ast:
-        case term.Name() as name:
-            if name.index == target_index:
-                return argument
+    Name = term.Name
+    Application = term.Application
+    Abstraction = term.Abstraction
+
+    if type(ast) is Name:
+        return argument if ast.index == target_index else ast
+
+    # Underneath each abstraction, both the target index and the
+    # argument's own free names are one greater than they were just
+    # outside it. The shifted arguments are built on first use and
+    # kept, one per depth.
+    arguments = [argument]
+
+    def substitute(depth: int) -> term.AST:
+        while len(arguments) <= depth:
+            arguments.append(inc(arguments[-1], 0))
+
+        return arguments[depth]
+
+    stack: list[tuple[term.AST, int]] = [(ast, 0)]
+    results: list[term.AST] = []
+
+    while stack:
+        node, depth = stack.pop()
+        kind = type(node)
+
+        if depth < 0:
+            if kind is Application:
+                right = results.pop()
+                left = results.pop()
+
+                if left is not node.left or right is not node.right:
+                    node = Application(left, right)
+
+                results.append(node)
+            else:
+                results.append(rebuild(node, results))
+
+        elif kind is Application:
+            left = node.left
+            right = node.right
+
+            if type(left) is not Name or type(right) is not Name:
+                stack.append((node, -1))
+                stack.append((right, depth))
+                stack.append((left, depth))
+                continue
+
+            target = target_index + depth
+
+            if left.index == target:
+                left = substitute(depth)
+
+            if right.index == target:
+                right = substitute(depth)
+
+            if left is not node.left or right is not node.right:
+                node = Application(left, right)
+
+            results.append(node)
+
+        elif kind is Name:
+            if node.index == target_index + depth:
+                node = substitute(depth)
+
+            results.append(node)
+
+        elif kind is Abstraction:
+            stack.append((node, -1))
+            stack.append((node.body, depth + 1))
+
+        elif kind is term.Assignment:
+            stack.append((node, -1))
+            stack.append((node.value, depth))
+            stack.append((node.name, depth))
+
+        elif kind is term.Empty:
+            results.append(node)
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+    return results.pop()
+
+
+# Since terms are interned, a contraction is a function of the
+# identities of the body and the argument, and recursive programs
+# perform the same few contractions over and over. Results are kept
+# here, keyed by those identities, alongside the terms themselves so
+# that the identities stay valid.
+_contractions: dict[tuple[int, int],
+                    tuple[term.AST, term.AST, term.AST]] = {}
+
+_CONTRACTIONS_LIMIT = 1 << 14
+
+
+def contract(body: term.AST, argument: term.AST,
+             stats: Stats | None = None) -> term.AST:
+    """Substitute ARGUMENT for the binder of BODY.
+
+    BODY is the body of an abstraction applied to ARGUMENT. The result
+    is the same as that of
+
+    dec(replace(body, inc(argument, 0), 0), 0)
+
+    but BODY is walked only once, ARGUMENT is only shifted where an
+    occurrence of the binder is actually found, and repeated
+    contractions are looked up rather than redone.
+
+    The substitutions and shifts done, if any, are counted in STATS,
+    if given.
+
+    """
+
+    key = (id(body), id(argument))
+    known = _contractions.get(key)
+
+    if known is not None:
+        return known[2]
+
+    result = _contract(body, argument, stats)
+
+    if len(_contractions) >= _CONTRACTIONS_LIMIT:
+        _contractions.clear()
+
+    _contractions[key] = (body, argument, result)
+
+    return result
+
+
+def clear_contractions() -> None:
+    """Forget the contractions remembered so far."""
+
+    _contractions.clear()
+
+
+def _contract(body: term.AST, argument: term.AST,
+              stats: Stats | None) -> term.AST:
+    """Walk BODY once, substituting ARGUMENT for its binder."""
+
+    Name = term.Name
+    Application = term.Application
+    Abstraction = term.Abstraction
+
+    # Underneath DEPTH abstractions, the binder is named DEPTH, and
+    # the argument's free names must be shifted up by DEPTH. The
+    # shifted copies are built on first use, one per depth.
+    arguments: dict[int, term.AST] = {0: argument}
+
+    def substitute(depth: int) -> term.AST:
+        if stats is not None:
+            stats.substitutions += 1
+
+        if depth not in arguments:
+            arguments[depth] = _shift(argument, depth, 0)
+
+            if stats is not None:
+                stats.shifts += 1
+
+        return arguments[depth]
+
+    # Names bound inside BODY are left alone, while the names free in
+    # it lose the binder and drop by one.
+    def lookup(name: term.Name, depth: int) -> term.AST:
+        if name.index < depth:
+            return name
+
+        if name.index == depth:
+            return substitute(depth)
+
+        return Name(name.index - 1)
+
+    if type(body) is Name:
+        return lookup(body, 0)
+
+    stack: list[tuple[term.AST, int]] = [(body, 0)]
+    results: list[term.AST] = []
+
+    while stack:
+        node, depth = stack.pop()
+        kind = type(node)
+
+        if depth < 0:
+            if kind is Application:
+                right = results.pop()
+                left = results.pop()
+
+                if left is not node.left or right is not node.right:
+                    node = Application(left, right)
+
+                results.append(node)
+            else:
+                results.append(rebuild(node, results))
+
+        elif kind is Application:
+            left = node.left
+            right = node.right
+
+            if type(left) is not Name or type(right) is not Name:
+                stack.append((node, -1))
+                stack.append((right, depth))
+                stack.append((left, depth))
+                continue
+
+            left = lookup(left, depth)
+            right = lookup(right, depth)
+
+            if left is not node.left or right is not node.right:
+                node = Application(left, right)
+
+            results.append(node)
+
+        elif kind is Name:
+            results.append(lookup(node, depth))
+
+        elif kind is Abstraction:
+            stack.append((node, -1))
+            stack.append((node.body, depth + 1))
+
+        elif kind is term.Assignment:
+            stack.append((node, -1))
+            stack.append((node.value, depth))
+            stack.append((node.name, depth))
+
+        elif kind is term.Empty:
+            results.append(node)
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+    return results.pop()
 
-            return ast
 
-        case term.Abstraction() as abstr:
-            new_argument = inc(argument, 0)
-            new_body = replace(abstr.body, new_argument, target_index + 1)
+class _Cont(enum.Enum):
+    """Tags for the continuation frames used by 'beta_reduce'.
 
-            return term.Abstraction(new_body)
+    ARGUMENT: the head of an application is being reduced; the frame
+    holds the application's right-hand side.
 
-        case term.Application() as app:
-            new_left = replace(app.left, argument, target_index)
-            new_right = replace(app.right, argument, target_index)
+    REBUILD: the head turned out not to be an abstraction, and the
+    right-hand side is being reduced; the frame holds the reduced
+    head.
 
-            return term.Application(new_left, new_right)
+    STORE: a global's definition is being reduced; the frame holds
+    the global's index into gamma, so that the result can be cached
+    there, along with gamma's generation at the time.
 
-        case term.Assignment() as assign:
-            new_name = replace(assign.name, argument, target_index)
-            new_value = replace(assign.value, argument, target_index)
+    MEMO: terms whose common result is being computed, to be entered
+    into the normal-form cache; the frame holds gamma's generation at
+    the time, along with the terms.
 
-            assert isinstance(new_name, term.Name)
+    """
 
-            return term.Assignment(new_name, new_value)
+    ARGUMENT = enum.auto()
+    REBUILD = enum.auto()
+    STORE = enum.auto()
+    MEMO = enum.auto()
 
-        case term.Empty() as empty:
-            return empty
 
-        case _:
-            raise ValueError(f"Fatal: invalid ast-kind: {ast}")
+# A term that reduces by contraction has the same result as the
+# contracted term, and so on down the chain. A MEMO frame collects the
+# first few terms of such a chain, rather than each of them pushing a
+# frame of its own.
+_MEMO_TERMS = 8
 
 
-def beta_reduce(ast: term.AST) -> term.AST:
+def beta_reduce(ast: term.AST,
+                cache: "nfc.NormalFormCache | None" = None,
+                limits: "lim.Limits | None" = None,
+                stats: "Stats | None" = None,
+                strong: bool = False) -> term.AST:
     """Evaluate AST using normal order beta reduction.
 
-    Return the reduced AST.
+    Return the reduced AST. Reduction stops at the first abstraction
+    reached, unless STRONG is true, in which case the result is
+    reduced further (see '_normalize').
+
+    The reduction is driven by an explicit stack of continuation
+    frames, so that neither the length of a reduction nor the depth
+    of an application spine is bounded by Python's recursion limit.
+
+    If CACHE is given, applications are looked up in it before being
+    reduced, and entered into it once their result is known.
+
+    If LIMITS is given, a LambdaError is raised as soon as the
+    reduction exceeds any of them.
+
+    If STATS is given, the reduction's statistics are recorded in it.
+    Otherwise, and without LIMITS, nothing is counted at all.
+
+    """
+
+    reduce = _normalize if strong else _reduce
+
+    if limits is None and stats is None:
+        return reduce(ast, cache, None)
+
+    meter = lim.Budget(limits, stats)
+    result = reduce(ast, cache, meter)
+    meter.finish()
+
+    return result
+
+
+def _reduce(ast: term.AST,
+            cache: "nfc.NormalFormCache | None",
+            meter: "lim.Budget | None",
+            depth: int = 0) -> term.AST:
+    """Do the work of 'beta_reduce', charging each step to METER.
+
+    AST is underneath DEPTH abstractions, whose variables are left
+    as they are; only names beyond them are globals.
 
     """
 
-    match ast:
+    # A term means something else underneath abstractions, so neither
+    # it nor the globals' values found along the way are kept.
+    if depth > 0:
+        cache = None
+
+    stack: list[tuple[_Cont, Any]] = []
+    current = ast
+
+    while True:
+        # Descend into CURRENT until it yields a value, pushing a
+        # continuation frame for whatever remains to be done with it.
+        kind = type(current)
+
+        if kind is term.Application:
+            cached = None if cache is None else cache.get(current)
+
+            if cached is None:
+                if cache is not None:
+                    top = stack[-1] if stack else None
+
+                    if top is not None and top[0] is _Cont.MEMO:
+                        if len(top[1][1]) < _MEMO_TERMS:
+                            top[1][1].append(current)
+                    else:
+                        stack.append(
+                            (_Cont.MEMO, (g.generation(), [current])))
+
+                stack.append((_Cont.ARGUMENT, current.right))
+                current = current.left
+
+                if meter is not None and len(stack) > meter.stats.max_spine:
+                    meter.stats.max_spine = len(stack)
+
+                continue
+
+            value = cached
+
+        elif kind is term.Abstraction:
+            value = current
+
         # Some remarks on the Name() case:
         #
         # 1. The only time a name is evaluated is when it's a free
@@ -109,16 +512,15 @@ def beta_reduce(ast: term.AST) -> term.AST:
         # evaluating the abstraction binding that name.
         #
         # 2. Since the name isn't underneath any abstractions at this
-        # point, its scope-depth is zero, and so its index as a Name
-        # is precisely its index into gamma. This is precisely why
-        # negative indices at this point are effectively impossible,
-        # and are flagged with a ValueError, indicative of a fatal
-        # flaw in the implementation.
-        case term.Name() as name:
-            if (idx := name.index) < 0:
-                raise ValueError(
-                    f"Fatal: name with negative index of {name.index}")
-
+        # point, other than the DEPTH ones around AST, its index as a
+        # Name, less DEPTH, is precisely its index into gamma. Names
+        # with a smaller index are the variables of those
+        # abstractions, and don't reduce any further.
+        elif kind is term.Name and current.index < depth:
+            value = current
+
+        elif kind is term.Name:
+            idx = current.index - depth
             sym = g.sym_get(idx)
 
             # For now, panic with a ValueError here.
@@ -131,53 +533,235 @@ def beta_reduce(ast: term.AST) -> term.AST:
             elif sym.ast is None:
                 raise ValueError(f"Unassigned free symbol '{sym.label}'")
 
-            result = beta_reduce(sym.ast)
-            g.sym_set(sym.label, result)
-
-            return result
-
-        case term.Abstraction() as abstr:
-            return abstr
-
-        case term.Application() as app:
-            beta_left = beta_reduce(app.left)
+            if meter is not None:
+                meter.stats.lookups += 1
+                meter.step()
 
-            match beta_left:
-                case term.Abstraction() as fn:
-                    arg = app.right
+            if sym.value is not None:
+                value = sym.value
 
-                    # Actual beta redux algorithm.
-                    new_arg = inc(arg, 0)
-                    replaced_body = replace(fn.body, new_arg, 0)
-                    new_replaced_body = dec(replaced_body, 0)
+                if depth > 0:
+                    value = _shift(value, depth, 0)
+            else:
+                current = sym.ast
 
-                    return beta_reduce(new_replaced_body)
+                # A definition that is already an abstraction reduces
+                # to itself, so there's nothing to write back.
+                if depth > 0:
+                    current = _shift(current, depth, 0)
+                elif type(current) is not term.Abstraction:
+                    stack.append((_Cont.STORE, (idx, g.generation())))
 
-                case _:
-                    beta_right = beta_reduce(app.right)
+                continue
 
-                    return term.Application(beta_left, beta_right)
+        # An assignment underneath abstractions can't be carried out,
+        # since its value may refer to their variables.
+        elif kind is term.Assignment and depth > 0:
+            value = current
 
-        case term.Assignment() as assign:
+        elif kind is term.Assignment:
             # The idea is to simply assign the AST to the given name,
             # which will be evaluated later as need be, under the
             # term.Name() case.
-            if (idx := assign.name.index) < 0:
+            if (idx := current.name.index) < 0:
                 f"Fatal: name with negative index of {idx}"
 
             sym = g.sym_get(idx)
 
             if sym is None:
-                raise ValueError(f"Fatal: '{assign.name}' isn't a free symbol")
+                raise ValueError(
+                    f"Fatal: '{current.name}' isn't a free symbol")
+
+            value = current.value
+
+            g.sym_set_at(idx, value)
+
+        elif kind is term.Empty:
+            value = current
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {current}")
+
+        # Hand VALUE to the pending continuations, until one of them
+        # produces a new term to reduce.
+        while stack:
+            cont, payload = stack.pop()
+
+            if cont is _Cont.ARGUMENT:
+                assert isinstance(payload, term.AST)
+
+                if type(value) is term.Abstraction:
+                    if meter is not None:
+                        meter.stats.contractions += 1
+                        meter.step()
+
+                    # Actual beta redux algorithm.
+                    current = contract(value.body, payload,
+                                       None if meter is None else meter.stats)
+                    break
+
+                stack.append((_Cont.REBUILD, value))
+                current = payload
+                break
+
+            elif cont is _Cont.REBUILD:
+                assert isinstance(payload, term.AST)
+
+                value = term.Application(payload, value)
+
+            elif cont is _Cont.STORE:
+                # Don't keep a value computed from definitions that
+                # changed along the way.
+                idx, generation = payload
+
+                if generation == g.generation():
+                    g.sym_set_value(idx, value)
+
+            else:
+                assert cache is not None
 
-            beta_value = assign.value
+                # A result that depended on definitions which changed
+                # along the way is not worth keeping.
+                generation, terms = payload
 
-            g.sym_set(sym.label, beta_value)
+                if generation == g.generation():
+                    for t in terms:
+                        cache.put(t, value)
+        else:
+            return value
 
-            return beta_value
 
-        case term.Empty() as empty:
-            return empty
+def _reduce_head(ast: term.AST,
+                 cache: "nfc.NormalFormCache | None",
+                 meter: "lim.Budget | None",
+                 depth: int) -> term.AST:
+    """Reduce AST by '_reduce', carrying out an assignment at the top."""
+
+    assignment = type(ast) is term.Assignment
+    ast = _reduce(ast, cache, meter, depth)
+
+    # An assignment gives back the value assigned, unreduced.
+    if assignment and depth == 0:
+        ast = _reduce(ast, cache, meter, depth)
+
+    return ast
+
+
+# Terms known to be in normal form, each mapped to the least number
+# of abstractions it has been found normal underneath. A normal term
+# has no globals left in it, so it stays normal underneath any greater
+# number of abstractions, where its free names are all variables.
+_normal: "weakref.WeakKeyDictionary[term.AST, int]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _normalize(ast: term.AST,
+               cache: "nfc.NormalFormCache | None",
+               meter: "lim.Budget | None",
+               depth: int = 0) -> term.AST:
+    """Do the work of 'beta_reduce' in strong mode.
+
+    Carry on reducing wherever '_reduce' stops: inside the bodies of
+    abstractions, and in the arguments of applications whose head is
+    a variable or nil. The result is AST's normal form, with globals
+    unfolded, if it has one.
+
+    Each subterm is first reduced by '_reduce', and then taken apart,
+    so that reduction carries on inside it. Terms already known to be
+    normal are passed over.
+
+    Assignments underneath abstractions are left as they are.
+
+    AST is underneath DEPTH abstractions, as for '_reduce'.
+
+    """
+
+    # Compound nodes are pushed with a flag saying whether they've
+    # been through '_reduce' already.
+    stack: list[tuple[term.AST, int, bool]] = [(ast, depth, False)]
+    results: list[term.AST] = []
+
+    while stack:
+        node, depth, reduced = stack.pop()
+
+        if depth < 0:
+            node = rebuild(node, results)
+            results.append(node)
+
+            known = _normal.get(node)
+
+            if known is None or known > -depth - 1:
+                _normal[node] = -depth - 1
+
+            continue
+
+        known = _normal.get(node)
+
+        if known is not None and known <= depth:
+            results.append(node)
+            continue
+
+        if not reduced:
+            node = _reduce_head(node, cache, meter, depth)
+
+        kind = type(node)
+
+        # Rebuild markers carry the depth they were pushed at, as
+        # -(depth + 1), so that the rebuilt term can be marked normal.
+        if kind is term.Abstraction:
+            stack.append((node, -depth - 1, True))
+            stack.append((node.body, depth + 1, False))
+
+        # Having come out of '_reduce', the application is a variable
+        # or nil applied to arguments, which have been reduced as far
+        # as '_reduce' goes; the left-hand side is another such
+        # application, or the head.
+        elif kind is term.Application:
+            stack.append((node, -depth - 1, True))
+            stack.append((node.right, depth, True))
+            stack.append((node.left, depth, True))
+
+        else:
+            results.append(node)
+
+    return results.pop()
+
+
+# The entry points below let other modules take a term apart as
+# '_normalize' does, for example to hand some of its subterms to other
+# processes, without reaching into its workings.
+
+def weak_reduce(ast: term.AST, depth: int = 0) -> term.AST:
+    """Reduce AST as far as 'beta_reduce' does outside strong mode.
+
+    AST is underneath DEPTH abstractions, as for 'normalize'. An
+    assignment at the top is carried out, and the value assigned
+    reduced in turn, as in strong mode.
+
+    """
+
+    return _reduce_head(ast, None, None, depth)
+
+
+def normalize(ast: term.AST, depth: int = 0) -> term.AST:
+    """Return the normal form of AST, as 'beta_reduce' does in strong mode.
+
+    AST is underneath DEPTH abstractions, whose variables are left as
+    they are; only names beyond them are globals.
+
+    """
+
+    return _normalize(ast, None, None, depth)
+
+
+def is_normal(ast: term.AST, depth: int = 0) -> bool:
+    """Tell whether AST is known to be normal underneath DEPTH abstractions.
+
+    A term for which this is false may still be normal, if it hasn't
+    been found so yet.
+
+    """
+
+    known = _normal.get(ast)
 
-        case _:
-            raise ValueError(f"Fatal: invalid ast-kind: {ast}")
+    return known is not None and known <= depth
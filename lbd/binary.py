@@ -0,0 +1,381 @@
+import enum
+import mmap
+import struct
+
+import lbd.gamma as g
+import lbd.term as term
+
+# A compact binary encoding of terms, and of gamma.
+#
+# A term is written out in prefix order, one bytecode per node, as in
+# binary lambda calculus: an abstraction is followed by its body, and
+# an application by its left and then its right side. Names below
+# SMALL_NAMES fit in their bytecode; larger ones follow it as a
+# varint. Terms are shared, so each compound subterm is numbered as
+# it's finished, and any later occurrence of it is written out as a
+# reference to that number instead.
+#
+# A gamma file holds the definition and cached value of every symbol,
+# each encoded on its own, followed by a table giving each symbol's
+# label and where its terms start. Right after the header comes a
+# key, which the writer may use to say what the symbols were built
+# from, and then any other data the writer wants kept alongside them.
+# Opened as an Image, the file is mapped into memory, and a definition
+# is only decoded when it's asked for.
+
+
+class Op(enum.IntEnum):
+    """The bytecodes of an encoded term."""
+
+    EMPTY = 0
+    ABSTRACTION = 1
+    APPLICATION = 2
+    ASSIGNMENT = 3
+    NAME = 4
+    SHARED = 5
+    SMALL_NAME = 8
+
+
+SMALL_NAMES = 256 - Op.SMALL_NAME
+
+MAGIC = b"LBDG"
+VERSION = 2
+
+# Magic, version, number of symbols, and where the table starts.
+_HEADER = struct.Struct("<4sIIQ")
+
+# What reading a damaged file raises, one way or another, before it's
+# turned into a ValueError.
+_DAMAGE = (ValueError, IndexError, TypeError, struct.error)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+
+def _read_varint(data, position: int) -> tuple[int, int]:
+    """Read the varint at POSITION in DATA.
+
+    Return its value, and the position just after it.
+
+    """
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, position
+
+        shift += 7
+
+
+def _encode(out: bytearray, ast: term.AST) -> None:
+    """Append the encoding of AST to OUT."""
+
+    numbers: dict[int, int] = {}
+
+    # Compound nodes are pushed a second time, flagged as done, to be
+    # numbered once everything inside them has been written out.
+    stack: list[tuple[term.AST, bool]] = [(ast, False)]
+
+    while stack:
+        node, done = stack.pop()
+
+        if done:
+            numbers[id(node)] = len(numbers)
+            continue
+
+        kind = type(node)
+
+        if kind is term.Name:
+            if node.index < SMALL_NAMES:
+                out.append(Op.SMALL_NAME + node.index)
+            else:
+                out.append(Op.NAME)
+                _write_varint(out, node.index)
+
+            continue
+
+        if kind is term.Empty:
+            out.append(Op.EMPTY)
+            continue
+
+        number = numbers.get(id(node))
+
+        if number is not None:
+            out.append(Op.SHARED)
+            _write_varint(out, number)
+            continue
+
+        stack.append((node, True))
+
+        if kind is term.Abstraction:
+            out.append(Op.ABSTRACTION)
+            stack.append((node.body, False))
+
+        elif kind is term.Application:
+            out.append(Op.APPLICATION)
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+        elif kind is term.Assignment:
+            out.append(Op.ASSIGNMENT)
+            stack.append((node.value, False))
+            stack.append((node.name, False))
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+
+def _decode(data, position: int) -> tuple[term.AST, int]:
+    """Decode the term starting at POSITION in DATA.
+
+    Return the term, and the position just after it.
+
+    """
+
+    shared: list[term.AST] = []
+
+    # Each frame holds the bytecode of a compound node still missing
+    # some of its subterms, followed by the ones found so far.
+    frames: list[list] = []
+
+    while True:
+        op = data[position]
+        position += 1
+
+        if op >= Op.SMALL_NAME:
+            value = term.Name(op - Op.SMALL_NAME)
+
+        elif op == Op.NAME:
+            index, position = _read_varint(data, position)
+            value = term.Name(index)
+
+        elif op == Op.EMPTY:
+            value = term.Empty()
+
+        elif op == Op.SHARED:
+            number, position = _read_varint(data, position)
+            value = shared[number]
+
+        elif op <= Op.ASSIGNMENT:
+            frames.append([op])
+            continue
+
+        else:
+            raise ValueError(f"Invalid bytecode {op} at {position - 1}")
+
+        # Hand VALUE to the frames waiting on it, finishing as many of
+        # them as it completes.
+        while frames:
+            frame = frames[-1]
+            frame.append(value)
+
+            if frame[0] == Op.ABSTRACTION:
+                value = term.Abstraction(frame[1])
+            elif len(frame) < 3:
+                break
+            elif frame[0] == Op.APPLICATION:
+                value = term.Application(frame[1], frame[2])
+            else:
+                value = term.Assignment(frame[1], frame[2])
+
+            frames.pop()
+            shared.append(value)
+        else:
+            return value, position
+
+
+def dumps(ast: term.AST) -> bytes:
+    """Return the binary encoding of AST."""
+
+    out = bytearray()
+    _encode(out, ast)
+
+    return bytes(out)
+
+
+def loads(data: bytes) -> term.AST:
+    """Return the term encoded in DATA by 'dumps'."""
+
+    ast, _ = _decode(data, 0)
+
+    return ast
+
+
+def save_gamma(filename: str, key: bytes = b"", extra: bytes = b"") -> None:
+    """Write every symbol in gamma to FILENAME, along with KEY and EXTRA."""
+
+    symbols = g.snapshot()
+    out = bytearray(_HEADER.size)
+    offsets = []
+
+    for blob in (key, extra):
+        _write_varint(out, len(blob))
+        out.extend(blob)
+
+    for _, ast, value in symbols:
+        ast_offset = len(out)
+        _encode(out, ast)
+
+        # No term starts at 0, which is where the header is, so an
+        # offset of 0 stands for a value that isn't known.
+        value_offset = 0
+
+        if value is not None:
+            value_offset = len(out)
+            _encode(out, value)
+
+        offsets.append((ast_offset, value_offset))
+
+    table = len(out)
+
+    for (label, _, _), (ast_offset, value_offset) in zip(symbols, offsets):
+        encoded = label.encode()
+
+        _write_varint(out, len(encoded))
+        out.extend(encoded)
+        _write_varint(out, ast_offset)
+        _write_varint(out, value_offset)
+
+    _HEADER.pack_into(out, 0, MAGIC, VERSION, len(symbols), table)
+
+    with open(filename, "wb") as f:
+        f.write(out)
+
+
+def _read_blob(data, position: int, end: int) -> tuple[bytes, int]:
+    """Read the length-prefixed bytes at POSITION in DATA, before END.
+
+    Return them, and the position just after them.
+
+    """
+
+    length, start = _read_varint(data, position)
+
+    if start + length > end:
+        raise ValueError("truncated")
+
+    return data[start:start + length], start + length
+
+
+class Image():
+    """The symbols saved in FILENAME by 'save_gamma'.
+
+    The file is mapped into memory, and each symbol's terms are only
+    decoded when first asked for. An Image should be closed once done
+    with, or used as a context manager.
+
+    KEY is the key the symbols were saved with, and EXTRA the other
+    data saved along with them.
+
+    Whatever is found to be wrong with the file, whether on opening it
+    or on decoding a term, raises a ValueError.
+
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+
+        with open(filename, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_table()
+        except _DAMAGE:
+            self._data.close()
+            raise ValueError(f"{filename} isn't a gamma file")
+
+    def _read_table(self) -> None:
+        data = self._data
+        magic, version, count, table = _HEADER.unpack_from(data, 0)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("bad header")
+
+        if not _HEADER.size <= table <= len(data):
+            raise ValueError("table out of bounds")
+
+        self.key, start = _read_blob(data, _HEADER.size, table)
+        self.extra, start = _read_blob(data, start, table)
+        position = table
+
+        self.labels: list[str] = []
+        self._offsets: list[tuple[int, int]] = []
+        self._terms: dict[int, term.AST] = {}
+
+        for _ in range(count):
+            label, position = _read_blob(data, position, len(data))
+            self.labels.append(label.decode())
+
+            ast_offset, position = _read_varint(data, position)
+            value_offset, position = _read_varint(data, position)
+
+            # Terms lie between the header and the table; a value
+            # offset of 0 stands for no value.
+            if not _HEADER.size <= ast_offset < table:
+                raise ValueError("term out of bounds")
+
+            if value_offset != 0 and not _HEADER.size <= value_offset < table:
+                raise ValueError("term out of bounds")
+
+            self._offsets.append((ast_offset, value_offset))
+
+    def _term(self, offset: int) -> term.AST:
+        ast = self._terms.get(offset)
+
+        if ast is None:
+            try:
+                ast, _ = _decode(self._data, offset)
+            except _DAMAGE:
+                raise ValueError(f"{self.filename} is damaged at {offset}")
+
+            self._terms[offset] = ast
+
+        return ast
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def definition(self, index: int) -> term.AST:
+        """Return the definition of the symbol at INDEX."""
+
+        return self._term(self._offsets[index][0])
+
+    def value(self, index: int) -> term.AST | None:
+        """Return the cached value of the symbol at INDEX, if any."""
+
+        offset = self._offsets[index][1]
+
+        return None if offset == 0 else self._term(offset)
+
+    def restore(self) -> None:
+        """Replace gamma with the symbols saved in the image.
+
+        Every term is decoded here: gamma holds its symbols' terms
+        outright, and works out from each definition which globals it
+        refers to.
+
+        """
+
+        g.restore([(label, self.definition(i), self.value(i))
+                   for i, label in enumerate(self.labels)])
+
+    def close(self) -> None:
+        self._terms.clear()
+        self._data.close()
+
+    def __enter__(self) -> "Image":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
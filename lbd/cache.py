@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import lbd.gamma as g
+import lbd.term as term
+
+
+@dataclass
+class NormalFormCache():
+    """A bounded cache from terms to the results of reducing them.
+
+    Terms are interned, so looking one up costs a single hash-table
+    probe. Once MAXSIZE entries are held, the least recently used one
+    is evicted to make room.
+
+    Since free names resolve through gamma, a cached result is only
+    good for as long as the definitions it was computed under. The
+    whole cache is therefore dropped whenever gamma's generation moves
+    on, as happens on every 'def'.
+
+    HITS and MISSES count lookups since the cache was created.
+
+    """
+
+    maxsize: int = 4096
+    hits: int = 0
+    misses: int = 0
+
+    _entries: "OrderedDict[term.AST, term.AST]" = field(
+        default_factory=OrderedDict, repr=False)
+    _generation: int = field(default_factory=g.generation, repr=False)
+
+    def __len__(self) -> int:
+        self._check_generation()
+
+        return len(self._entries)
+
+    def _check_generation(self) -> None:
+        if self._generation != g.generation():
+            self._entries.clear()
+            self._generation = g.generation()
+
+    def get(self, ast: term.AST) -> term.AST | None:
+        """Return the cached result for AST, or None if there is none."""
+
+        self._check_generation()
+
+        value = self._entries.get(ast)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(ast)
+        self.hits += 1
+
+        return value
+
+    def put(self, ast: term.AST, value: term.AST) -> None:
+        """Record VALUE as the result of reducing AST."""
+
+        self._check_generation()
+
+        self._entries[ast] = value
+        self._entries.move_to_end(ast)
+
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters."""
+
+        self._entries.clear()
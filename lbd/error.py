@@ -2,10 +2,12 @@ import enum
 from dataclasses import dataclass
 
 import lbd.tokenize as tkz
+from lbd.stats import Stats
 
 
 class Err(enum.StrEnum):
     ASSIGN_TO_LOCAL = "Cannot assign to local variable"
+    DEADLINE = "Deadline exceeded"
     ILLEGAL_TOKEN = "Illegal token"
     INCOMPLETE = "Incomplete term"
     INVALID_NAME = "Invalid name"
@@ -18,6 +20,8 @@ class Err(enum.StrEnum):
     MISSING_DOT = "Missing dot after parameter name"
     MISSING_IN_OP = "Missing 'in'"
     MISSING_PARAM = "Missing parameter"
+    NODE_LIMIT = "Term limit exceeded"
+    STEP_LIMIT = "Step limit exceeded"
     TRAILING_GARBAGE = "Trailing garbage"
     UNASSIGNED = "Unassigned free symbol"
     UNSPECIFIED = "Unspecified error"
@@ -25,11 +29,24 @@ class Err(enum.StrEnum):
 
 @dataclass
 class LambdaError(Exception):
+    """An error found while evaluating some input.
+
+    POS is the position of the offending token, or -1 for errors not
+    tied to any one token, such as a reduction exceeding its limits;
+    in the latter case, STATS holds the statistics gathered up to that
+    point.
+
+    """
+
     kind: Err
     pos: int
     message: str
+    stats: Stats | None = None
 
     def __str__(self):
+        if self.pos < 0:
+            return self.message
+
         return f"Position {self.pos}: {self.message}"
 
 
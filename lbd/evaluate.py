@@ -1,22 +1,105 @@
+import enum
+
 import lbd.beta as beta
+import lbd.cache as nfc
 import lbd.error as err
+import lbd.krivine as krivine
+import lbd.lazy as lazy
+import lbd.limits as lim
+import lbd.nbe as nbe
+import lbd.parallel as parallel
 import lbd.parse as parse
 import lbd.term as term
 import lbd.tokenize as tkz
 from lbd.error import LambdaError
+from lbd.stats import Stats
+
+
+class Strategy(enum.StrEnum):
+    """The reduction strategies a term can be evaluated with.
+
+    NORMAL: normal order, substituting arguments as they are ('beta_reduce').
+
+    NEED: call-by-need, sharing each argument between its occurrences
+    so that it's reduced at most once ('lazy_reduce').
+
+    KRIVINE: call-by-name on a Krivine machine, which binds arguments
+    in environments rather than substituting them ('krivine_reduce').
+
+    NBE: normalization by evaluation, compiling the term to Python
+    closures ('nbe_reduce').
+
+    NATIVE: NBE, with the prelude's booleans and naturals, and the
+    operations on them, carried out on Python bools and ints.
+
+    NORMAL, NEED, KRIVINE and NBE give the same results. NATIVE gives
+    those too, except that booleans and naturals it computed natively
+    are always given in normal form.
 
+    """
 
-def eval_raw_term(raw_term: str) -> term.AST | LambdaError:
+    NORMAL = "normal"
+    NEED = "need"
+    KRIVINE = "krivine"
+    NBE = "nbe"
+    NATIVE = "native"
+
+
+def eval_raw_term(raw_term: str,
+                  cache: nfc.NormalFormCache | None = None,
+                  strategy: Strategy = Strategy.NORMAL,
+                  limits: lim.Limits | None = None,
+                  stats: Stats | None = None,
+                  strong: bool = False,
+                  workers: int | None = None) -> term.AST | LambdaError:
     tokens = tkz.tokenize(raw_term)
 
     if isinstance(tokens, LambdaError):
         return tokens
 
-    return eval_tokens(tokens)
+    return eval_tokens(tokens, cache, strategy, limits, stats, strong,
+                       workers)
+
+
+def eval_tokens(tokens: list[tkz.Token],
+                cache: nfc.NormalFormCache | None = None,
+                strategy: Strategy = Strategy.NORMAL,
+                limits: lim.Limits | None = None,
+                stats: Stats | None = None,
+                strong: bool = False,
+                workers: int | None = None) -> term.AST | err.LambdaError:
+    """A shortcut to get an AST right away from some tokens.
+
+    CACHE, if given, is handed on to 'beta_reduce'; it's only used by
+    the NORMAL STRATEGY.
+
+    If the reduction exceeds any of LIMITS, the LambdaError reporting
+    it is returned, along with the statistics gathered up to then.
+
+    If STATS is given, the statistics of the reduction are recorded in
+    it.
+
+    If STRONG is true, the result is reduced all the way to normal
+    form. It's handed on to 'beta_reduce' and 'nbe_reduce', and so
+    only applies to the NORMAL, NBE and NATIVE STRATEGY.
 
+    WORKERS, if given along with STRONG, is the number of workers to
+    spread the normalization across (see 'parallel_reduce'). Steps
+    taken by other workers can't be metered, so it can't be given
+    along with LIMITS or STATS.
 
-def eval_tokens(tokens: list[tkz.Token]) -> term.AST | err.LambdaError:
-    """A shortcut to get an AST right away from some tokens."""
+    """
+
+    ast = parse_tokens(tokens)
+
+    if isinstance(ast, err.LambdaError):
+        return ast
+
+    return eval_ast(ast, cache, strategy, limits, stats, strong, workers)
+
+
+def parse_tokens(tokens: list[tkz.Token]) -> term.AST | err.LambdaError:
+    """Parse TOKENS, which should make up exactly one term."""
 
     _parsed = parse.parse_term(tokens, 0, [])
 
@@ -28,4 +111,43 @@ def eval_tokens(tokens: list[tkz.Token]) -> term.AST | err.LambdaError:
     if num_tokens < len(tokens):
         return err.error(tokens, num_tokens, err.Err.TRAILING_GARBAGE)
 
-    return beta.beta_reduce(ast)
+    return ast
+
+
+def eval_ast(ast: term.AST,
+             cache: nfc.NormalFormCache | None = None,
+             strategy: Strategy = Strategy.NORMAL,
+             limits: lim.Limits | None = None,
+             stats: Stats | None = None,
+             strong: bool = False,
+             workers: int | None = None) -> term.AST | err.LambdaError:
+    """Reduce AST, which has already been parsed.
+
+    The arguments are as for 'eval_tokens'.
+
+    """
+
+    try:
+        if strategy is Strategy.NEED:
+            return lazy.lazy_reduce(ast, limits, stats)
+
+        if strategy is Strategy.KRIVINE:
+            return krivine.krivine_reduce(ast, limits, stats)
+
+        if strategy is Strategy.NBE:
+            return nbe.nbe_reduce(ast, limits, stats, strong=strong)
+
+        if strategy is Strategy.NATIVE:
+            return nbe.nbe_reduce(ast, limits, stats, natives=True,
+                                  strong=strong)
+
+        if strong and workers is not None:
+            if limits is not None or stats is not None:
+                raise ValueError("Workers can't be metered, so can't be "
+                                 "given along with limits or stats")
+
+            return parallel.parallel_reduce(ast, workers)
+
+        return beta.beta_reduce(ast, cache, limits, stats, strong)
+    except err.LambdaError as e:
+        return e
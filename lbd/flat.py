@@ -0,0 +1,247 @@
+import enum
+from dataclasses import dataclass
+
+import numpy as np
+
+import lbd.term as term
+
+# A flat encoding of terms, for working on large terms in bulk.
+#
+# A term's nodes are laid out in preorder across parallel NumPy arrays,
+# so that an operation touching every name (such as shifting) becomes
+# a single vectorized expression over those arrays, rather than a walk
+# over the term's nodes.
+#
+# Unlike interned terms, a flat term doesn't share repeated subterms:
+# every occurrence is laid out in full. Converting a term with a lot
+# of sharing can therefore take far more space than the term itself.
+
+
+class Tag(enum.IntEnum):
+    """The kind of each node in a flat term."""
+
+    NAME = 0
+    ABSTRACTION = 1
+    APPLICATION = 2
+    ASSIGNMENT = 3
+    EMPTY = 4
+
+
+@dataclass(frozen=True)
+class FlatTerm():
+    """A term, laid out in preorder.
+
+    TAGS: the Tag of each node.
+
+    INDICES: the de Bruijn index of each name; zero for other nodes.
+
+    SIZES: the number of nodes in the subterm rooted at each node.
+    The first child of node I is at I + 1, and the second one, if any,
+    at I + 1 + SIZES[I + 1].
+
+    BINDERS: the number of abstractions enclosing each node, within
+    the term.
+
+    The arrays are never modified once the term is built, so terms
+    derived from one another may share them.
+
+    """
+
+    tags: np.ndarray
+    indices: np.ndarray
+    sizes: np.ndarray
+    binders: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+def from_ast(ast: term.AST) -> FlatTerm:
+    """Lay out AST as a flat term."""
+
+    tags: list[int] = []
+    indices: list[int] = []
+    sizes: list[int] = []
+    binders: list[int] = []
+
+    # Terms know their own sizes, which are exactly the number of
+    # slots they take up here.
+    stack: list[tuple[term.AST, int]] = [(ast, 0)]
+
+    while stack:
+        node, depth = stack.pop()
+        kind = type(node)
+
+        binders.append(depth)
+        sizes.append(node.size)
+
+        if kind is term.Name:
+            tags.append(Tag.NAME)
+            indices.append(node.index)
+            continue
+
+        indices.append(0)
+
+        if kind is term.Abstraction:
+            tags.append(Tag.ABSTRACTION)
+            stack.append((node.body, depth + 1))
+
+        elif kind is term.Application:
+            tags.append(Tag.APPLICATION)
+            stack.append((node.right, depth))
+            stack.append((node.left, depth))
+
+        elif kind is term.Assignment:
+            tags.append(Tag.ASSIGNMENT)
+            stack.append((node.value, depth))
+            stack.append((node.name, depth))
+
+        elif kind is term.Empty:
+            tags.append(Tag.EMPTY)
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+    return FlatTerm(np.array(tags, dtype=np.int8),
+                    np.array(indices, dtype=np.int64),
+                    np.array(sizes, dtype=np.int64),
+                    np.array(binders, dtype=np.int64))
+
+
+def to_ast(flat: FlatTerm) -> term.AST:
+    """Rebuild the term laid out in FLAT."""
+
+    tags = flat.tags.tolist()
+    indices = flat.indices.tolist()
+
+    # Scanning preorder backwards meets every node after its subterms,
+    # with its first subterm on top of the results.
+    results: list[term.AST] = []
+
+    for position in range(len(tags) - 1, -1, -1):
+        tag = tags[position]
+
+        if tag == Tag.NAME:
+            results.append(term.Name(indices[position]))
+
+        elif tag == Tag.ABSTRACTION:
+            results.append(term.Abstraction(results.pop()))
+
+        elif tag == Tag.APPLICATION:
+            left = results.pop()
+            right = results.pop()
+            results.append(term.Application(left, right))
+
+        elif tag == Tag.ASSIGNMENT:
+            name = results.pop()
+            value = results.pop()
+
+            assert isinstance(name, term.Name)
+
+            results.append(term.Assignment(name, value))
+
+        else:
+            results.append(term.Empty())
+
+    return results.pop()
+
+
+def _free(flat: FlatTerm, minimum: int) -> np.ndarray:
+    """Mask the names of FLAT that are free, plus at least MINIMUM."""
+
+    return (flat.tags == Tag.NAME) & (flat.indices >= flat.binders + minimum)
+
+
+def shift(flat: FlatTerm, amount: int, minimum: int) -> FlatTerm:
+    """Shift names of at least MINIMUM value inside FLAT by AMOUNT.
+
+    This is the flat counterpart of 'beta._shift'.
+
+    """
+
+    indices = flat.indices + amount * _free(flat, minimum)
+
+    return FlatTerm(flat.tags, indices, flat.sizes, flat.binders)
+
+
+def inc(flat: FlatTerm, minimum: int) -> FlatTerm:
+    """Shift names of at least MINIMUM value inside FLAT up by 1."""
+
+    return shift(flat, 1, minimum)
+
+
+def dec(flat: FlatTerm, minimum: int) -> FlatTerm:
+    """Shift names of at least MINIMUM value inside FLAT down by 1."""
+
+    return shift(flat, -1, minimum)
+
+
+def _splice(flat: FlatTerm,
+            indices: np.ndarray,
+            targets: np.ndarray,
+            argument: FlatTerm) -> FlatTerm:
+    """Put a copy of ARGUMENT in place of each name of FLAT in TARGETS.
+
+    INDICES stands in for FLAT's own indices. Each copy has its free
+    names shifted up by the number of binders it ends up under.
+
+    """
+
+    if not targets.any():
+        return FlatTerm(flat.tags, indices, flat.sizes, flat.binders)
+
+    # Every node of FLAT is repeated once, apart from the targets,
+    # which are repeated once for every node of ARGUMENT. SOURCE maps
+    # each node of the result to the node of FLAT it comes from, and
+    # WITHIN to its place in the copy of ARGUMENT, if it's in one.
+    counts = np.where(targets, len(argument), 1)
+    source = np.repeat(np.arange(len(flat)), counts)
+    starts = np.cumsum(counts) - counts
+    within = np.arange(len(source)) - starts[source]
+    copied = targets[source]
+
+    depth = flat.binders[source]
+    free = _free(argument, 0)[within]
+
+    # The subterm of every node of FLAT grows by ARGUMENT's size, less
+    # the name it replaces, for each target inside it.
+    before = np.concatenate(([0], np.cumsum(targets)))
+    ends = np.arange(len(flat)) + flat.sizes
+    grown = flat.sizes + (len(argument) - 1) * (before[ends] - before[:-1])
+
+    return FlatTerm(
+        np.where(copied, argument.tags[within], flat.tags[source]),
+        np.where(copied, argument.indices[within] + depth * free,
+                 indices[source]),
+        np.where(copied, argument.sizes[within], grown[source]),
+        np.where(copied, argument.binders[within] + depth, depth))
+
+
+def replace(flat: FlatTerm, argument: FlatTerm, target_index: int) -> FlatTerm:
+    """Replace TARGET_INDEX inside FLAT with ARGUMENT.
+
+    This is the flat counterpart of 'beta.replace'.
+
+    """
+
+    targets = ((flat.tags == Tag.NAME)
+               & (flat.indices == flat.binders + target_index))
+
+    return _splice(flat, flat.indices, targets, argument)
+
+
+def contract(body: FlatTerm, argument: FlatTerm) -> FlatTerm:
+    """Substitute ARGUMENT for the binder of BODY.
+
+    This is the flat counterpart of 'beta.contract', and likewise
+    equal to
+
+    dec(replace(body, inc(argument, 0), 0), 0)
+
+    """
+
+    names = body.tags == Tag.NAME
+    targets = names & (body.indices == body.binders)
+    indices = body.indices - (names & (body.indices > body.binders))
+
+    return _splice(body, indices, targets, argument)
@@ -5,13 +5,51 @@ import lbd.term as term
 
 @dataclass
 class Symbol():
-    """Associate a symbol name with its definition."""
+    """Associate a symbol name with its definition.
+
+    AST is the definition as given. VALUE caches what AST reduces to,
+    once it has been reduced; it's None until then, and again whenever
+    AST, or the definition of any global it relies on, changes.
+
+    USES holds the indices of the globals AST refers to.
+
+    """
     label: str
     ast: "term.AST" = field(default_factory=lambda: term.Empty())
+    value: "term.AST | None" = None
+    uses: set[int] = field(default_factory=set)
 
 
 _gamma: list[Symbol] = []
 
+# Maps each label in '_gamma' to its index there, so that symbols can
+# be found by name without scanning the list. Symbols are never
+# removed one at a time, so the two only ever change together in
+# 'sym_declare' and 'clear_gamma'.
+_labels: dict[str, int] = {}
+
+# The reverse of each symbol's USES: maps the index of a symbol to the
+# indices of the symbols whose definitions refer to it.
+_users: dict[int, set[int]] = {}
+
+# Bumped whenever a definition in gamma changes, so that anything
+# derived from the definitions (for example, cached normal forms) can
+# tell when it has gone stale. Caching a symbol's value doesn't count
+# as a change.
+_generation = 0
+
+
+def generation() -> int:
+    """Return the current generation of gamma's definitions."""
+
+    return _generation
+
+
+def _bump() -> None:
+    global _generation
+
+    _generation += 1
+
 
 def gamma(target: str) -> int | None:
     """Return the index of FREE_NAME inside gamma.
@@ -20,19 +58,13 @@ def gamma(target: str) -> int | None:
 
     """
 
-    for i, sym in enumerate(_gamma):
-        label = sym.label
-
-        if label == target:
-            return i
-
-    return None
+    return _labels.get(target)
 
 
 def sym_get(index: int) -> Symbol | None:
     try:
         return _gamma[index]
-    except ValueError:
+    except IndexError:
         return None
 
 
@@ -48,10 +80,34 @@ def sym_declare(free_name: str) -> int:
 
     new_symbol = Symbol(free_name)
     _gamma.append(new_symbol)
+    _labels[free_name] = len(_gamma) - 1
 
     return len(_gamma) - 1
 
 
+def size() -> int:
+    """Return the number of symbols declared."""
+
+    return len(_gamma)
+
+
+def truncate(count: int) -> None:
+    """Forget every symbol declared after the first COUNT.
+
+    This undoes declarations made in passing, such as by parsing a
+    term that's then thrown away; the symbols forgotten are expected
+    to have no definitions.
+
+    """
+
+    for idx in range(count, len(_gamma)):
+        del _labels[_gamma[idx].label]
+        _users.pop(idx, None)
+
+    del _gamma[count:]
+    _bump()
+
+
 def sym_set(sym_name: str, ast: "term.AST") -> bool:
     """Set the definition of SYM_NAME to AST.
 
@@ -64,11 +120,105 @@ def sym_set(sym_name: str, ast: "term.AST") -> bool:
     if idx is None:
         return False
 
-    _gamma[idx].ast = ast
+    sym_set_at(idx, ast)
 
     return True
 
 
+def sym_set_at(index: int, ast: "term.AST") -> None:
+    """Set the definition of the symbol at INDEX to AST.
+
+    This is 'sym_set' for callers that already know where the symbol
+    is, such as the reducer writing back a global's value.
+
+    INDEX is expected to be a valid index into _gamma.
+
+    """
+
+    sym = _gamma[index]
+
+    _invalidate(index)
+
+    for used in sym.uses:
+        _users[used].discard(index)
+
+    sym.ast = ast
+    sym.uses = _uses(ast)
+
+    for used in sym.uses:
+        _users.setdefault(used, set()).add(index)
+
+    _bump()
+
+
+def sym_set_value(index: int, value: "term.AST") -> None:
+    """Cache VALUE as what the definition at INDEX reduces to.
+
+    INDEX is expected to be a valid index into _gamma.
+
+    """
+
+    _gamma[index].value = value
+
+
+def _invalidate(index: int) -> None:
+    """Drop the cached values of INDEX and of every symbol relying on it.
+
+    A symbol relies on another one if its definition refers to it,
+    either directly or through the definitions of other symbols.
+
+    """
+
+    pending = [index]
+    seen = {index}
+
+    while pending:
+        idx = pending.pop()
+        _gamma[idx].value = None
+
+        for user in _users.get(idx, ()):
+            if user not in seen:
+                seen.add(user)
+                pending.append(user)
+
+
+def _uses(ast: "term.AST") -> set[int]:
+    """Return the indices of the globals AST refers to."""
+
+    uses: set[int] = set()
+
+    # Terms are shared, so the same subterm may turn up many times;
+    # it only needs visiting once for each depth it's found at.
+    seen: set[tuple[int, int]] = set()
+    stack: list[tuple["term.AST", int]] = [(ast, 0)]
+
+    while stack:
+        node, depth = stack.pop()
+
+        if (id(node), depth) in seen:
+            continue
+
+        seen.add((id(node), depth))
+
+        match node:
+            case term.Name(index=index):
+                if index >= depth:
+                    uses.add(index - depth)
+
+            case term.Abstraction(body=body):
+                stack.append((body, depth + 1))
+
+            case term.Application(left=left, right=right):
+                stack.append((left, depth))
+                stack.append((right, depth))
+
+            case term.Assignment(name=name, value=value):
+                stack.append((name, depth))
+                stack.append((value, depth))
+
+    return uses
+
+
 def sym_find(sym_name: str) -> "term.AST | None":
     """Find the AST value associated with SYM_NAME."""
 
@@ -91,10 +241,41 @@ def sym_clear(index: int) -> None:
 
     """
 
-    _gamma[index].ast = term.Empty()
+    sym_set_at(index, term.Empty())
 
 
 def clear_gamma() -> None:
     """Reset gamma to an empty list."""
 
     _gamma.clear()
+    _labels.clear()
+    _users.clear()
+    _bump()
+
+
+Snapshot = list[tuple[str, "term.AST", "term.AST | None"]]
+
+
+def snapshot() -> Snapshot:
+    """Return the label, definition and cached value of every symbol.
+
+    Terms are never modified, so the snapshot is unaffected by later
+    changes to gamma.
+
+    """
+
+    return [(sym.label, sym.ast, sym.value) for sym in _gamma]
+
+
+def restore(symbols: Snapshot) -> None:
+    """Replace gamma with the symbols of a snapshot taken earlier."""
+
+    clear_gamma()
+
+    for label, ast, _ in symbols:
+        sym_set_at(sym_declare(label), ast)
+
+    # Setting a definition drops the values of the symbols relying on
+    # it, so the values go in once all the definitions are in place.
+    for index, (_, _, value) in enumerate(symbols):
+        _gamma[index].value = value
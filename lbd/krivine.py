@@ -0,0 +1,259 @@
+import enum
+from typing import Any
+
+import lbd.gamma as g
+import lbd.limits as lim
+import lbd.term as term
+from lbd.quote import quote
+from lbd.stats import Stats
+
+# A Krivine machine.
+#
+# The machine's state is a term, the environment it's to be read in,
+# and a stack of the arguments it's been applied to. Each argument is
+# a closure: the term it was given as, paired with the environment it
+# was given in. Entering an abstraction takes the topmost argument off
+# the stack and binds it in the environment, and reaching a bound name
+# carries on with the closure it's bound to. Terms are never copied or
+# shifted; the only terms ever built are those of the result.
+#
+# This is call-by-name: unlike 'lazy_reduce', a closure isn't updated
+# with its value once it has been reduced, and is reduced again each
+# time it's needed.
+#
+# Environments are linked lists, so that binding an argument doesn't
+# copy the environment: either None, or a triple of the closure bound
+# innermost, the rest of the environment, and the environment's size.
+#
+# Results are read back into ordinary terms, and are the same as those
+# of 'beta_reduce': closures are read back as the terms they were
+# built from, just as normal order would have substituted them.
+
+Env = tuple["Closure", Any, int] | None
+
+
+class Closure():
+    """AST, paired with the environment ENV it's to be read in.
+
+    READBACKS holds the closure's term as read back so far, keyed by
+    the depth it was read back at; it's None until then.
+
+    """
+
+    __slots__ = ("ast", "env", "readbacks")
+
+    def __init__(self, ast: term.AST, env: Env):
+        self.ast = ast
+        self.env = env
+        self.readbacks: dict[int, term.AST] | None = None
+
+
+def _size(env: Env) -> int:
+    return 0 if env is None else env[2]
+
+
+def _bind(closure: Closure, env: Env) -> Env:
+    return (closure, env, _size(env) + 1)
+
+
+def _lookup(env: Env, index: int) -> Closure:
+    """Return the closure INDEX bindings into ENV."""
+
+    for _ in range(index):
+        assert env is not None
+        env = env[1]
+
+    assert env is not None
+
+    return env[0]
+
+
+def _quote(ast: term.AST, env: Env, depth: int) -> term.AST:
+    """Read back AST in ENV as a term to be placed under DEPTH binders."""
+
+    return quote(ast, env, depth, _size, _lookup)
+
+
+def readback(value: "Closure | term.AST") -> term.AST:
+    """Turn VALUE back into an ordinary term."""
+
+    if type(value) is Closure:
+        return _quote(value.ast, value.env, 0)
+
+    return value
+
+
+class _Cont(enum.Enum):
+    """Tags for the frames on the machine's stack, besides arguments.
+
+    REBUILD: the head of an application turned out not to be an
+    abstraction, and one of its arguments is being reduced; the frame
+    holds a single term, the head applied to the arguments before
+    that one, each of them already reduced and read back.
+
+    STORE: a global's definition is being reduced; the frame holds the
+    global's index into gamma, so that the result can be cached there,
+    along with gamma's generation at the time.
+
+    """
+
+    REBUILD = enum.auto()
+    STORE = enum.auto()
+
+
+def krivine_reduce(ast: term.AST,
+                   limits: "lim.Limits | None" = None,
+                   stats: "Stats | None" = None) -> term.AST:
+    """Evaluate AST on a Krivine machine.
+
+    Return the reduced AST, which is the same as the one 'beta_reduce'
+    would return.
+
+    LIMITS and STATS are as for 'beta_reduce'.
+
+    """
+
+    meter = None
+
+    if limits is not None or stats is not None:
+        meter = lim.Budget(limits, stats)
+
+    result = _reduce(ast, meter)
+
+    if meter is not None:
+        meter.finish()
+
+    return result
+
+
+def _reduce(ast: term.AST, meter: "lim.Budget | None") -> term.AST:
+    """Do the work of 'krivine_reduce', charging each step to METER."""
+
+    # Arguments are pushed as closures; anything else on the stack is
+    # a frame tagged with '_Cont'.
+    stack: list[Any] = []
+    current = ast
+    env: Env = None
+
+    while True:
+        # Run the machine until CURRENT yields a value: either a
+        # closure over an abstraction, or a term that has already been
+        # read back.
+        match current:
+            case term.Application() as app:
+                right = app.right
+
+                # Passing on a bound name passes on its closure, rather
+                # than a closure over the name.
+                if type(right) is term.Name and right.index < _size(env):
+                    stack.append(_lookup(env, right.index))
+                else:
+                    stack.append(Closure(right, env))
+
+                current = app.left
+
+                if meter is not None and len(stack) > meter.stats.max_spine:
+                    meter.stats.max_spine = len(stack)
+
+                continue
+
+            case term.Abstraction() as abstr:
+                if stack and type(stack[-1]) is Closure:
+                    if meter is not None:
+                        meter.stats.contractions += 1
+                        meter.step()
+
+                    env = _bind(stack.pop(), env)
+                    current = abstr.body
+                    continue
+
+                value: Closure | term.AST = Closure(abstr, env)
+
+            case term.Name() as name if name.index < _size(env):
+                closure = _lookup(env, name.index)
+                current, env = closure.ast, closure.env
+                continue
+
+            # As in 'beta_reduce', a name that isn't bound by the
+            # environment is a global, and is reduced in an empty
+            # environment.
+            case term.Name() as name:
+                idx = name.index - _size(env)
+                sym = g.sym_get(idx)
+
+                if sym is None:
+                    raise ValueError(f"Undefined free symbol (freeness {idx})")
+
+                elif sym.ast is None:
+                    raise ValueError(f"Unassigned free symbol '{sym.label}'")
+
+                if meter is not None:
+                    meter.stats.lookups += 1
+                    meter.step()
+
+                if sym.value is not None:
+                    current = sym.value
+                else:
+                    if type(sym.ast) is not term.Abstraction:
+                        stack.append((_Cont.STORE, (idx, g.generation())))
+
+                    current = sym.ast
+
+                env = None
+                continue
+
+            case term.Assignment() as assign:
+                idx = assign.name.index - _size(env)
+                sym = g.sym_get(idx) if idx >= 0 else None
+
+                if sym is None:
+                    raise ValueError(
+                        f"Fatal: '{assign.name}' isn't a free symbol")
+
+                assigned = _quote(assign.value, env, 0)
+                g.sym_set_at(idx, assigned)
+
+                if type(assigned) is term.Abstraction:
+                    value = Closure(assigned, None)
+                else:
+                    value = assigned
+
+            case term.Empty() as empty:
+                value = empty
+
+            case _:
+                raise ValueError(f"Fatal: invalid ast-kind: {current}")
+
+        # Hand VALUE to whatever is on the stack, until there's a new
+        # term to run.
+        while stack:
+            top = stack.pop()
+
+            if type(top) is Closure:
+                if type(value) is Closure:
+                    if meter is not None:
+                        meter.stats.contractions += 1
+                        meter.step()
+
+                    current = value.ast.body
+                    env = _bind(top, value.env)
+                    break
+
+                # The head is stuck, so its arguments are reduced in
+                # turn, as 'beta_reduce' does.
+                stack.append((_Cont.REBUILD, value))
+                current, env = top.ast, top.env
+                break
+
+            cont, payload = top
+
+            if cont is _Cont.REBUILD:
+                value = term.Application(payload, readback(value))
+
+            else:
+                idx, generation = payload
+
+                if generation == g.generation():
+                    g.sym_set_value(idx, readback(value))
+        else:
+            return readback(value)
@@ -0,0 +1,262 @@
+import enum
+import operator
+from dataclasses import dataclass
+from typing import Any
+
+import lbd.gamma as g
+import lbd.limits as lim
+import lbd.term as term
+from lbd.quote import quote
+from lbd.stats import Stats
+
+# Call-by-need reduction.
+#
+# Rather than substituting an argument into every occurrence of its
+# binder, as 'beta_reduce' does, this reducer pairs terms with
+# environments of thunks. A thunk holds an unevaluated argument, and
+# is shared by every occurrence of the binder; the first occurrence to
+# need its value reduces it and stores the result in the thunk, so
+# that an argument is reduced at most once.
+#
+# Results are read back into ordinary terms, and are the same as those
+# of 'beta_reduce': thunks are read back as the arguments they were
+# built from, just as normal order would have copied them, while their
+# stored values only stand in for reductions that normal order would
+# have repeated.
+
+Env = tuple["Thunk", ...]
+
+
+@dataclass(slots=True, eq=False)
+class Thunk():
+    """A shared, updatable suspension of AST in ENV.
+
+    VALUE is set once the thunk has been forced. READBACKS holds the
+    thunk's term as read back so far, keyed by the depth it was read
+    back at; it's None until then.
+
+    """
+
+    ast: term.AST
+    env: Env
+    value: "Value | None" = None
+    readbacks: dict[int, term.AST] | None = None
+
+
+@dataclass(slots=True, eq=False)
+class Closure():
+    """An abstraction, paired with the environment it was reached in."""
+
+    ast: term.Abstraction
+    env: Env
+
+
+# A value is either a closure or, when reduction stopped at something
+# other than an abstraction, a term that has already been read back.
+Value = Closure | term.AST
+
+
+def _quote(ast: term.AST, env: Env, depth: int) -> term.AST:
+    """Read back AST in ENV as a term to be placed under DEPTH binders."""
+
+    return quote(ast, env, depth, len, operator.getitem)
+
+
+def readback(value: Value) -> term.AST:
+    """Turn VALUE back into an ordinary term."""
+
+    if type(value) is Closure:
+        return _quote(value.ast, value.env, 0)
+
+    return value
+
+
+def _value(ast: term.AST) -> Value:
+    """Wrap a read-back term AST as a value."""
+
+    if type(ast) is term.Abstraction:
+        return Closure(ast, ())
+
+    return ast
+
+
+def _suspend(ast: term.AST, env: Env) -> Thunk:
+    """Suspend AST in ENV, reusing the thunk of a bound name."""
+
+    if type(ast) is term.Name and ast.index < len(env):
+        return env[ast.index]
+
+    thunk = Thunk(ast, env)
+
+    if type(ast) is term.Abstraction:
+        thunk.value = Closure(ast, env)
+
+    return thunk
+
+
+class _Cont(enum.Enum):
+    """Tags for the continuation frames used by 'lazy_reduce'.
+
+    ARGUMENT: the head of an application is being reduced; the frame
+    holds the thunk of the application's right-hand side.
+
+    REBUILD: the head turned out not to be an abstraction, and the
+    right-hand side is being reduced; the frame holds the read-back
+    head.
+
+    UPDATE: a thunk is being forced; the frame holds the thunk, so
+    that its value can be stored in it.
+
+    STORE: a global's definition is being reduced; the frame holds the
+    global's index into gamma, so that the result can be cached there,
+    along with gamma's generation at the time.
+
+    """
+
+    ARGUMENT = enum.auto()
+    REBUILD = enum.auto()
+    UPDATE = enum.auto()
+    STORE = enum.auto()
+
+
+def lazy_reduce(ast: term.AST,
+                limits: "lim.Limits | None" = None,
+                stats: "Stats | None" = None) -> term.AST:
+    """Evaluate AST using call-by-need reduction.
+
+    Return the reduced AST, which is the same as the one 'beta_reduce'
+    would return.
+
+    LIMITS and STATS are as for 'beta_reduce'.
+
+    """
+
+    meter = None
+
+    if limits is not None or stats is not None:
+        meter = lim.Budget(limits, stats)
+
+    result = _reduce(ast, meter)
+
+    if meter is not None:
+        meter.finish()
+
+    return result
+
+
+def _reduce(ast: term.AST, meter: "lim.Budget | None") -> term.AST:
+    """Do the work of 'lazy_reduce', charging each step to METER."""
+
+    stack: list[tuple[_Cont, Any]] = []
+    current = ast
+    env: Env = ()
+
+    while True:
+        # Descend into CURRENT until it yields a value, pushing a
+        # continuation frame for whatever remains to be done with it.
+        match current:
+            case term.Application() as app:
+                stack.append((_Cont.ARGUMENT, _suspend(app.right, env)))
+                current = app.left
+
+                if meter is not None and len(stack) > meter.stats.max_spine:
+                    meter.stats.max_spine = len(stack)
+
+                continue
+
+            case term.Abstraction() as abstr:
+                value = Closure(abstr, env)
+
+            case term.Name() as name if name.index < len(env):
+                thunk = env[name.index]
+
+                if thunk.value is not None:
+                    value = thunk.value
+                else:
+                    stack.append((_Cont.UPDATE, thunk))
+                    current, env = thunk.ast, thunk.env
+                    continue
+
+            # As in 'beta_reduce', a name that isn't bound by the
+            # environment is a global, and is reduced in an empty
+            # environment.
+            case term.Name() as name:
+                idx = name.index - len(env)
+                sym = g.sym_get(idx)
+
+                if sym is None:
+                    raise ValueError(f"Undefined free symbol (freeness {idx})")
+
+                elif sym.ast is None:
+                    raise ValueError(f"Unassigned free symbol '{sym.label}'")
+
+                if meter is not None:
+                    meter.stats.lookups += 1
+                    meter.step()
+
+                if sym.value is not None:
+                    value = _value(sym.value)
+                else:
+                    if type(sym.ast) is not term.Abstraction:
+                        stack.append((_Cont.STORE, (idx, g.generation())))
+
+                    current, env = sym.ast, ()
+                    continue
+
+            case term.Assignment() as assign:
+                idx = assign.name.index - len(env)
+                sym = g.sym_get(idx) if idx >= 0 else None
+
+                if sym is None:
+                    raise ValueError(
+                        f"Fatal: '{assign.name}' isn't a free symbol")
+
+                assigned = _quote(assign.value, env, 0)
+                g.sym_set_at(idx, assigned)
+
+                value = _value(assigned)
+
+            case term.Empty() as empty:
+                value = empty
+
+            case _:
+                raise ValueError(f"Fatal: invalid ast-kind: {current}")
+
+        # Hand VALUE to the pending continuations, until one of them
+        # produces a new term to reduce.
+        while stack:
+            cont, payload = stack.pop()
+
+            if cont is _Cont.ARGUMENT:
+                if type(value) is Closure:
+                    if meter is not None:
+                        meter.stats.contractions += 1
+                        meter.step()
+
+                    current = value.ast.body
+                    env = (payload, *value.env)
+                    break
+
+                stack.append((_Cont.REBUILD, value))
+
+                if payload.value is not None:
+                    value = payload.value
+                    continue
+
+                stack.append((_Cont.UPDATE, payload))
+                current, env = payload.ast, payload.env
+                break
+
+            elif cont is _Cont.REBUILD:
+                value = term.Application(payload, readback(value))
+
+            elif cont is _Cont.UPDATE:
+                payload.value = value
+
+            else:
+                idx, generation = payload
+
+                if generation == g.generation():
+                    g.sym_set_value(idx, readback(value))
+        else:
+            return readback(value)
@@ -0,0 +1,110 @@
+import time
+from dataclasses import dataclass
+
+import lbd.term as term
+from lbd.error import Err, LambdaError
+from lbd.stats import Stats
+
+
+@dataclass
+class Limits():
+    """Bounds on what a single reduction may cost.
+
+    STEPS: the number of beta contractions and unfoldings of global
+    definitions.
+
+    SECONDS: wall-clock time.
+
+    NODES: the number of distinct terms created by the reduction, as
+    counted beyond the fewest terms alive at any point since it
+    started. Terms the reduction leaves behind in memo tables count
+    for as long as they're kept: the contractions 'beta_reduce'
+    remembers, a normal-form cache, and the values of globals.
+    Call-by-need reduction builds few terms, as its arguments are
+    held in thunks instead, so this limit does little to bound it.
+
+    A limit of None means no limit.
+
+    """
+
+    steps: int | None = None
+    seconds: float | None = None
+    nodes: int | None = None
+
+
+# Reading the clock on every step would cost more than the step
+# itself, so the deadline is only checked every so many steps.
+_CLOCK_INTERVAL = 64
+
+
+class Budget():
+    """Meter a reduction, charging its steps against LIMITS.
+
+    The counts are kept in STATS, if given, or else in a fresh Stats
+    record. Once a limit is exceeded, 'step' raises a LambdaError
+    carrying the statistics gathered so far.
+
+    """
+
+    __slots__ = ("limits", "stats", "start", "created", "live", "deadline")
+
+    def __init__(self, limits: Limits | None = None,
+                 stats: Stats | None = None):
+        self.limits = Limits() if limits is None else limits
+        self.stats = Stats() if stats is None else stats
+        self.start = time.monotonic()
+        self.created = term.created()
+
+        # The fewest terms alive so far, which is at least the number
+        # of terms from before the reduction that are still alive.
+        self.live = term.live()
+
+        self.deadline = None
+
+        if self.limits.seconds is not None:
+            self.deadline = self.start + self.limits.seconds
+
+    def step(self) -> None:
+        stats = self.stats
+        stats.steps += 1
+        limits = self.limits
+
+        if limits.steps is not None and stats.steps > limits.steps:
+            self._exceeded(Err.STEP_LIMIT, f"{limits.steps} steps")
+
+        if (self.deadline is not None
+                and stats.steps % _CLOCK_INTERVAL == 0
+                and time.monotonic() > self.deadline):
+            self._exceeded(Err.DEADLINE, f"{limits.seconds}s")
+
+        if limits.nodes is not None:
+            live = term.live()
+
+            if live < self.live:
+                self.live = live
+            elif live - self.live > limits.nodes:
+                self._exceeded(Err.NODE_LIMIT, f"{limits.nodes} terms")
+
+    def finish(self) -> Stats:
+        """Fill in the statistics that are measured rather than counted.
+
+        Return the statistics.
+
+        """
+
+        stats = self.stats
+        stats.elapsed = time.monotonic() - self.start
+        stats.allocated = term.created() - self.created
+        live = term.live()
+        self.live = min(self.live, live)
+        stats.nodes = live - self.live
+
+        return stats
+
+    def _exceeded(self, kind: Err, limit: str) -> None:
+        stats = self.finish()
+        message = (f"{kind.value} ({limit})\n"
+                   f"{stats.steps} steps, {stats.elapsed:.3f}s, "
+                   f"{stats.nodes} terms")
+
+        raise LambdaError(kind, -1, message, stats)
@@ -0,0 +1,243 @@
+import enum
+from typing import Any
+
+import lbd.gamma as g
+import lbd.term as term
+
+# Recognizing the prelude's encodings of booleans and naturals.
+#
+# The prelude encodes the booleans as the selectors 'first' and
+# 'second', and the naturals as 'zero := \x.x' and 'succ n :=
+# \s.(s false n)', with arithmetic and comparisons built up from
+# those. A global whose definition has exactly the shape of one of
+# these definitions is given the corresponding role, whatever it's
+# called, so that 'nbe' can carry out the operation natively.
+#
+# The shapes are given as templates, in which ints are de Bruijn
+# indices, roles stand for any term with that role (a global, or the
+# role's own template written out in place), and pairs tagged "lam"
+# and "app" are abstractions and applications.
+
+
+class Role(enum.Enum):
+    """The definitions of the prelude that can be recognized."""
+
+    FIRST = enum.auto()
+    SECOND = enum.auto()
+    ZERO = enum.auto()
+    IF = enum.auto()
+    NOT = enum.auto()
+    ISZERO = enum.auto()
+    SUCC = enum.auto()
+    PRED1 = enum.auto()
+    PRED = enum.auto()
+    ADD = enum.auto()
+    SUB = enum.auto()
+    MULT = enum.auto()
+    ABS_DIFF = enum.auto()
+    EQUAL = enum.auto()
+    GREATER = enum.auto()
+    GREATER_OR_EQUAL = enum.auto()
+    LESS = enum.auto()
+    LESS_OR_EQUAL = enum.auto()
+
+
+Template = Any
+
+
+def _lam(body: Template) -> Template:
+    return ("lam", body)
+
+
+def _app(head: Template, *args: Template) -> Template:
+    for arg in args:
+        head = ("app", head, arg)
+
+    return head
+
+
+def _if(cond: Template, e1: Template, e2: Template) -> Template:
+    return _app(Role.IF, cond, e1, e2)
+
+
+_TEMPLATES: dict[Role, Template] = {
+    Role.FIRST: _lam(_lam(1)),
+    Role.SECOND: _lam(_lam(0)),
+    Role.ZERO: _lam(0),
+    Role.IF: _lam(_lam(_lam(_app(2, 1, 0)))),
+    Role.NOT: _lam(_app(0, Role.SECOND, Role.FIRST)),
+    Role.ISZERO: _lam(_app(0, Role.FIRST)),
+    Role.SUCC: _lam(_lam(_app(0, Role.SECOND, 1))),
+    Role.PRED1: _lam(_app(0, Role.SECOND)),
+    Role.PRED: _lam(_if(_app(Role.ISZERO, 0), Role.ZERO,
+                        _app(Role.PRED1, 0))),
+    Role.ADD: _lam(_lam(_if(_app(Role.ISZERO, 0), 1,
+                            _app(Role.ADD, _app(Role.SUCC, 1),
+                                 _app(Role.PRED, 0))))),
+    Role.SUB: _lam(_lam(_if(_app(Role.ISZERO, 0), 1,
+                            _app(Role.SUB, _app(Role.PRED, 1),
+                                 _app(Role.PRED, 0))))),
+    Role.MULT: _lam(_lam(_if(_app(Role.ISZERO, 0), Role.ZERO,
+                             _app(Role.ADD, 1,
+                                  _app(Role.MULT, 1, _app(Role.PRED, 0)))))),
+    Role.ABS_DIFF: _lam(_lam(_app(Role.ADD, _app(Role.SUB, 1, 0),
+                                  _app(Role.SUB, 0, 1)))),
+    Role.EQUAL: _lam(_lam(_app(Role.ISZERO, _app(Role.ABS_DIFF, 1, 0)))),
+    Role.GREATER: _lam(_lam(_app(Role.NOT,
+                                 _app(Role.ISZERO, _app(Role.SUB, 1, 0))))),
+    Role.GREATER_OR_EQUAL: _lam(_lam(_app(Role.ISZERO,
+                                          _app(Role.SUB, 0, 1)))),
+    Role.LESS: _lam(_lam(_app(Role.NOT,
+                              _app(Role.GREATER_OR_EQUAL, 1, 0)))),
+    Role.LESS_OR_EQUAL: _lam(_lam(_app(Role.NOT, _app(Role.GREATER, 1, 0)))),
+}
+
+
+# The role of each global looked up so far, for the generation of
+# gamma they were found under.
+_roles: dict[int, Role | None] = {}
+_roles_generation = -1
+
+
+def role(index: int) -> Role | None:
+    """Return the role of the global at INDEX, if it has one."""
+
+    global _roles_generation
+
+    if _roles_generation != g.generation():
+        _roles.clear()
+        _roles_generation = g.generation()
+
+    if index in _roles:
+        return _roles[index]
+
+    found = None
+
+    for candidate in Role:
+        if _has_role(index, candidate, frozenset()):
+            found = candidate
+            break
+
+    _roles[index] = found
+
+    return found
+
+
+def _has_role(index: int, role: Role,
+              assumed: frozenset[tuple[int, Role]]) -> bool:
+    """Return whether the global at INDEX has ROLE.
+
+    A definition may refer to itself, as 'add' does; while checking
+    whether a global has a role, it's ASSUMED to have it.
+
+    """
+
+    if (index, role) in assumed:
+        return True
+
+    sym = g.sym_get(index)
+
+    if sym is None:
+        return False
+
+    return _matches(_TEMPLATES[role], sym.ast, assumed | {(index, role)})
+
+
+def _matches(template: Template, ast: term.AST,
+             assumed: frozenset[tuple[int, Role]]) -> bool:
+    """Return whether AST, a closed term, has the shape of TEMPLATE."""
+
+    # Each entry holds the number of binders crossed within the
+    # template (LOCAL), and within AST (DEPTH); they differ once a
+    # role's template has been written out in place.
+    stack: list[tuple[Template, term.AST, int, int]] = [(template, ast, 0, 0)]
+
+    # Globals defined as other globals (as 'true := first') are
+    # unfolded, but only once each, in case they go round in circles.
+    unfolded: set[int] = set()
+
+    while stack:
+        template, node, local, depth = stack.pop()
+
+        if type(node) is term.Name and node.index >= depth:
+            idx = node.index - depth
+
+            if isinstance(template, Role):
+                if not _has_role(idx, template, assumed):
+                    return False
+
+                continue
+
+            sym = g.sym_get(idx)
+
+            # Only a closed template can match a global's definition,
+            # which is closed itself.
+            if local > 0 or idx in unfolded or sym is None:
+                return False
+
+            unfolded.add(idx)
+            stack.append((template, sym.ast, 0, 0))
+
+        elif isinstance(template, Role):
+            stack.append((_TEMPLATES[template], node, 0, depth))
+
+        elif type(template) is int:
+            if type(node) is not term.Name or node.index != template:
+                return False
+
+        elif template[0] == "lam":
+            if type(node) is not term.Abstraction:
+                return False
+
+            stack.append((template[1], node.body, local + 1, depth + 1))
+
+        else:
+            if type(node) is not term.Application:
+                return False
+
+            stack.append((template[1], node.left, local, depth))
+            stack.append((template[2], node.right, local, depth))
+
+    return True
+
+
+# The encodings of the booleans and the naturals, in normal form.
+TRUE = term.Abstraction(term.Abstraction(term.Name(1)))
+FALSE = term.Abstraction(term.Abstraction(term.Name(0)))
+
+_numerals: list[term.AST] = [term.Abstraction(term.Name(0))]
+
+# Each numeral holds the one before it, so keeping a numeral keeps all
+# those below it alive too. Only this many are kept; greater ones are
+# built on from the last of them, afresh each time.
+_NUMERALS_LIMIT = 1 << 10
+
+
+def encode(value: int) -> term.AST:
+    """Return the prelude's encoding of VALUE, a bool or a natural."""
+
+    if type(value) is bool:
+        return TRUE if value else FALSE
+
+    # The numerals are kept, since each one is built from the one
+    # before it anyway; they're interned, so this costs a reference
+    # apiece.
+    while len(_numerals) <= min(value, _NUMERALS_LIMIT):
+        _numerals.append(_successor(_numerals[-1]))
+
+    if value <= _NUMERALS_LIMIT:
+        return _numerals[value]
+
+    numeral = _numerals[-1]
+
+    for _ in range(value - _NUMERALS_LIMIT):
+        numeral = _successor(numeral)
+
+    return numeral
+
+
+def _successor(numeral: term.AST) -> term.AST:
+    """Return the numeral after NUMERAL."""
+
+    return term.Abstraction(term.Application(
+        term.Application(term.Name(0), FALSE), numeral))
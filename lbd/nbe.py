@@ -0,0 +1,806 @@
+import enum
+from typing import Any, Callable
+
+import lbd.gamma as g
+import lbd.limits as lim
+import lbd.native as native
+import lbd.term as term
+from lbd.quote import quote
+from lbd.stats import Stats
+
+# Normalization by evaluation.
+#
+# A term is compiled, once, into nested Python closures, each taking
+# an environment and returning what to do next with the subterm it was
+# compiled from. Running the closures evaluates the term, with Python
+# closures standing in for abstractions, so that nothing is ever
+# substituted.
+#
+# Arguments are passed as thunks, evaluated on first use and shared
+# from then on. Evaluation stops at the first value reached, and the
+# value is then read back into a term, which is the same one that
+# 'beta_reduce' returns: a function is read back as the abstraction it
+# was made from, with the thunks it closes over read back as the terms
+# they were built from, just as normal order would have substituted
+# them.
+#
+# In strong mode, functions are instead applied to fresh variables,
+# and what they return is read back in turn, as are the arguments of
+# whatever is stuck. The result is then the full normal form, reduced
+# underneath binders and inside the definitions of globals, which is
+# what 'beta_reduce' gives in strong mode. Like it, this never
+# finishes if there's no such normal form, as for a recursive global
+# whose base case depends on an argument, such as 'add' on its own.
+#
+# Optionally, globals recognized (by 'native') as the prelude's
+# booleans, naturals and operations on them are evaluated natively:
+# booleans and naturals become Python bools and ints, which only turn
+# back into functions if they're applied to something, and the
+# operations work on those directly. Read back, they give the same
+# terms as their encodings would in strong mode. A native operation
+# looks at its arguments in the order its definition does, and only
+# forces those whose values it still needs: 'mult' looks at its
+# multiplier first, and if that's zero, never at the multiplicand. An
+# argument that has already been evaluated is used as it is; if any
+# argument doesn't turn out to be a native value, the operation's
+# definition is applied to the arguments instead, and evaluated
+# lazily.
+#
+# Environments are linked lists of thunks, laid out as for the Krivine
+# machine: either None, or a triple of the thunk bound innermost, the
+# rest of the environment, and the environment's size.
+#
+# Compiled code never calls other compiled code. It returns either a
+# value, a thunk to be forced, or, to carry on with another subterm, a
+# pair of that subterm's code and its environment; applications push
+# their arguments on the stack of the evaluation before carrying on
+# with their heads. '_evaluate' runs the code and works through the
+# stack, so that neither deep terms nor long chains of contractions
+# nest Python calls.
+
+Env = tuple[Any, Any, int] | None
+Code = Callable[[Env, "_Evaluation"], Any]
+
+
+class Thunk():
+    """A shared, updatable suspension of CODE in ENV.
+
+    AST is the term CODE was compiled from, kept so that the thunk can
+    be turned back into a term without being evaluated. VALUE is set
+    once the thunk has been forced. READBACKS holds the thunk's term
+    as read back so far, keyed by the depth it was read back at; it's
+    None until then.
+
+    """
+
+    __slots__ = ("code", "env", "ast", "value", "readbacks")
+
+    def __init__(self, code: Code | None, env: Env, ast: term.AST | None,
+                 value: Any = None):
+        self.code = code
+        self.env = env
+        self.ast = ast
+        self.value = value
+        self.readbacks: dict[int, term.AST] | None = None
+
+
+class Function():
+    """The value of the abstraction AST: its compiled BODY, closed over ENV."""
+
+    __slots__ = ("body", "env", "ast")
+
+    def __init__(self, body: Code, env: Env, ast: term.AST):
+        self.body = body
+        self.env = env
+        self.ast = ast
+
+
+class Neutral():
+    """A value that can't be reduced any further.
+
+    HEAD is either the de Bruijn level of a variable bound while
+    reading back, or term.Empty(). ARGS are the thunks HEAD is applied
+    to, in order.
+
+    """
+
+    __slots__ = ("head", "args")
+
+    def __init__(self, head: int | term.Empty, args: tuple[Thunk, ...]):
+        self.head = head
+        self.args = args
+
+
+class Primitive():
+    """A native operation, applied to the thunks ARGS so far.
+
+    ROLE says which operation it is, and INDEX is the index into gamma
+    of the global it stands for.
+
+    """
+
+    __slots__ = ("role", "args", "index")
+
+    def __init__(self, role: native.Role, args: tuple[Thunk, ...],
+                 index: int):
+        self.role = role
+        self.args = args
+        self.index = index
+
+
+_CONSTANTS: dict[native.Role, int | bool] = {
+    native.Role.ZERO: 0,
+    native.Role.FIRST: True,
+    native.Role.SECOND: False,
+}
+
+_ARITIES: dict[native.Role, int] = {
+    native.Role.NOT: 1,
+    native.Role.ISZERO: 1,
+    native.Role.SUCC: 1,
+    native.Role.PRED: 1,
+    native.Role.ADD: 2,
+    native.Role.SUB: 2,
+    native.Role.MULT: 2,
+    native.Role.EQUAL: 2,
+    native.Role.GREATER: 2,
+    native.Role.GREATER_OR_EQUAL: 2,
+    native.Role.LESS: 2,
+    native.Role.LESS_OR_EQUAL: 2,
+}
+
+
+# The order in which each native operation looks at its arguments,
+# which is the order their definitions do, by position.
+_UNARY = (0,)
+_BINARY = (1, 0)
+
+
+class _Cont(enum.Enum):
+    """Tags for the frames on an evaluation's stack, besides arguments.
+
+    UPDATE: a thunk is being forced; the frame holds the thunk, so
+    that its value can be stored in it.
+
+    OPERATE: an argument of a native operation is being forced; the
+    frame holds the primitive, the values of its arguments known so
+    far (None for the rest), and the position of the one being forced.
+
+    """
+
+    UPDATE = enum.auto()
+    OPERATE = enum.auto()
+
+
+class _Evaluation():
+    """The state of a single call to 'nbe_reduce'.
+
+    METER, if given, is charged for each step. NATIVES says whether
+    native values are in use. GLOBALS holds the thunks of the globals
+    used so far, so that each is evaluated once per call, on first
+    use, and DEFINITIONS those of the definitions of the native
+    operations used so far, for when they have to be applied after
+    all. STACK is the stack '_evaluate' works through.
+
+    """
+
+    __slots__ = ("meter", "natives", "globals", "definitions", "stack")
+
+    def __init__(self, meter: "lim.Budget | None", natives: bool):
+        self.meter = meter
+        self.natives = natives
+        self.globals: dict[int, Thunk] = {}
+        self.definitions: dict[int, Thunk] = {}
+        self.stack: list[Any] = []
+
+
+def _size(env: Env) -> int:
+    return 0 if env is None else env[2]
+
+
+def _lookup(env: Env, index: int) -> Thunk:
+    """Return the thunk INDEX bindings into ENV."""
+
+    for _ in range(index):
+        assert env is not None
+        env = env[1]
+
+    assert env is not None
+
+    return env[0]
+
+
+def _source(idx: int, cached: bool = True) -> term.AST:
+    """Return the term to evaluate for the global at IDX.
+
+    That's the global's cached value, if it has one and CACHED is
+    true, and otherwise its definition.
+
+    """
+
+    sym = g.sym_get(idx)
+
+    if sym is None:
+        raise ValueError(f"Undefined free symbol (freeness {idx})")
+
+    elif sym.ast is None:
+        raise ValueError(f"Unassigned free symbol '{sym.label}'")
+
+    # The cached value, if there is one, means the same as the
+    # definition, and is closer to normal form.
+    return sym.ast if sym.value is None or not cached else sym.value
+
+
+def _global(ev: _Evaluation, idx: int) -> Thunk:
+    """Return the thunk of the global at IDX."""
+
+    thunk = ev.globals.get(idx)
+
+    if thunk is None:
+        # A cached value is only reduced to weak head normal form, so
+        # a numeral's value isn't in any shape the native operations
+        # recognize, while its definition evaluates to a native value.
+        source = _source(idx, cached=not ev.natives)
+        role = native.role(idx) if ev.natives else None
+
+        if role in _CONSTANTS:
+            thunk = Thunk(None, None, source, _CONSTANTS[role])
+        elif role in _ARITIES:
+            thunk = Thunk(None, None, source, Primitive(role, (), idx))
+        else:
+            thunk = Thunk(compile_term(source), None, source)
+
+        ev.globals[idx] = thunk
+
+    # Every use of a global counts, as it does for 'beta_reduce', even
+    # though its definition is only evaluated once: otherwise a global
+    # defined as itself would never use up a step.
+    if ev.meter is not None:
+        ev.meter.stats.lookups += 1
+        ev.meter.step()
+
+    return thunk
+
+
+def _definition(ev: _Evaluation, idx: int) -> Thunk:
+    """Return the thunk of the definition of the native operation at IDX."""
+
+    thunk = ev.definitions.get(idx)
+
+    if thunk is None:
+        source = _source(idx)
+        thunk = Thunk(compile_term(source), None, source)
+        ev.definitions[idx] = thunk
+
+    return thunk
+
+
+def _apply(ev: _Evaluation, function: Any, argument: Thunk) -> Any:
+    """Apply the value FUNCTION to ARGUMENT.
+
+    Return what to do next, as compiled code does.
+
+    """
+
+    kind = type(function)
+
+    if kind is Function:
+        if ev.meter is not None:
+            ev.meter.stats.contractions += 1
+            ev.meter.step()
+
+        env = function.env
+
+        return (function.body, (argument, env, _size(env) + 1))
+
+    if kind is Neutral:
+        return Neutral(function.head, function.args + (argument,))
+
+    if kind is Primitive:
+        args = function.args + (argument,)
+        primitive = Primitive(function.role, args, function.index)
+
+        if len(args) < _ARITIES[function.role]:
+            return primitive
+
+        return _operation(ev, primitive, [None] * len(args))
+
+    return _apply(ev, _unbox(function), argument)
+
+
+def _fall_back(ev: _Evaluation, primitive: Primitive) -> Thunk:
+    """Apply the definition of PRIMITIVE's operation to its arguments.
+
+    Return the definition, to be forced, with the arguments pushed.
+
+    """
+
+    ev.stack.extend(reversed(primitive.args))
+
+    return _definition(ev, primitive.index)
+
+
+def _wanted(role: native.Role) -> type:
+    """Return the type of the native values the operation ROLE works on."""
+
+    return bool if role is native.Role.NOT else int
+
+
+def _operation(ev: _Evaluation, primitive: Primitive, values: list[Any]) -> Any:
+    """Carry on with the saturated PRIMITIVE, given the VALUES known so far.
+
+    VALUES has the native value of each argument of PRIMITIVE that's
+    known, and None for the rest. Return what to do next, as compiled
+    code does: an argument to force, with a frame pushed to come back
+    here with its value, or else the result of the operation, or the
+    operation's definition applied to its arguments.
+
+    """
+
+    role = primitive.role
+    wanted = _wanted(role)
+
+    for position in _UNARY if len(values) == 1 else _BINARY:
+        value = values[position]
+
+        if value is None:
+            thunk = primitive.args[position]
+            value = thunk.value
+
+            if value is None:
+                ev.stack.append((_Cont.OPERATE, (primitive, values, position)))
+                return thunk
+
+            if type(value) is not wanted:
+                return _fall_back(ev, primitive)
+
+            values[position] = value
+
+        # With a zero addend, subtrahend or multiplier, the result no
+        # longer depends on the other argument's value.
+        if position == 1 and value == 0:
+            if role is native.Role.MULT:
+                return _step(ev, 0)
+
+            if role in (native.Role.ADD, native.Role.SUB):
+                return _step(ev, primitive.args[0])
+
+    return _step(ev, _operate(role, values))
+
+
+def _step(ev: _Evaluation, result: Any) -> Any:
+    """Charge EV for a native operation, and return its RESULT."""
+
+    if ev.meter is not None:
+        ev.meter.step()
+
+    return result
+
+
+def _operate(role: native.Role, args: list[int | bool]) -> int | bool:
+    """Carry out the native operation ROLE on the native values ARGS."""
+
+    x = args[0]
+
+    match role:
+        case native.Role.NOT:
+            return not x
+        case native.Role.ISZERO:
+            return x == 0
+        case native.Role.SUCC:
+            return x + 1
+        case native.Role.PRED:
+            return max(x - 1, 0)
+
+    y = args[1]
+
+    match role:
+        case native.Role.ADD:
+            return x + y
+        case native.Role.SUB:
+            return max(x - y, 0)
+        case native.Role.MULT:
+            return x * y
+        case native.Role.EQUAL:
+            return x == y
+        case native.Role.GREATER:
+            return x > y
+        case native.Role.GREATER_OR_EQUAL:
+            return x >= y
+        case native.Role.LESS:
+            return x < y
+
+    assert role is native.Role.LESS_OR_EQUAL
+
+    return x <= y
+
+
+def _evaluate(ev: _Evaluation, result: Any, args: tuple[Thunk, ...] = ()) -> Any:
+    """Carry on from RESULT, as returned by compiled code, until there's a value.
+
+    The value is applied to ARGS, if given, first. Return it once the
+    frames pushed since have been worked through.
+
+    """
+
+    stack = ev.stack
+    base = len(stack)
+    stack.extend(reversed(args))
+
+    while True:
+        kind = type(result)
+
+        if kind is tuple:
+            code, env = result
+            result = code(env, ev)
+            continue
+
+        if kind is Thunk:
+            value = result.value
+
+            if value is None:
+                stack.append((_Cont.UPDATE, result))
+                result = result.code(result.env, ev)
+                continue
+        else:
+            value = result
+
+        # Hand VALUE to whatever is on the stack, until there's
+        # something new to run.
+        while len(stack) > base:
+            top = stack.pop()
+
+            if type(top) is Thunk:
+                result = _apply(ev, value, top)
+                break
+
+            cont, payload = top
+
+            if cont is _Cont.UPDATE:
+                payload.value = value
+                continue
+
+            primitive, values, position = payload
+
+            if type(value) is not _wanted(primitive.role):
+                result = _fall_back(ev, primitive)
+                break
+
+            values[position] = value
+            result = _operation(ev, primitive, values)
+            break
+        else:
+            return value
+
+
+_EMPTY = Neutral(term.Empty(), ())
+
+
+def _unbox(value: int | bool) -> Function:
+    """Return the function that the native VALUE encodes."""
+
+    if type(value) is bool:
+        return _TRUE if value else _FALSE
+
+    if value == 0:
+        return _ZERO
+
+    return Function(_SUCCESSOR, (Thunk(None, None, None, value - 1), None, 1),
+                    _SUCC.body)
+
+
+def _compile_name(index: int, depth: int) -> Code:
+    if index >= depth:
+        idx = index - depth
+
+        return lambda env, ev: _global(ev, idx)
+
+    if index == 0:
+        return lambda env, ev: env[0]  # type: ignore[index]
+
+    return lambda env, ev: _lookup(env, index)
+
+
+def _compile_argument(ast: term.AST, code: Code,
+                      depth: int) -> Callable[[Env], Thunk]:
+    """Return a function making the thunk for the argument AST."""
+
+    # Passing on a bound name passes on its thunk, so that the
+    # argument stays shared.
+    if type(ast) is term.Name and ast.index < depth:
+        index = ast.index
+
+        return lambda env: _lookup(env, index)
+
+    # An abstraction is already a value, and making it doesn't involve
+    # the evaluation.
+    if type(ast) is term.Abstraction:
+        return lambda env: Thunk(None, env, ast, code(env, None))  # type: ignore[arg-type]
+
+    return lambda env: Thunk(code, env, ast)
+
+
+def _compile_application(left: Code, argument: Callable[[Env], Thunk]) -> Code:
+    def code(env: Env, ev: _Evaluation) -> Any:
+        ev.stack.append(argument(env))
+
+        return (left, env)
+
+    return code
+
+
+def _compile_abstraction(body: Code, ast: term.AST) -> Code:
+    return lambda env, ev: Function(body, env, ast)
+
+
+def _compile_assignment(idx: int, value: term.AST, code: Code) -> Code:
+    def assign(env: Env, ev: _Evaluation) -> Any:
+        g.sym_set_at(idx, _quote(value, env))
+        ev.globals.clear()
+        ev.definitions.clear()
+
+        return (code, env)
+
+    return assign
+
+
+# Compiled code only depends on the term, so it's kept, keyed by the
+# (interned) term, for the next time the term comes up, as globals'
+# definitions do.
+_compiled: dict[term.AST, Code] = {}
+
+_COMPILED_LIMIT = 1 << 12
+
+
+def compile_term(ast: term.AST) -> Code:
+    """Compile AST, which isn't underneath any binders."""
+
+    code = _compiled.get(ast)
+
+    if code is None:
+        code = _compile(ast)
+
+        if len(_compiled) >= _COMPILED_LIMIT:
+            _compiled.clear()
+
+        _compiled[ast] = code
+
+    return code
+
+
+def _compile(ast: term.AST) -> Code:
+    # Each compound node is pushed a second time, with a marker of -1,
+    # to be compiled from the code of its subterms on 'results'.
+    stack: list[tuple[term.AST, int, int]] = [(ast, 0, 0)]
+    results: list[Code] = []
+
+    while stack:
+        node, depth, marker = stack.pop()
+        kind = type(node)
+
+        if marker < 0:
+            if kind is term.Application:
+                assert isinstance(node, term.Application)
+
+                right = results.pop()
+                left = results.pop()
+                argument = _compile_argument(node.right, right, depth)
+                results.append(_compile_application(left, argument))
+
+            elif kind is term.Abstraction:
+                results.append(_compile_abstraction(results.pop(), node))
+
+            else:
+                assert isinstance(node, term.Assignment)
+
+                idx = node.name.index - depth
+
+                if idx < 0:
+                    raise ValueError(
+                        f"Fatal: '{node.name}' isn't a free symbol")
+
+                results.append(_compile_assignment(idx, node.value,
+                                                   results.pop()))
+
+            continue
+
+        if kind is term.Name:
+            assert isinstance(node, term.Name)
+
+            results.append(_compile_name(node.index, depth))
+
+        elif kind is term.Abstraction:
+            assert isinstance(node, term.Abstraction)
+
+            stack.append((node, depth, -1))
+            stack.append((node.body, depth + 1, 0))
+
+        elif kind is term.Application:
+            assert isinstance(node, term.Application)
+
+            stack.append((node, depth, -1))
+            stack.append((node.right, depth, 0))
+            stack.append((node.left, depth, 0))
+
+        elif kind is term.Assignment:
+            assert isinstance(node, term.Assignment)
+
+            stack.append((node, depth, -1))
+            stack.append((node.value, depth, 0))
+
+        elif kind is term.Empty:
+            results.append(lambda env, ev: _EMPTY)
+
+        else:
+            raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+    return results.pop()
+
+
+def _constant(ast: term.AST) -> Function:
+    """Return the function a closed abstraction AST evaluates to."""
+
+    function = compile_term(ast)(None, None)  # type: ignore[arg-type]
+    assert type(function) is Function
+
+    return function
+
+
+# The values of the encodings of native values, for when they're
+# applied. _SUCCESSOR is the code of the body of \n.\s.(s false n),
+# to be run with n bound.
+_TRUE = _constant(native.TRUE)
+_FALSE = _constant(native.FALSE)
+_ZERO = _constant(native.encode(0))
+_SUCC = term.Abstraction(term.Abstraction(term.Application(
+    term.Application(term.Name(0), native.FALSE), term.Name(1))))
+_SUCCESSOR = _constant(_SUCC).body(None, None).body  # type: ignore[arg-type]
+
+
+def _opaque(thunk: Thunk) -> term.AST:
+    """Read back THUNK, which wasn't built from a term."""
+
+    if type(thunk.value) in (int, bool):
+        return native.encode(thunk.value)
+
+    raise ValueError("Fatal: definition refers to a variable bound "
+                     "while reading back")
+
+
+def _quote(ast: term.AST, env: Env) -> term.AST:
+    """Substitute the thunks of ENV into AST.
+
+    Thunks are turned back into the terms they were built from, rather
+    than evaluated. The result isn't underneath any binders.
+
+    """
+
+    if env is None:
+        return ast
+
+    return quote(ast, env, 0, _size, _lookup, _opaque)
+
+
+def readback(ev: _Evaluation, value: Any, strong: bool = False) -> term.AST:
+    """Turn VALUE, from the evaluation EV, back into a term.
+
+    If STRONG is true, the term is in normal form.
+
+    """
+
+    # Each entry is something to read back, together with the number
+    # of binders it's underneath. Abstractions and applications are
+    # pushed a second time, as a count of the subterms to be taken off
+    # 'results' (one for the body of an abstraction, and one more
+    # than the number of arguments of an application), with a level
+    # of -1. Thunks are also pushed a second time, along with their
+    # level, with a level of -2, to record what they were read back
+    # as: a thunk shared between several arguments is only read back
+    # once per level, which keeps normal forms of shared values from
+    # being built over and over.
+    stack: list[tuple[Any, int]] = [(value, 0)]
+    results: list[term.AST] = []
+    known: dict[tuple[int, int], tuple[Thunk, term.AST]] = {}
+
+    while stack:
+        item, level = stack.pop()
+
+        if level == -2:
+            thunk, level = item
+            known[(id(thunk), level)] = (thunk, results[-1])
+            continue
+
+        if level < 0:
+            if item == 0:
+                results.append(term.Abstraction(results.pop()))
+            else:
+                args = results[-item:]
+                del results[-item:]
+
+                ast = results.pop()
+
+                for arg in args:
+                    ast = term.Application(ast, arg)
+
+                results.append(ast)
+
+            continue
+
+        if type(item) is Thunk:
+            found = known.get((id(item), level))
+
+            if found is not None:
+                results.append(found[1])
+                continue
+
+            stack.append(((item, level), -2))
+            item = _evaluate(ev, item)
+
+        if type(item) is Primitive:
+            item = _evaluate(ev, _definition(ev, item.index), item.args)
+
+        if type(item) in (int, bool):
+            results.append(native.encode(item))
+
+        elif type(item) is Function and not strong:
+            results.append(_quote(item.ast, item.env))
+
+        elif type(item) is Function:
+            fresh = Thunk(None, None, None, Neutral(level, ()))
+            env = item.env
+            body = _evaluate(ev, (item.body, (fresh, env, _size(env) + 1)))
+
+            stack.append((0, -1))
+            stack.append((body, level + 1))
+
+        else:
+            assert type(item) is Neutral
+
+            if type(item.head) is int:
+                results.append(term.Name(level - item.head - 1))
+            else:
+                results.append(item.head)
+
+            if item.args:
+                stack.append((len(item.args), -1))
+
+                for arg in reversed(item.args):
+                    stack.append((arg, level))
+
+    return results.pop()
+
+
+def nbe_reduce(ast: term.AST,
+               limits: "lim.Limits | None" = None,
+               stats: "Stats | None" = None,
+               natives: bool = False,
+               strong: bool = False) -> term.AST:
+    """Evaluate AST by normalization by evaluation.
+
+    Return the reduced AST, which is the same as the one 'beta_reduce'
+    would return, given STRONG.
+
+    LIMITS and STATS are as for 'beta_reduce'.
+
+    If NATIVES is true, the prelude's booleans and naturals, and the
+    operations on them, are evaluated natively. Booleans and naturals
+    are then returned in normal form, even if STRONG isn't given;
+    otherwise, the result is the same. An operation only evaluates the
+    arguments it needs, so '(mult omega zero)' is still zero; but since
+    a natural is returned in normal form, one that's only partly
+    defined, such as '(succ omega)', is never finished.
+
+    """
+
+    meter = None
+
+    if limits is not None or stats is not None:
+        meter = lim.Budget(limits, stats)
+
+    ev = _Evaluation(meter, natives)
+    result = readback(ev, _evaluate(ev, (compile_term(ast), None)), strong)
+
+    if meter is not None:
+        meter.finish()
+
+    return result
@@ -0,0 +1,232 @@
+import concurrent.futures as cf
+import enum
+import os
+from typing import Any
+
+import lbd.beta as beta
+import lbd.binary as binary
+import lbd.gamma as g
+import lbd.term as term
+
+# Strong normalization, spread across several workers.
+#
+# Once 'beta.weak_reduce' has brought a term to a variable or nil
+# applied to arguments, nothing can happen to the arguments but their
+# own reduction, so each of them can be normalized independently of
+# the others. Arguments of at least THRESHOLD nodes are handed to a pool
+# of workers as they're found, while the rest of the term goes on
+# being taken apart here; smaller ones, which would cost more to hand
+# over than to normalize, are normalized in place.
+#
+# The workers are processes, each started from a snapshot of gamma.
+# Threads won't do, even without the GIL: 'beta' keeps the
+# contractions and normal forms it has found, and gamma the values of
+# globals, in structures that are updated without any locking. Terms
+# travel to and from the processes in their binary encoding (see
+# 'binary'), since pickling a term nests as deeply as the term does.
+# Values the processes cache in their own copies of gamma stay with
+# them.
+#
+# Starting the processes, and encoding gamma for them, costs far more
+# than most normalizations, so the pool is kept from one call to the
+# next, for as long as gamma stays as it was when the pool started.
+
+THRESHOLD = 256
+
+
+EncodedSnapshot = list[tuple[str, bytes, bytes | None]]
+
+
+def encode_snapshot() -> EncodedSnapshot:
+    """Take a snapshot of gamma, with its terms encoded."""
+
+    return [(label, binary.dumps(ast), None if value is None else binary.dumps(value))
+            for label, ast, value in g.snapshot()]
+
+
+def decode_snapshot(symbols: EncodedSnapshot) -> g.Snapshot:
+    """Decode the terms of SYMBOLS, a snapshot from 'encode_snapshot'."""
+
+    return [(label, binary.loads(ast), None if value is None else binary.loads(value))
+            for label, ast, value in symbols]
+
+
+def _install(symbols: EncodedSnapshot) -> None:
+    """Start a worker process off with the encoded snapshot SYMBOLS."""
+
+    g.restore(decode_snapshot(symbols))
+
+
+def _normalize_encoded(data: bytes, depth: int) -> bytes:
+    """Normalize the term encoded in DATA, underneath DEPTH binders."""
+
+    return binary.dumps(beta.normalize(binary.loads(data), depth))
+
+
+class _Pool():
+    """A pool of WORKERS processes, started once there's work for it.
+
+    The processes start from gamma as it stands when the pool is made,
+    as identified by KEY.
+
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.key = _gamma_key()
+        self.executor: cf.Executor | None = None
+
+    def submit(self, ast: term.AST, depth: int) -> cf.Future:
+        """Start normalizing AST, found underneath DEPTH binders."""
+
+        if self.executor is None:
+            self.executor = self._start()
+
+        return self.executor.submit(_normalize_encoded, binary.dumps(ast),
+                                    depth)
+
+    def result(self, future: cf.Future) -> term.AST:
+        """Wait for the normal form computed by FUTURE."""
+
+        return binary.loads(future.result())
+
+    def _start(self) -> cf.Executor:
+        return cf.ProcessPoolExecutor(self.workers, initializer=_install,
+                                      initargs=(encode_snapshot(),))
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def _gamma_key() -> tuple[int, int]:
+    """Identify gamma as it stands, for '_Pool'."""
+
+    return (g.generation(), g.size())
+
+
+# The pool used by the last call to 'parallel_reduce', if any.
+_pool: _Pool | None = None
+
+
+def _get_pool(workers: int) -> _Pool:
+    """Return a pool of WORKERS processes, reusing the last one if possible."""
+
+    global _pool
+
+    if (_pool is None or _pool.workers != workers
+            or _pool.key != _gamma_key()):
+        close_pool()
+        _pool = _Pool(workers)
+
+    return _pool
+
+
+def close_pool() -> None:
+    """Shut down the pool kept by 'parallel_reduce', if any."""
+
+    global _pool
+
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+class _Step(enum.Enum):
+    """What each entry of 'parallel_reduce's stack stands for.
+
+    REDUCE: a term to normalize, not yet reduced by 'beta.weak_reduce'.
+
+    TAKE_APART: a term already reduced, to be taken apart.
+
+    PENDING: a term being normalized by a worker; the entry holds the
+    future of its normal form.
+
+    REBUILD: a compound term, to be rebuilt from its normalized
+    subterms.
+
+    """
+
+    REDUCE = enum.auto()
+    TAKE_APART = enum.auto()
+    PENDING = enum.auto()
+    REBUILD = enum.auto()
+
+
+def parallel_reduce(ast: term.AST,
+                    workers: int | None = None,
+                    threshold: int = THRESHOLD) -> term.AST:
+    """Return the normal form of AST, as 'beta_reduce' does in strong mode.
+
+    The arguments of applications stuck on a variable or nil that are
+    at least THRESHOLD nodes in size are normalized by a pool of
+    WORKERS processes; by default, as many as there are CPUs. No pool
+    is started unless there's such an argument. The pool is kept for
+    the next call, until gamma changes (or 'close_pool' is called).
+
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 1:
+        raise ValueError(f"Need at least one worker, not {workers}")
+
+    return _normalize(ast, _get_pool(workers), threshold)
+
+
+def _normalize(ast: term.AST, pool: _Pool, threshold: int) -> term.AST:
+    """Do the work of 'parallel_reduce', handing arguments to POOL."""
+
+    # The term is taken apart as in 'beta.normalize', but its
+    # subterms are written down in postorder rather than rebuilt as
+    # they're finished, so that nothing waits on a worker until the
+    # whole term has been taken apart.
+    stack: list[tuple[_Step, Any, int]] = [(_Step.REDUCE, ast, 0)]
+    order: list[tuple[_Step, Any]] = []
+
+    while stack:
+        step, node, depth = stack.pop()
+
+        if step is _Step.PENDING or step is _Step.REBUILD:
+            order.append((step, node))
+            continue
+
+        if beta.is_normal(node, depth):
+            order.append((step, node))
+            continue
+
+        if step is _Step.REDUCE:
+            node = beta.weak_reduce(node, depth)
+
+        kind = type(node)
+
+        if kind is term.Abstraction:
+            stack.append((_Step.REBUILD, node, depth))
+            stack.append((_Step.REDUCE, node.body, depth + 1))
+
+        elif kind is term.Application:
+            stack.append((_Step.REBUILD, node, depth))
+
+            if node.right.size >= threshold:
+                future = pool.submit(node.right, depth)
+                stack.append((_Step.PENDING, future, depth))
+            else:
+                stack.append((_Step.TAKE_APART, node.right, depth))
+
+            stack.append((_Step.TAKE_APART, node.left, depth))
+
+        else:
+            order.append((_Step.TAKE_APART, node))
+
+    results: list[term.AST] = []
+
+    for step, node in order:
+        if step is _Step.REBUILD:
+            results.append(beta.rebuild(node, results))
+        elif step is _Step.PENDING:
+            results.append(pool.result(node))
+        else:
+            results.append(node)
+
+    return results.pop()
@@ -1,10 +1,60 @@
-from wonderwords import RandomWord
+import random
+import string
+from collections.abc import Callable
 
 import lbd.gamma as g
 import lbd.term as term
 
-# Use this to generate ad-hoc local variable names inside 'prettify'.
-rword = RandomWord()
+# Since the original names of local variables are lost, 'prettify'
+# makes up a name for each binder, by asking a namer for one. A namer
+# is given the number of binders the new one is inside of, and may
+# suggest a name already in use there; 'prettify' then asks again, and
+# failing that, tells the two apart with a suffix.
+Namer = Callable[[int], str]
+
+# How many times a namer is asked for a name before a suffix is added.
+_ATTEMPTS = 8
+
+
+def letters(depth: int) -> str:
+    """Name binders 'a' through 'z', then 'aa', 'ab' and so on, by DEPTH.
+
+    Binders inside one another are always named differently, and
+    binders at the same depth the same.
+
+    """
+
+    name = ""
+    depth += 1
+
+    while depth > 0:
+        depth, rest = divmod(depth - 1, 26)
+        name = string.ascii_lowercase[rest] + name
+
+    return name
+
+
+class Words():
+    """Name binders with random dictionary words, from 'wonderwords'.
+
+    The package is only imported once the first Words is made, and its
+    word list is only searched then. SEED, if given, seeds the choice
+    of words.
+
+    """
+
+    def __init__(self, seed: int | None = None):
+        from wonderwords import RandomWord
+
+        self.words = RandomWord().filter(regex=r"[a-z]+")
+        self.random = random.Random(seed)
+
+    def __call__(self, depth: int) -> str:
+        return self.random.choice(self.words)
+
+
+# The namer used when 'prettify' isn't given one.
+default_namer: Namer = letters
 
 
 def prettify_free_symbol(name: term.Name, depth: int) -> str:
@@ -17,15 +67,44 @@ def prettify_free_symbol(name: term.Name, depth: int) -> str:
     return free_sym.label.upper()
 
 
+def _fresh(namer: Namer, env: list[str], scope: set[str]) -> str:
+    """Ask NAMER for a name for a binder inside ENV, not among SCOPE."""
+
+    param = namer(len(env))
+    attempts = 1
+
+    while param in scope and attempts < _ATTEMPTS:
+        param = namer(len(env))
+        attempts += 1
+
+    name = param
+    suffix = 1
+
+    while name in scope:
+        name = f"{param}{suffix}"
+        suffix += 1
+
+    return name
+
+
 def prettify_rec(ast: term.AST,
                  env: list[str],
-                 indent: int) -> str:
+                 indent: int,
+                 namer: Namer = letters,
+                 scope: set[str] | None = None) -> str:
     """Recursive helper for 'prettify'.
 
     The actual prettification logic lives here.
 
+    ENV holds the names of the binders in scope, innermost last, and
+    SCOPE the same names, as a set; both are added to and removed from
+    as binders are entered and left.
+
     """
 
+    if scope is None:
+        scope = set(env)
+
     match ast:
         case term.Name() as name:
             # An env_depth of -1 corresponds to TOS, -2 t one underneath, etc.
@@ -39,19 +118,23 @@ def prettify_rec(ast: term.AST,
             return prettify_free_symbol(name, len(env))
 
         case term.Abstraction() as abstr:
-            # Generate a random word to use as the function parameter.
-            param: str = rword.word(regex=r"[a-z]+")
-
             # Make sure that binders are unique as we move down the
             # scope.
-            while param in env:
-                param = rword.word(regex=r"[a-z]+")
+            param = _fresh(namer, env, scope)
 
             indent += len(param) + 2
 
+            env.append(param)
+            scope.add(param)
+
             body = prettify_rec(abstr.body,
-                                [*env, param],
-                                indent)
+                                env,
+                                indent,
+                                namer,
+                                scope)
+
+            env.pop()
+            scope.discard(param)
 
             return f"\\{param}.{body}"
 
@@ -61,11 +144,15 @@ def prettify_rec(ast: term.AST,
 
             left = prettify_rec(app.left,
                                 env,
-                                indent)
+                                indent,
+                                namer,
+                                scope)
 
             right = prettify_rec(app.right,
                                  env,
-                                 indent)
+                                 indent,
+                                 namer,
+                                 scope)
 
             padding = " " * indent
 
@@ -74,13 +161,17 @@ def prettify_rec(ast: term.AST,
         case term.Assignment() as assign:
             name = prettify_rec(assign.name,
                                 env,
-                                indent)
+                                indent,
+                                namer,
+                                scope)
 
             indent += len(f"def {name}:=")
 
             value = prettify_rec(assign.value,
                                  env,
-                                 indent)
+                                 indent,
+                                 namer,
+                                 scope)
 
             return f"def {name}:={value}"
 
@@ -91,17 +182,21 @@ def prettify_rec(ast: term.AST,
             raise ValueError("Fatal: wrong AST 'kind' field")
 
 
-def prettify(ast: term.AST) -> str:
+def prettify(ast: term.AST, namer: Namer | None = None) -> str:
     """Create a human-readable lambda expression from AST.
 
     Since the AST is constructed using DeBruijn indices, the original
     local variable names are discarded, and so synthetic names are used
-    for the reconstructed human-readable expression.
+    for the reconstructed human-readable expression. These are made up
+    by NAMER, or else by 'default_namer'.
 
     Return the prettified version of AST as a string.
 
     """
 
-    pretty = prettify_rec(ast, [], 0)
+    if namer is None:
+        namer = default_namer
+
+    pretty = prettify_rec(ast, [], 0, namer, set())
 
     return pretty
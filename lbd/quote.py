@@ -0,0 +1,130 @@
+from collections.abc import Callable
+from typing import Any
+
+import lbd.term as term
+
+# Reading terms back out of environments.
+#
+# The call-by-need reducer, the Krivine machine and normalization by
+# evaluation all pair terms with environments of suspended arguments,
+# rather than substituting. To turn such a pair back into an ordinary
+# term, every name bound by the environment is replaced by the term
+# its suspension was built from, read back in turn in the
+# suspension's own environment.
+#
+# Each of them lays out its environments in its own way, so it hands
+# 'quote' a function giving the number of suspensions in an
+# environment, and another giving the suspension at some index into
+# one. A suspension has the term it was built from (AST), the
+# environment that term is to be read in (ENV), and the term as read
+# back so far (READBACKS), keyed by the depth it was read back at; or
+# None, until then.
+
+Size = Callable[[Any], int]
+Lookup = Callable[[Any, int], Any]
+
+
+def quote(ast: term.AST, env: Any, depth: int, size: Size, lookup: Lookup,
+          opaque: Callable[[Any], term.AST] | None = None) -> term.AST:
+    """Read back AST in ENV as a term to be placed under DEPTH binders.
+
+    Names bound by ENV are replaced by their suspensions, found with
+    SIZE and LOOKUP, read back in turn; global names are shifted to
+    account for DEPTH. A suspension with no AST is handed to OPAQUE,
+    which gives the term it stands for.
+
+    """
+
+    # Every entry carries the depth at which the term it belongs to
+    # starts (BASE), and the depth it is at itself; their difference
+    # is the number of binders crossed within that term. Compound
+    # nodes are pushed a second time with a depth of -1, to be rebuilt
+    # from the finished subterms on 'results', as are suspensions, to
+    # record their read-back term.
+    stack: list[tuple[Any, Any, int, int]] = [(ast, env, depth, depth)]
+    results: list[term.AST] = []
+
+    while stack:
+        node, env, base, depth = stack.pop()
+
+        if depth < 0:
+            kind = type(node)
+
+            if kind is term.Application:
+                right = results.pop()
+                left = results.pop()
+                results.append(term.Application(left, right))
+
+            elif kind is term.Abstraction:
+                results.append(term.Abstraction(results.pop()))
+
+            elif kind is term.Assignment:
+                value = results.pop()
+                name = results.pop()
+
+                assert isinstance(name, term.Name)
+
+                results.append(term.Assignment(name, value))
+
+            else:
+                if node.readbacks is None:
+                    node.readbacks = {}
+
+                node.readbacks[base] = results[-1]
+
+            continue
+
+        match node:
+            case term.Name() as name:
+                local = depth - base
+
+                if name.index < local:
+                    results.append(name)
+                    continue
+
+                bound = size(env)
+
+                if name.index - local >= bound:
+                    free_index = name.index - local - bound
+                    results.append(term.Name(free_index + depth))
+                    continue
+
+                suspension = lookup(env, name.index - local)
+                readbacks = suspension.readbacks
+                known = None if readbacks is None else readbacks.get(depth)
+
+                if known is not None:
+                    results.append(known)
+
+                elif suspension.ast is None:
+                    if opaque is None:
+                        raise ValueError("Fatal: suspension without a term")
+
+                    results.append(opaque(suspension))
+
+                else:
+                    stack.append((suspension, None, depth, -1))
+                    stack.append((suspension.ast, suspension.env, depth,
+                                  depth))
+
+            case term.Abstraction() as abstr:
+                stack.append((abstr, env, base, -1))
+                stack.append((abstr.body, env, base, depth + 1))
+
+            case term.Application() as app:
+                stack.append((app, env, base, -1))
+                stack.append((app.right, env, base, depth))
+                stack.append((app.left, env, base, depth))
+
+            case term.Assignment() as assign:
+                stack.append((assign, env, base, -1))
+                stack.append((assign.value, env, base, depth))
+                stack.append((assign.name, env, base, depth))
+
+            case term.Empty():
+                results.append(node)
+
+            case _:
+                raise ValueError(f"Fatal: invalid ast-kind: {node}")
+
+    return results.pop()
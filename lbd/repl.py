@@ -1,9 +1,13 @@
 import atexit
 import os
 import readline
+from collections.abc import Callable
 
 import lbd.evaluate as evl
-from lbd.prettify import prettify
+import lbd.prettify as pp
+from lbd.cache import NormalFormCache
+from lbd.error import LambdaError
+from lbd.limits import Limits
 
 histfile = os.path.join(os.getcwd(), ".repl_history")
 
@@ -27,8 +31,202 @@ See the TUTORIAL file accompanying this project for details.
 """)
 
 
-def repl():
+# The limits applied to every term evaluated at the prompt, as set
+# with the ':limit' command.
+limits = Limits()
+
+LIMIT_USAGE = "Usage: :limit [off | {steps,seconds,nodes} (VALUE | off)]"
+
+# Whether results are reduced all the way to normal form, as set with
+# the ':strong' command.
+strong = False
+
+STRONG_USAGE = "Usage: :strong [on | off]"
+
+# How the binders of results are named, as set with the ':names'
+# command.
+namer: pp.Namer = pp.letters
+
+NAMES_USAGE = "Usage: :names [letters | words]"
+
+# The results of the terms evaluated at the prompt, and of the terms
+# reduced along the way, so that entering a term again (or one sharing
+# some of its work) needn't redo it. The cache empties itself whenever
+# a definition changes.
+cache = NormalFormCache()
+
+# How a file is reloaded, given the limits to apply; the result is the
+# number of chunks evaluated, or an error. Whoever starts the REPL
+# hands this in, along with the files it loaded, since the REPL knows
+# nothing of files itself. Without it, ':reload' and watching do
+# nothing.
+Reloader = Callable[[str, Limits | None], int | LambdaError]
+
+reloader: Reloader | None = None
+
+# The files loaded at startup, which ':reload' reloads by default.
+files: list[str] = []
+
+# If watching, the files loaded at startup, each mapped to when it was
+# last seen to be modified; they're reloaded whenever that changes.
+modified: dict[str, int] = {}
+
+
+def limit_command(args: list[str]) -> str:
+    """Carry out the ':limit' command with ARGS.
+
+    With no arguments, show the current limits. Otherwise, set (or,
+    with 'off', lift) a single limit, or lift all of them.
+
+    Return the message to show the user.
+
+    """
+
+    global limits
+
+    if args == ["off"]:
+        limits = Limits()
+    elif len(args) == 2 and args[0] in ("steps", "seconds", "nodes"):
+        which, raw_value = args
+
+        if raw_value == "off":
+            value = None
+        else:
+            try:
+                if which == "seconds":
+                    value = float(raw_value)
+                else:
+                    value = int(raw_value)
+            except ValueError:
+                return LIMIT_USAGE
+
+            if value <= 0:
+                return LIMIT_USAGE
+
+        setattr(limits, which, value)
+    elif args:
+        return LIMIT_USAGE
+
+    return (f"steps: {limits.steps}, seconds: {limits.seconds}, "
+            f"nodes: {limits.nodes}")
+
+
+def strong_command(args: list[str]) -> str:
+    """Carry out the ':strong' command with ARGS.
+
+    With no arguments, show whether strong normalization is on.
+    Otherwise, turn it on or off.
+
+    Return the message to show the user.
+
+    """
+
+    global strong
+
+    if args == ["on"]:
+        strong = True
+    elif args == ["off"]:
+        strong = False
+    elif args:
+        return STRONG_USAGE
+
+    return f"strong: {'on' if strong else 'off'}"
+
+
+def _reload(filename: str) -> str:
+    """Reload FILENAME, returning the message to show the user."""
+
+    if reloader is None:
+        return "Reloading isn't available"
+
+    try:
+        result = reloader(filename, None if limits == Limits() else limits)
+    except OSError as e:
+        return str(e)
+
+    if isinstance(result, LambdaError):
+        return str(result)
+
+    return f"Reloaded {filename}: {result} chunk(s) evaluated"
+
+
+def reload_command(args: list[str]) -> str:
+    """Carry out the ':reload' command with ARGS.
+
+    Reload the files given, or else those loaded at startup.
+
+    Return the message to show the user.
+
+    """
+
+    return "\n".join(_reload(filename) for filename in args or files)
+
+
+def _modified(filename: str) -> int:
+    try:
+        return os.stat(filename).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _watch() -> None:
+    """Reload the watched files that were modified since last seen."""
+
+    for filename, seen in modified.items():
+        now = _modified(filename)
+
+        if now != seen:
+            modified[filename] = now
+            print(_reload(filename))
+
+
+def names_command(args: list[str]) -> str:
+    """Carry out the ':names' command with ARGS.
+
+    With no arguments, show how binders are named. Otherwise, name
+    them with letters, in order, or with random dictionary words.
+
+    Return the message to show the user.
+
+    """
+
+    global namer
+
+    if args == ["letters"]:
+        namer = pp.letters
+    elif args == ["words"]:
+        if not isinstance(namer, pp.Words):
+            try:
+                namer = pp.Words()
+            except ImportError:
+                return "names: words need the 'wonderwords' package"
+    elif args:
+        return NAMES_USAGE
+
+    return f"names: {'words' if isinstance(namer, pp.Words) else 'letters'}"
+
+
+def repl(loaded: list[str] | None = None, watch: bool = False,
+         reload: Reloader | None = None):
+    """Run the REPL.
+
+    LOADED holds the files loaded beforehand, and RELOAD, if given, is
+    how to reload them; if WATCH is true as well, they are reloaded
+    whenever they change.
+
+    """
+
+    global reloader
+
+    files[:] = loaded or []
+    reloader = reload
+
+    if watch and reload is not None:
+        modified.update((filename, _modified(filename)) for filename in files)
+
     while True:
+        _watch()
+
         try:
             repl_input = input("> ")
         except EOFError:
@@ -37,7 +235,25 @@ def repl():
         if repl_input == "":
             continue
 
-        ast = evl.eval_raw_term(repl_input)
+        if repl_input.startswith(":limit"):
+            print(limit_command(repl_input.split()[1:]))
+            continue
+
+        if repl_input.startswith(":strong"):
+            print(strong_command(repl_input.split()[1:]))
+            continue
+
+        if repl_input.startswith(":names"):
+            print(names_command(repl_input.split()[1:]))
+            continue
+
+        if repl_input.startswith(":reload"):
+            print(reload_command(repl_input.split()[1:]))
+            continue
+
+        ast = evl.eval_raw_term(repl_input, cache,
+                                limits=None if limits == Limits() else limits,
+                                strong=strong)
 
         if isinstance(ast, Exception):
             print(ast)
@@ -45,7 +261,7 @@ def repl():
 
         print()
 
-        pretty = prettify(ast)
+        pretty = pp.prettify(ast, namer)
 
         print(pretty)
         print()
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Stats():
+    """Statistics gathered over a single reduction.
+
+    STEPS: the number of beta contractions and unfoldings of global
+    definitions; this is what a step limit is charged against.
+
+    CONTRACTIONS: the number of beta contractions.
+
+    SUBSTITUTIONS: the number of occurrences of a binder replaced by
+    an argument. Contractions that have been done before are looked
+    up, and don't add to this.
+
+    SHIFTS: the number of times an argument had its free names shifted
+    to fit underneath some binders.
+
+    LOOKUPS: the number of global names looked up in gamma.
+
+    MAX_SPINE: the greatest number of continuation frames pending at
+    once, which grows with the application spines being unwound.
+
+    ALLOCATED: the number of new terms built.
+
+    NODES: the number of distinct terms alive at the end, beyond those
+    alive at the start; this is what a node limit is charged against
+    (see Limits).
+
+    ELAPSED: wall-clock time spent, in seconds.
+
+    Call-by-need reduction substitutes nothing, and so leaves
+    SUBSTITUTIONS and SHIFTS at zero.
+
+    """
+
+    steps: int = 0
+    contractions: int = 0
+    substitutions: int = 0
+    shifts: int = 0
+    lookups: int = 0
+    max_spine: int = 0
+    allocated: int = 0
+    nodes: int = 0
+    elapsed: float = 0.0
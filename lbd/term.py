@@ -1,64 +1,368 @@
-from dataclasses import dataclass
+import threading
+import weakref
 
 import lbd.gamma as gamma
 
+# Terms are hash-consed: every structurally distinct term exists only
+# once, and constructing a term that already exists returns the
+# existing instance. Structural equality is therefore identity, which
+# is what '==' checks, and every term carries a structural hash,
+# computed once from the hashes of its subterms. With de Bruijn
+# indices, alpha-equivalent terms are structurally equal, so comparing
+# two terms for alpha-equivalence takes a single identity check, and
+# never walks them.
+#
+# Every term also carries its size, the number of nodes in it counted
+# as a tree, likewise computed once from the sizes of its subterms.
+#
+# It follows that terms must never be modified after construction;
+# anything that needs a different term has to build a new one.
+#
+# The store maps the structure of each term to a weak reference to
+# it, so that it doesn't keep otherwise unused terms alive. Compound
+# terms are keyed by the identities of their subterms, which stay
+# valid for as long as the term holding on to them is alive. Entries
+# whose term has died are swept out whenever the store doubles in
+# size.
+#
+# Looking a term up doesn't lock, but adding one does: two threads
+# building the same term at once must still end up with one instance
+# between them.
+_store: dict[tuple, "weakref.ref[AST]"] = {}
+
+_SWEEP_MINIMUM = 1 << 16
+_sweep_at = _SWEEP_MINIMUM
+
+# The number of terms ever built, and the number of those that have
+# died since, counted as they die, so that the number alive is known
+# without sweeping the store. Deaths have a lock of their own, since
+# a term can die while '_lock' is held.
+_created = 0
+_died = 0
+
+_lock = threading.Lock()
+_died_lock = threading.Lock()
+
+
+def _death(ref: "weakref.ref[AST]") -> None:
+    """Count the death of the term REF referred to."""
+
+    global _died
+
+    with _died_lock:
+        _died += 1
+
+
+def _sweep() -> None:
+    """Drop the entries of terms that are no longer alive.
+
+    The caller is expected to hold '_lock'.
+
+    """
+
+    global _sweep_at
+
+    dead = [key for key, ref in _store.items() if ref() is None]
+
+    for key in dead:
+        del _store[key]
+
+    _sweep_at = max(_SWEEP_MINIMUM, 2 * len(_store))
+
+
+def _intern(key: tuple, node: "AST") -> "AST":
+    """Record NODE as the canonical term for KEY, and return it.
+
+    If another thread got there first, its term is returned instead.
+
+    """
+
+    global _created
+
+    with _lock:
+        ref = _store.get(key)
+
+        if ref is not None and (other := ref()) is not None:
+            return other
+
+        _store[key] = weakref.ref(node, _death)
+        _created += 1
+
+        if len(_store) > _sweep_at:
+            _sweep()
+
+    return node
+
+
+def store_size() -> int:
+    """Return the number of distinct terms currently alive."""
+
+    with _lock:
+        _sweep()
+
+    return len(_store)
+
+
+def created() -> int:
+    """Return the number of distinct terms built so far."""
+
+    return _created
+
+
+def live() -> int:
+    """Return the number of distinct terms currently alive.
+
+    This is the same as 'store_size', but is kept count of rather than
+    swept for, and so is cheap enough to call often.
+
+    """
+
+    return _created - _died
+
 
-@dataclass
 class AST():
-    pass
+    __slots__ = ("_hash", "_size", "__weakref__")
+
+    def __hash__(self):
+        return self._hash
+
+    @property
+    def size(self) -> int:
+        """The number of nodes in this term, counting shared ones anew."""
+
+        return self._size
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
 
-@dataclass
 class Empty(AST):
+    __slots__ = ()
+
+    def __new__(cls):
+        key = (cls,)
+        ref = _store.get(key)
+
+        if ref is not None and (node := ref()) is not None:
+            return node
+
+        node = object.__new__(cls)
+        node._hash = hash(("Empty",))
+        node._size = 1
+        return _intern(key, node)
+
+    def __reduce__(self):
+        return (Empty, ())
+
+    def __repr__(self):
+        return "Empty()"
+
     def __str__(self):
         return "nil"
 
 
-@dataclass
 class Name(AST):
+    __slots__ = ("index",)
+    __match_args__ = ("index",)
+
     index: int
 
-    def __post_init__(self):
-        if self.index < 0:
-            raise ValueError(f"Negative index: {self.index}")
+    def __new__(cls, index: int):
+        key = (cls, index)
+        ref = _store.get(key)
+
+        if ref is not None and (node := ref()) is not None:
+            return node
+
+        if index < 0:
+            raise ValueError(f"Negative index: {index}")
+
+        node = object.__new__(cls)
+        node.index = index
+        node._hash = hash(("Name", index))
+        node._size = 1
+        return _intern(key, node)
+
+    def __reduce__(self):
+        return (Name, (self.index,))
+
+    def __repr__(self):
+        return f"Name(index={self.index})"
 
     def __str__(self):
         return f"N({self.index})"
 
 
-@dataclass
 class Abstraction(AST):
+    __slots__ = ("body",)
+    __match_args__ = ("body",)
+
     body: AST
 
+    def __new__(cls, body: AST):
+        key = (cls, id(body))
+        ref = _store.get(key)
+
+        if ref is not None and (node := ref()) is not None:
+            return node
+
+        node = object.__new__(cls)
+        node.body = body
+        node._hash = hash(("Abstraction", body._hash))
+        node._size = body._size + 1
+        return _intern(key, node)
+
+    def __reduce__(self):
+        return (Abstraction, (self.body,))
+
+    def __repr__(self):
+        return _format(self, repr)
+
     def __str__(self):
-        return f"F({self.body})"
+        return _format(self, str)
 
 
-@dataclass
 class Application(AST):
+    __slots__ = ("left", "right")
+    __match_args__ = ("left", "right")
+
     left: AST
     right: AST
 
+    def __new__(cls, left: AST, right: AST):
+        key = (cls, id(left), id(right))
+        ref = _store.get(key)
+
+        if ref is not None and (node := ref()) is not None:
+            return node
+
+        node = object.__new__(cls)
+        node.left = left
+        node.right = right
+        node._hash = hash(("Application", left._hash, right._hash))
+        node._size = left._size + right._size + 1
+        return _intern(key, node)
+
+    def __reduce__(self):
+        return (Application, (self.left, self.right))
+
+    def __repr__(self):
+        return _format(self, repr)
+
     def __str__(self):
-        return f"A({self.left} {self.right})"
+        return _format(self, str)
 
 
-@dataclass
 class Assignment(AST):
+    __slots__ = ("name", "value")
+    __match_args__ = ("name", "value")
+
     name: Name
     value: AST
 
+    def __new__(cls, name: Name, value: AST):
+        key = (cls, id(name), id(value))
+        ref = _store.get(key)
+
+        if ref is not None and (node := ref()) is not None:
+            return node
+
+        node = object.__new__(cls)
+        node.name = name
+        node.value = value
+        node._hash = hash(("Assignment", name._hash, value._hash))
+        node._size = value._size + 2
+        return _intern(key, node)
+
+    def __reduce__(self):
+        return (Assignment, (self.name, self.value))
+
+    def __repr__(self):
+        return _format(self, repr)
+
     def __str__(self):
-        return f"<{self.name}, {self.value}>"
+        return _format(self, str)
+
+
+# How each kind of compound term is written out, by 'str' and by
+# 'repr': the text before, between and after its subterms.
+_LAYOUTS = {
+    str: {
+        Abstraction: ("F(", ")"),
+        Application: ("A(", " ", ")"),
+        Assignment: ("<", ", ", ">"),
+    },
+    repr: {
+        Abstraction: ("Abstraction(body=", ")"),
+        Application: ("Application(left=", ", right=", ")"),
+        Assignment: ("Assignment(name=", ", value=", ")"),
+    },
+}
+
+
+def _format(ast: AST, kind) -> str:
+    """Write out AST with KIND, either 'str' or 'repr'.
+
+    The term is walked with an explicit stack, so that writing out a
+    deep term doesn't run into Python's recursion limit.
+
+    """
+
+    layouts = _LAYOUTS[kind]
+    stack: list[AST | str] = [ast]
+    pieces: list[str] = []
+
+    while stack:
+        item = stack.pop()
+
+        if type(item) is str:
+            pieces.append(item)
+            continue
+
+        layout = layouts.get(type(item))
+
+        if layout is None:
+            pieces.append(kind(item))
+            continue
+
+        match item:
+            case Abstraction(body=body):
+                subterms: tuple[AST, ...] = (body,)
+            case Application(left=left, right=right):
+                subterms = (left, right)
+            case Assignment(name=name, value=value):
+                subterms = (name, value)
+
+        pieces.append(layout[0])
+        stack.append(layout[-1])
+
+        for i in range(len(subterms) - 1, 0, -1):
+            stack.append(subterms[i])
+            stack.append(layout[i])
+
+        stack.append(subterms[0])
+
+    return "".join(pieces)
 
 
 def bind(global_name: str, term: AST) -> Abstraction:
+    """Abstract GLOBAL_NAME out of TERM.
+
+    Every occurrence of the global GLOBAL_NAME inside TERM is turned
+    into a reference to a new binder wrapped around TERM, which is
+    returned. TERM itself is left untouched.
+
+    """
+
     target_index = gamma.gamma(global_name)
 
     if target_index is None:
         raise ValueError(f"Fatal: non-global name {global_name}")
 
-    def rec(term: AST, depth: int) -> None:
+    def rec(term: AST, depth: int) -> AST:
         match term:
             case Name():
                 # 'idx' is the index into gamma. If it's equal to the
@@ -71,27 +375,29 @@ def bind(global_name: str, term: AST) -> Abstraction:
                 idx = term.index - depth
 
                 if idx == target_index:
-                    term.index = depth
+                    return Name(depth)
                 elif idx >= 0:
-                    term.index += 1
+                    return Name(term.index + 1)
+
+                return term
 
             case Abstraction():
-                rec(term.body, depth + 1)
+                return Abstraction(rec(term.body, depth + 1))
 
             case Application():
-                rec(term.left, depth)
-                rec(term.right, depth)
+                return Application(rec(term.left, depth),
+                                   rec(term.right, depth))
 
             case Assignment():
-                rec(term.name, depth)
-                rec(term.value, depth)
+                name = rec(term.name, depth)
+                assert isinstance(name, Name)
 
-            case Empty():
-                pass
+                return Assignment(name, rec(term.value, depth))
 
-    rec(term, 0)
+            case _:
+                return term
 
-    return Abstraction(term)
+    return Abstraction(rec(term, 0))
 
 
 # Aliases.
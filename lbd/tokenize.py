@@ -1,18 +1,41 @@
+import operator
 import re
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
 
 import lbd.error as err
 import lbd.token_defs as tdef
 
 
-@dataclass
 class Token():
-    kind: tdef.Tk
-    value: str | None = None
+    """A token of KIND, read as VALUE.
 
-    def __post_init__(self):
-        if self.value is None:
-            self.value = self.kind.value.label
+    VALUE defaults to KIND's label. START, if known, is where the
+    token starts in the source.
+
+    Tokens compare equal whenever their kinds and values do, wherever
+    they occur.
+
+    """
+
+    __slots__ = ("kind", "value", "start")
+
+    def __init__(self, kind: tdef.Tk, value: str | None = None,
+                 start: int | None = None):
+        self.kind = kind
+        self.value: str = kind.value.label if value is None else value
+        self.start = start
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+
+        return self.kind is other.kind and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash((self.kind, self.value))
+
+    def __repr__(self) -> str:
+        return f"Token(kind={self.kind!r}, value={self.value!r})"
 
     def __str__(self):
         if self.kind == tdef.Tk.NAME:
@@ -51,62 +74,124 @@ def find(tokens: list[Token], token: Token) -> int | None:
     return None
 
 
-def tokenize(raw_term: str) -> "list[Token] | err.LambdaError":
-    pats = []
+# Tokens that are always spelled the same, such as punctuation and
+# keywords, are only made once, and shared between all their
+# occurrences; they're never given a START.
+_shared = {tk.value.label: Token(tk)
+           for tk in tdef.Tk if not tk.value.is_dynamic and tk.value.label}
+
+
+def _scanner() -> tuple[re.Pattern, dict[int, tdef.Tk]]:
+    """Compile the pattern matching the next token of any kind.
+
+    Its first group matches any token that's always spelled the same;
+    each group after that, the tokens of one dynamic kind. Return the
+    pattern, along with the kind of token matched by each of the
+    latter groups, by group number.
+
+    """
+
+    fixed = []
+    dynamic = []
+    kinds: dict[int, tdef.Tk] = {}
 
     for tk in tdef.Tk:
-        subpat = f"(?P<{tk.name.lower()}>{tk.value.regex})"
-        pats.append(subpat)
+        regex = tk.value.regex
+
+        if tk is tdef.Tk.SPACE:
+            continue
+
+        if not tk.value.is_dynamic:
+            fixed.append(regex)
+            continue
+
+        if tk is tdef.Tk.ERROR:
+            regex = f"(?!{tdef.Tk.SPACE.value.regex}){regex}"
+
+        dynamic.append(f"({regex})")
+        kinds[len(dynamic) + 1] = tk
+
+    # Spaces separate tokens, but aren't tokens themselves; like line
+    # breaks, they're skipped over on the way to the next token.
+    skip = f"(?:{tdef.Tk.SPACE.value.regex}|\n)*"
+    pats = [f"({'|'.join(fixed)})", *dynamic]
+
+    return re.compile(f"{skip}(?:{'|'.join(pats)})"), kinds
+
 
-    token_pattern = "|".join(pats)
+_pattern, _kinds = _scanner()
 
-    tokens: list[Token] = []
 
-    # Track the current iteration index, to flag the position of any
-    # ILLEGAL_TOKEN error.
-    #
+def _scan(mobjs: Iterable[re.Match], offset: int) -> Iterator[Token]:
+    """Yield the tokens matched by MOBJS, in text starting at OFFSET."""
+
+    shared = _shared
+    kinds = _kinds
+
+    for mobj in mobjs:
+        group = mobj.lastindex or 0
+        value = mobj.group(group)
+
+        if group == 1:
+            # Keywords take up the space after them, too.
+            yield shared[value.rstrip()]
+            continue
+
+        # A name that's really a keyword is swapped for the actual
+        # keyword (which will match the Tk label field!) In this
+        # manner, the parser can then flag the illegal use of such a
+        # token.
+        token = shared.get(value)
+
+        if token is None:
+            token = Token(kinds[group], value, offset + mobj.start(group))
+
+        yield token
+
+
+def iter_tokens(source: str | Iterable[str]) -> Iterator[Token]:
+    """Yield the tokens of SOURCE, one by one.
+
+    SOURCE is either a string, or the pieces of one, which are only
+    read as they're needed; a token may be split between pieces.
+
+    """
+
+    if isinstance(source, str):
+        yield from _scan(_pattern.finditer(source), 0)
+        return
+
+    rest = ""
+    offset = 0
+
+    for piece in source:
+        text = rest + piece
+        mobjs = list(_pattern.finditer(text))
+        done = len(text)
+
+        # A token reaching the end of the piece may carry on into the
+        # next one, so it's read again along with it.
+        if mobjs and mobjs[-1].end() == len(text):
+            done = mobjs.pop().start()
+
+        yield from _scan(mobjs, offset)
+
+        rest = text[done:]
+        offset += done
+
+    yield from _scan(_pattern.finditer(rest), offset)
+
+
+def tokenize(raw_term: str) -> "list[Token] | err.LambdaError":
+    tokens = list(iter_tokens(raw_term))
+    kinds = list(map(operator.attrgetter("kind"), tokens))
+
     # Flag the position of the first illegal token so that the
     # returned error can use the entire 'tokens' buffer (as opposed to
     # immediately returning, which necessarily truncates this
     # information.)
-    i = 0
-    error_idx = None
-
-    for mobj in re.finditer(token_pattern, raw_term):
-        label = mobj.lastgroup
-
-        if label is None:
-            raise ValueError("Fatal: found 'None'")
-
-        value = mobj.group()
-
-        match label:
-            case "name":
-                if value in tdef.keywords:
-                    # Swap in the actual keyword (which will match the
-                    # Tk label field!) In this manner, the parser can
-                    # then flag the illegal use of such a token.
-                    new_keyword = Token(tdef.Tk[f"{value.upper()}"])
-                    tokens.append(new_keyword)
-                else:
-                    new_name = Token(tdef.Tk.NAME, value)
-                    tokens.append(new_name)
-            case "error":
-                new_error = Token(tdef.Tk.ERROR, value)
-                tokens.append(new_error)
-
-                if error_idx is None:
-                    error_idx = i
-
-            case "space":
-                continue
-            case _:
-                tk = tdef.Tk[f"{label.upper()}"]
-                tokens.append(Token(tk))
-
-        i += 1
-
-    if error_idx is not None:
-        return err.error(tokens, error_idx, err.Err.ILLEGAL_TOKEN)
+    if tdef.Tk.ERROR in kinds:
+        return err.error(tokens, kinds.index(tdef.Tk.ERROR),
+                         err.Err.ILLEGAL_TOKEN)
 
     return tokens
@@ -1,7 +1,246 @@
+import concurrent.futures as cf
+import difflib
+import hashlib
+import json
+import os
 import re
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass
 
-from lbd.error import Err, LambdaError
-from lbd.evaluate import eval_raw_term
+import lbd.beta as beta
+import lbd.gamma as g
+import lbd.term as term
+import lbd.tokenize as tkz
+from lbd.binary import VERSION, Image, dumps, loads, save_gamma
+from lbd.error import LambdaError
+from lbd.evaluate import eval_ast, parse_tokens
+from lbd.limits import Limits
+
+# Loading a prelude means evaluating every one of its chunks, some of
+# which do real reduction work. So, if asked to, once a set of files
+# has been loaded into an empty gamma, the result is saved as an image
+# next to the first of them, and later loads of the same files restore
+# that instead. The image is keyed by the interpreter's version, the
+# image format's version, the source of the interpreter itself (since
+# that decides what the definitions evaluate to), and the files' names
+# and contents. It's ignored (and, if possible, rewritten) as soon as
+# any of these changes.
+#
+# Each file's chunks are also remembered, along with the globals each
+# chunk defines and refers to, so that the file can later be reloaded
+# by evaluating only what changed (see 'reload'). These records are
+# saved in the image too, so that restoring it needn't parse the files.
+#
+# Parsing a chunk declares the free names in it as globals, numbered
+# in the order they're first seen, so chunks are normally parsed one
+# after another. Given a number of workers, 'load' instead first scans
+# every chunk for the names it defines, and declares them all up
+# front, in order. Then the chunks are parsed by a pool of processes,
+# each starting from those globals; any other free name a chunk
+# declares is renumbered once the chunk is back, to wherever the name
+# is (or gets) declared here. Only evaluation, which depends on what
+# the chunks before it defined, is left to be done in order.
+
+
+@dataclass(frozen=True)
+class Chunk():
+    """An expression read from a file, with comments stripped away.
+
+    LINE and COLUMN are where the expression starts in the file, and
+    END_LINE and END_COLUMN where its last character is; all of them
+    count from 1. An empty expression is placed at the ';' ending it.
+
+    """
+
+    text: str
+    line: int
+    column: int
+    end_line: int
+    end_column: int
+
+
+# Files are read this many characters at a time.
+_BLOCK = 1 << 16
+
+_NORMAL = re.compile(r"[#;\n]")
+_COMMENT = re.compile(r"[#\n]")
+_LITERAL = re.compile(r"[;\n]")
+
+
+class _Chunker():
+    """Split text into chunks, as it's fed in.
+
+    A comment starts with '#', and ends at the next '#' after at least
+    one other character; a '#' with no such end is an ordinary
+    character. Chunks are separated by ';'.
+
+    """
+
+    def __init__(self):
+        self.line = 1
+        self.column = 1
+
+        self.pieces: list[str] = []
+        self.start: tuple[int, int] | None = None
+        self.end: tuple[int, int] | None = None
+
+        # While in a comment, its text so far, in case it's never
+        # closed; and where it started.
+        self.comment: list[str] | None = None
+        self.comment_at = (1, 1)
+
+    def feed(self, text: str) -> list[Chunk]:
+        """Take in TEXT, returning the chunks it completes."""
+
+        done: list[Chunk] = []
+        position = 0
+
+        while position < len(text):
+            if self.comment is not None:
+                position = self._comment(text, position)
+            else:
+                position = self._normal(text, position, _NORMAL, done)
+
+        return done
+
+    def finish(self) -> list[Chunk]:
+        """Return the chunks left over once all the text is in."""
+
+        done: list[Chunk] = []
+
+        # A comment that's never closed is ordinary text after all.
+        if self.comment is not None:
+            text = "".join(self.comment)
+            self.comment = None
+            self.line, self.column = self.comment_at
+
+            position = 0
+
+            while position < len(text):
+                position = self._normal(text, position, _LITERAL, done)
+
+        chunk = self._chunk()
+
+        if chunk.text != "":
+            done.append(chunk)
+
+        return done
+
+    def _advance(self, text: str) -> None:
+        """Move past TEXT, which is all on one line."""
+
+        self.column += len(text)
+
+    def _newline(self) -> None:
+        self.line += 1
+        self.column = 1
+
+    def _normal(self, text: str, position: int, stops: re.Pattern,
+                done: list[Chunk]) -> int:
+        """Read TEXT from POSITION up to and including the next of STOPS.
+
+        Return the position after it.
+
+        """
+
+        found = stops.search(text, position)
+        stop = len(text) if found is None else found.start()
+        segment = text[position:stop]
+
+        if segment.strip():
+            indent = len(segment) - len(segment.lstrip())
+
+            if self.start is None:
+                self.start = (self.line, self.column + indent)
+
+            self.end = (self.line, self.column + len(segment.rstrip()) - 1)
+
+        self.pieces.append(segment)
+        self._advance(segment)
+
+        if found is None:
+            return stop
+
+        char = text[stop]
+
+        if char == "\n":
+            self.pieces.append(char)
+            self._newline()
+
+        elif char == ";":
+            done.append(self._chunk())
+            self._advance(char)
+
+        else:
+            self.comment = [char]
+            self.comment_at = (self.line, self.column)
+            self._advance(char)
+
+        return stop + 1
+
+    def _comment(self, text: str, position: int) -> int:
+        """Read TEXT from POSITION, inside a comment.
+
+        Return the position after what was read.
+
+        """
+
+        assert self.comment is not None
+
+        # The character right after the opening '#' never closes the
+        # comment.
+        if len(self.comment) == 1:
+            found_at = position
+            closes = False
+        else:
+            found = _COMMENT.search(text, position)
+            found_at = len(text) if found is None else found.start()
+            closes = True
+
+            self.comment.append(text[position:found_at])
+            self._advance(text[position:found_at])
+
+            if found is None:
+                return found_at
+
+        char = text[found_at]
+        self.comment.append(char)
+
+        if char == "\n":
+            self._newline()
+        else:
+            self._advance(char)
+
+            if closes:
+                self.comment = None
+
+        return found_at + 1
+
+    def _chunk(self) -> Chunk:
+        """Finish the chunk read so far."""
+
+        text = "".join(self.pieces).strip()
+        start = self.start or (self.line, self.column)
+        end = self.end or start
+
+        self.pieces = []
+        self.start = None
+        self.end = None
+
+        return Chunk(text, *start, *end)
+
+
+def iter_chunks(filename: str) -> Iterator[Chunk]:
+    """Yield the expressions in FILENAME, as each one is read."""
+
+    chunker = _Chunker()
+
+    with open(filename, "r") as f:
+        while text := f.read(_BLOCK):
+            yield from chunker.feed(text)
+
+    yield from chunker.finish()
 
 
 def chunks(filename: str) -> list[str]:
@@ -12,31 +251,530 @@ def chunks(filename: str) -> list[str]:
 
     """
 
-    with open(filename, "r") as f:
-        contents = f.read().strip()
-        contents = re.sub(r"#.+?#", "", contents, flags=re.DOTALL)
+    return [chunk.text for chunk in iter_chunks(filename)]
+
+
+# The digest of the interpreter's source, computed on first use.
+_interpreter: bytes | None = None
+
+
+def _interpreter_digest() -> bytes:
+    """Return a digest of the source of 'lbd', and of this module."""
+
+    global _interpreter
+
+    if _interpreter is None:
+        package = os.path.dirname(os.path.abspath(beta.__file__))
+        sources = sorted(os.path.join(package, name)
+                         for name in os.listdir(package)
+                         if name.endswith(".py"))
+
+        digest = hashlib.sha256()
+
+        for source in [*sources, os.path.abspath(__file__)]:
+            with open(source, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+
+        _interpreter = digest.digest()
+
+    return _interpreter
+
+
+def _key(filenames: list[str]) -> bytes:
+    """Return the key of an image of FILENAMES."""
+
+    digest = hashlib.sha256(sys.version.encode())
+    digest.update(VERSION.to_bytes(4, "little"))
+    digest.update(_interpreter_digest())
+
+    for filename in filenames:
+        name = filename.encode()
+        digest.update(len(name).to_bytes(8, "little"))
+        digest.update(name)
+
+        with open(filename, "rb") as f:
+            digest.update(os.fstat(f.fileno()).st_size.to_bytes(8, "little"))
+
+            while block := f.read(_BLOCK):
+                digest.update(block)
+
+    return digest.digest()
+
+
+def image_path(filenames: list[str]) -> str:
+    """Return where the image of FILENAMES is kept."""
+
+    return f"{filenames[0]}.img"
+
+
+def _dump_records(filenames: list[str]) -> bytes:
+    """Encode the records of the chunks of FILENAMES, to save in an image."""
+
+    return json.dumps([
+        [[record.digest.hex(), sorted(record.defines), sorted(record.uses)]
+         for record in _loaded[os.path.abspath(filename)]]
+        for filename in filenames
+    ]).encode()
+
+
+def _load_records(data: bytes, count: int) -> list[list["_Record"]]:
+    """Decode the records of the chunks of COUNT files, from DATA."""
+
+    try:
+        files = json.loads(data)
+
+        if not isinstance(files, list) or len(files) != count:
+            raise ValueError("wrong number of files")
+
+        return [[_Record(bytes.fromhex(digest), frozenset(defines),
+                         frozenset(uses))
+                 for digest, defines, uses in records]
+                for records in files]
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid chunk records: {e}")
+
+
+def _restore(filename: str, key: bytes,
+             count: int) -> list[list["_Record"]] | None:
+    """Restore gamma from the image in FILENAME, if it has KEY.
+
+    The image holds COUNT files. Return the records of their chunks,
+    or None if gamma wasn't restored.
+
+    """
+
+    try:
+        with Image(filename) as image:
+            if image.key != key:
+                return None
+
+            records = _load_records(image.extra, count)
+            image.restore()
+    except (OSError, ValueError):
+        # Whatever was restored before the image turned out to be
+        # damaged is of no use.
+        g.clear_gamma()
+        return None
+
+    return records
+
+
+def _save(filename: str, key: bytes, filenames: list[str]) -> None:
+    """Save gamma as an image of FILENAMES in FILENAME, with KEY, if possible."""
+
+    # Another process may be reading the old image, or saving one of
+    # its own, so the new one only replaces it once complete.
+    partial = f"{filename}.{os.getpid()}"
+
+    try:
+        save_gamma(partial, key, _dump_records(filenames))
+        os.replace(partial, filename)
+    except OSError:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+
+
+def load(filenames: list[str],
+         limits: Limits | None = None,
+         image: bool = False,
+         workers: int | None = None) -> LambdaError | None:
+    """Evaluate the expressions in FILENAMES, in order.
+
+    LIMITS, if given, applies to each expression separately.
+
+    If IMAGE is true and gamma is empty, the result is restored from,
+    or else saved to, an image of FILENAMES (see 'image_path').
+
+    WORKERS, if given, is the number of processes the expressions are
+    parsed by; they're still evaluated one after another, here. The
+    globals declared along the way are then numbered differently than
+    otherwise, though they end up with the same definitions.
+
+    Return the first error encountered, if any.
+
+    """
+
+    if workers is not None and workers < 1:
+        raise ValueError(f"Need at least one worker, not {workers}")
+
+    if not image or not filenames or g.sym_get(0) is not None:
+        return _load(filenames, limits, workers)
+
+    key = _key(filenames)
+    path = image_path(filenames)
+
+    restored = _restore(path, key, len(filenames))
+
+    if restored is not None:
+        # The files are as they were when the image was saved, and so
+        # are their chunks, for 'reload'.
+        for filename, records in zip(filenames, restored):
+            _loaded[os.path.abspath(filename)] = records
+
+        return None
+
+    err = _load(filenames, limits, workers)
 
-        chunks = [chunk.strip() for chunk in contents.split(";")]
+    if err is None:
+        _save(path, key, filenames)
 
-        # If a stray empty string makes it in at the end, remove it.
-        if chunks[-1] == "":
-            chunks.pop()
+    return err
 
-        return chunks
 
+def _load(filenames: list[str],
+          limits: Limits | None,
+          workers: int | None) -> LambdaError | None:
+    """Do the work of 'load', evaluating every chunk of FILENAMES."""
+
+    if workers is not None:
+        return _load_parallel(filenames, limits, workers)
 
-def load(filenames: list[str]) -> LambdaError | None:
     for filename in filenames:
-        cks = chunks(filename)
+        records: list[_Record] = []
 
         # For now, terms are only evaluated for their side-effects;
-        # hence, the result of 'eval_raw_term' isn't stored anywhere.
-        for i, c in enumerate(cks):
-            err = eval_raw_term(c)
+        # hence, the result of 'eval_ast' isn't stored anywhere.
+        for i, chunk in enumerate(iter_chunks(filename)):
+            err = _parse(chunk.text)
+
+            if not isinstance(err, LambdaError):
+                records.append(_record_of(chunk.text, err))
+                err = eval_ast(err, limits=limits)
 
             if isinstance(err, LambdaError):
-                header = f"chunk {i}, expression '{c}':"
-                bars = "-" * len(header)
-                return LambdaError(Err.UNSPECIFIED, i, f"{header}\n{bars}\n{str(err)}")
+                _loaded.pop(os.path.abspath(filename), None)
+                return _chunk_error(i, chunk, err)
 
-        return None
+        _loaded[os.path.abspath(filename)] = records
+
+    return None
+
+
+# What a chunk defines, going by its text alone.
+_DEFINITION = re.compile(r"(?<!\w)def\s+([A-Za-z_]\w*)")
+
+
+def _start_parser(labels: list[str]) -> None:
+    """Start a worker process off with the globals LABELS, undefined."""
+
+    g.clear_gamma()
+
+    for label in labels:
+        g.sym_declare(label)
+
+
+_Parsed = tuple[bytes, list[str], "_Record"]
+
+
+def _parse_chunk(text: str) -> _Parsed | LambdaError:
+    """Parse the chunk TEXT in a worker process.
+
+    Return the encoded term, the labels of the globals declared while
+    parsing it, in order, and its record.
+
+    """
+
+    base = g.size()
+
+    try:
+        ast = _parse(text)
+
+        if isinstance(ast, LambdaError):
+            return ast
+
+        labels = [sym.label for idx in range(base, g.size())
+                  if (sym := g.sym_get(idx)) is not None]
+
+        return dumps(ast), labels, _record_of(text, ast)
+    finally:
+        # The next chunk is parsed as though this one never was.
+        g.truncate(base)
+
+
+def _remap(ast: term.AST, base: int, targets: list[int]) -> term.AST:
+    """Renumber the globals at BASE onwards in AST, as TARGETS says.
+
+    The global at BASE + I becomes the one at TARGETS[I].
+
+    """
+
+    if all(target == base + i for i, target in enumerate(targets)):
+        return ast
+
+    results: list[term.AST] = []
+    stack: list[tuple[term.AST, int, bool]] = [(ast, 0, False)]
+
+    while stack:
+        node, depth, done = stack.pop()
+
+        if done:
+            results.append(beta.rebuild(node, results))
+            continue
+
+        kind = type(node)
+
+        if kind is term.Name:
+            idx = node.index - depth
+
+            if idx >= base:
+                node = term.Name(targets[idx - base] + depth)
+
+            results.append(node)
+
+        elif kind is term.Abstraction:
+            stack.append((node, depth, True))
+            stack.append((node.body, depth + 1, False))
+
+        elif kind is term.Application:
+            stack.append((node, depth, True))
+            stack.append((node.right, depth, False))
+            stack.append((node.left, depth, False))
+
+        elif kind is term.Assignment:
+            stack.append((node, depth, True))
+            stack.append((node.value, depth, False))
+            stack.append((node.name, depth, False))
+
+        else:
+            results.append(node)
+
+    return results.pop()
+
+
+def _load_parallel(filenames: list[str],
+                   limits: Limits | None,
+                   workers: int) -> LambdaError | None:
+    """Do the work of 'load', parsing chunks with WORKERS processes."""
+
+    files = [(filename, list(iter_chunks(filename)))
+             for filename in filenames]
+
+    for _, file_chunks in files:
+        for chunk in file_chunks:
+            for label in _DEFINITION.findall(chunk.text):
+                g.sym_declare(label)
+
+    base = g.size()
+    labels = [sym.label for idx in range(base)
+              if (sym := g.sym_get(idx)) is not None]
+
+    texts = [chunk.text for _, file_chunks in files for chunk in file_chunks]
+    chunksize = max(1, len(texts) // (workers * 4))
+
+    executor = cf.ProcessPoolExecutor(workers, initializer=_start_parser,
+                                      initargs=(labels,))
+
+    try:
+        results = executor.map(_parse_chunk, texts, chunksize=chunksize)
+
+        for filename, file_chunks in files:
+            records: list[_Record] = []
+
+            for i, chunk in enumerate(file_chunks):
+                parsed = next(results)
+
+                if not isinstance(parsed, LambdaError):
+                    data, declared, record = parsed
+                    records.append(record)
+
+                    targets = [g.sym_declare(label) for label in declared]
+                    parsed = eval_ast(_remap(loads(data), base, targets),
+                                      limits=limits)
+
+                if isinstance(parsed, LambdaError):
+                    _loaded.pop(os.path.abspath(filename), None)
+                    return _chunk_error(i, chunk, parsed)
+
+            _loaded[os.path.abspath(filename)] = records
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    return None
+
+
+def _chunk_error(i: int, chunk: Chunk, err: LambdaError) -> LambdaError:
+    """Report ERR, raised by CHUNK, the I-th chunk of its file."""
+
+    header = (f"chunk {i} (line {chunk.line}, column "
+              f"{chunk.column}), expression '{chunk.text}':")
+    bars = "-" * len(header)
+
+    return LambdaError(err.kind, i, f"{header}\n{bars}\n{str(err)}",
+                       err.stats)
+
+
+@dataclass(frozen=True)
+class _Record():
+    """A chunk as it was last loaded.
+
+    DIGEST identifies the chunk's text (see '_digest'). DEFINES holds
+    the labels of the globals the chunk assigns to, and USES those of
+    the other globals it refers to.
+
+    """
+
+    digest: bytes
+    defines: frozenset[str] = frozenset()
+    uses: frozenset[str] = frozenset()
+
+
+# The chunks of each file loaded so far, by absolute path.
+_loaded: dict[str, list[_Record]] = {}
+
+
+def forget() -> None:
+    """Forget which files were loaded, so that 'reload' loads them in full."""
+
+    _loaded.clear()
+
+
+def _digest(text: str) -> bytes:
+    """Return what identifies the chunk TEXT in its record."""
+
+    return hashlib.sha256(text.encode()).digest()
+
+
+def _record(text: str, ast: term.AST | LambdaError) -> _Record:
+    """Find what the chunk TEXT, which parsed to AST, defines and refers to.
+
+    A chunk that doesn't parse is taken to do neither.
+
+    """
+
+    if isinstance(ast, LambdaError):
+        return _Record(_digest(text))
+
+    return _record_of(text, ast)
+
+
+def _parse(text: str) -> term.AST | LambdaError:
+    tokens = tkz.tokenize(text)
+
+    if isinstance(tokens, LambdaError):
+        return tokens
+
+    return parse_tokens(tokens)
+
+
+def _record_of(text: str, ast: term.AST) -> _Record:
+    """Find what AST, parsed from the chunk TEXT, defines and refers to."""
+
+    defines: set[int] = set()
+    uses: set[int] = set()
+    stack: list[tuple[term.AST, int]] = [(ast, 0)]
+
+    while stack:
+        node, depth = stack.pop()
+
+        match node:
+            case term.Name(index=index) if index >= depth:
+                uses.add(index - depth)
+
+            case term.Abstraction(body=body):
+                stack.append((body, depth + 1))
+
+            case term.Application(left=left, right=right):
+                stack.append((left, depth))
+                stack.append((right, depth))
+
+            case term.Assignment(name=name, value=value):
+                defines.add(name.index - depth)
+                stack.append((value, depth))
+
+    def labels(indices: set[int]) -> frozenset[str]:
+        return frozenset(sym.label for idx in indices
+                         if (sym := g.sym_get(idx)) is not None)
+
+    return _Record(_digest(text), labels(defines), labels(uses - defines))
+
+
+def reload(filename: str, limits: Limits | None = None) -> int | LambdaError:
+    """Bring gamma up to date with the current contents of FILENAME.
+
+    The file's chunks are compared with those it had when last loaded
+    or reloaded. Only the chunks that are new or changed are evaluated
+    again, along with any chunk referring to a global that one of them
+    defines, and so on; globals whose definitions were removed from
+    the file are cleared. A file not loaded before is loaded in full.
+
+    LIMITS is as for 'load'.
+
+    Return the number of chunks evaluated, or the first error
+    encountered.
+
+    """
+
+    path = os.path.abspath(filename)
+    old = _loaded.get(path, [])
+    new = list(iter_chunks(filename))
+
+    matcher = difflib.SequenceMatcher(None,
+                                      [record.digest for record in old],
+                                      [_digest(chunk.text) for chunk in new],
+                                      autojunk=False)
+
+    records: list[_Record] = []
+    selected: set[int] = set()
+    removed: set[str] = set()
+
+    # The chunks parsed along the way, so as not to parse them again
+    # to evaluate them.
+    parsed: dict[int, term.AST | LambdaError] = {}
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            records.extend(old[i1:i2])
+            continue
+
+        for record in old[i1:i2]:
+            removed |= record.defines
+
+        for j in range(j1, j2):
+            ast = parsed[j] = _parse(new[j].text)
+
+            records.append(_record(new[j].text, ast))
+
+            selected.add(j)
+
+    # Whatever a selected chunk defines may have changed, and so may
+    # anything evaluated from a chunk referring to it.
+    dirty = set(removed)
+
+    for j in selected:
+        dirty |= records[j].defines
+
+    pending = True
+
+    while pending:
+        pending = False
+
+        for j, record in enumerate(records):
+            if j not in selected and record.uses & dirty:
+                selected.add(j)
+                dirty |= record.defines
+                pending = True
+
+    for label in removed.difference(*(record.defines for record in records)):
+        idx = g.gamma(label)
+
+        if idx is not None:
+            g.sym_clear(idx)
+
+    for j in sorted(selected):
+        err = parsed.get(j)
+
+        if err is None:
+            err = _parse(new[j].text)
+
+        if not isinstance(err, LambdaError):
+            err = eval_ast(err, limits=limits)
+
+        if isinstance(err, LambdaError):
+            _loaded.pop(path, None)
+            return _chunk_error(j, new[j], err)
+
+    _loaded[path] = records
+
+    return len(selected)
@@ -1,3 +1,5 @@
+import random
+
 import lbd.term as term
 
 
@@ -16,3 +18,22 @@ def N(index: int) -> term.Name:
 IDENTITY = F(N(0))
 FIRST = F(F(N(1)))
 SECOND = F(F(N(0)))
+
+
+def random_term(rng: random.Random, size: int, depth: int) -> term.AST:
+    """Return a random term of SIZE leaves, underneath DEPTH binders.
+
+    Its names may be bound or free.
+
+    """
+
+    if size <= 1:
+        return N(rng.randrange(depth + 3))
+
+    if rng.random() < 0.3:
+        return F(random_term(rng, size - 1, depth + 1))
+
+    left_size = rng.randrange(1, size)
+
+    return A(random_term(rng, left_size, depth),
+             random_term(rng, size - left_size, depth))
@@ -1,7 +1,9 @@
+import random
 import unittest
 
 import lbd.beta as beta
-from tests.core.aux import A, F, N
+from lbd.term import Abstraction
+from tests.core.aux import A, F, N, random_term
 
 identity = F(N(0))
 self_apply = F(A(N(0), N(0)))
@@ -136,3 +138,113 @@ class TestChapterTwoPointTwo(unittest.TestCase):
         ast = beta.beta_reduce(term)
 
         self.assertEqual(identity, ast)
+
+
+class TestDeepTerms(unittest.TestCase):
+    """Terms deep enough to overflow a recursive reducer."""
+
+    DEPTH = 100_000
+
+    def test_long_spine(self):
+        """Reduce ((((I I) I) I) ... I)."""
+
+        term = identity
+
+        for _ in range(self.DEPTH):
+            term = A(term, identity)
+
+        self.assertEqual(identity, beta.beta_reduce(term))
+
+    def test_deep_abstraction(self):
+        """Substitute into a body nested under many binders."""
+
+        body = N(self.DEPTH)
+
+        for _ in range(self.DEPTH):
+            body = F(body)
+
+        # The innermost name refers to the outermost binder, and so
+        # should end up as the argument, shifted by DEPTH.
+        ast = beta.beta_reduce(A(F(body), select_first))
+
+        for _ in range(self.DEPTH):
+            assert isinstance(ast, Abstraction)
+            ast = ast.body
+
+        self.assertEqual(F(F(N(1))), ast)
+
+
+class TestContract(unittest.TestCase):
+    """The fused contraction agrees with 'inc', 'replace' and 'dec'."""
+
+    def three_pass(self, body, argument):
+        new_arg = beta.inc(argument, 0)
+        replaced_body = beta.replace(body, new_arg, 0)
+
+        return beta.dec(replaced_body, 0)
+
+    def test_examples(self):
+        cases = [
+            (N(0), identity),
+            (N(1), identity),
+            (F(A(N(1), N(0))), F(N(1))),
+            (F(F(A(A(N(2), N(3)), N(0)))), A(N(0), N(4))),
+            (make_pair.body, applyfn),
+        ]
+
+        for body, argument in cases:
+            self.assertEqual(self.three_pass(body, argument),
+                             beta.contract(body, argument))
+
+    def test_random(self):
+        rng = random.Random(2011)
+
+        for _ in range(500):
+            body = random_term(rng, rng.randrange(1, 30), 1)
+            argument = random_term(rng, rng.randrange(1, 10), 0)
+
+            self.assertEqual(self.three_pass(body, argument),
+                             beta.contract(body, argument))
+
+
+class TestStrongNormalization(unittest.TestCase):
+    """Strong mode reduces underneath abstractions too."""
+
+    def test_under_binders(self):
+        cases = [
+            (F(A(identity, N(0))), identity),
+            (F(A(N(0), A(identity, identity))), F(A(N(0), identity))),
+            (F(F(A(A(F(N(0)), N(1)), N(0)))), F(F(A(N(1), N(0))))),
+            (A(A(applyfn, A(identity, select_first)), identity),
+             F(identity)),
+        ]
+
+        for term, expected in cases:
+            self.assertEqual(expected, beta.beta_reduce(term, strong=True))
+
+    def test_weak_by_default(self):
+        term = F(A(identity, N(0)))
+
+        self.assertIs(term, beta.beta_reduce(term))
+
+    def test_normal_terms_kept(self):
+        """A term already in normal form comes back as it is."""
+
+        term = F(F(A(N(0), F(A(N(1), N(2))))))
+
+        self.assertIs(term, beta.beta_reduce(term, strong=True))
+        self.assertIs(term, beta.beta_reduce(term, strong=True))
+
+    def test_deep(self):
+        term = identity
+
+        for _ in range(10_000):
+            term = F(A(identity, term))
+
+        reduced = beta.beta_reduce(term, strong=True)
+
+        for _ in range(10_000):
+            assert isinstance(reduced, Abstraction)
+            reduced = reduced.body
+
+        self.assertEqual(identity, reduced)
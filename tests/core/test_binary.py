@@ -0,0 +1,58 @@
+import unittest
+
+import lbd.binary as binary
+import lbd.term as term
+from tests.core.aux import A, F, N
+
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        terms = [
+            N(0),
+            N(binary.SMALL_NAMES),
+            N(1 << 40),
+            term.Empty(),
+            F(F(A(N(1), N(0)))),
+            A(F(N(0)), term.Assignment(N(3), F(A(N(0), term.Empty())))),
+        ]
+
+        for ast in terms:
+            self.assertIs(ast, binary.loads(binary.dumps(ast)), ast)
+
+    def test_prefix(self):
+        """Terms are laid out one byte per node, in prefix order."""
+
+        data = binary.dumps(F(A(N(0), N(1))))
+
+        self.assertEqual(bytes([binary.Op.ABSTRACTION, binary.Op.APPLICATION,
+                                binary.Op.SMALL_NAME,
+                                binary.Op.SMALL_NAME + 1]), data)
+
+    def test_sharing(self):
+        """Repeated subterms are written out once."""
+
+        ast = F(N(0))
+
+        for _ in range(200):
+            ast = A(ast, ast)
+
+        data = binary.dumps(ast)
+
+        self.assertLess(len(data), 1000)
+        self.assertIs(ast, binary.loads(data))
+
+    def test_deep(self):
+        ast = N(0)
+
+        for _ in range(10_000):
+            ast = F(A(ast, N(1)))
+
+        self.assertIs(ast, binary.loads(binary.dumps(ast)))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            binary.loads(bytes([binary.Op.ABSTRACTION, 6]))
+
+
+if __name__ == "__main__":
+    unittest.main()
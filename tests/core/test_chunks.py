@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import load
+
+
+class TestChunks(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "source")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def chunks(self, source: str) -> list[load.Chunk]:
+        with open(self.filename, "w") as f:
+            f.write(source)
+
+        return list(load.iter_chunks(self.filename))
+
+    def test_texts(self):
+        cases = [
+            ("", []),
+            ("a;", ["a"]),
+            ("a;;b", ["a", "", "b"]),
+            ("a # one; two # b; c", ["a  b", "c"]),
+            ("a ## b;", ["a ## b"]),
+            ("a ### b;", ["a  b"]),
+            ("a #;# b; c", ["a  b", "c"]),
+            ("a #\n# b", ["a  b"]),
+            ("a; # never closed; b", ["a", "# never closed", "b"]),
+            ("# only a comment #\n", []),
+        ]
+
+        for source, expected in cases:
+            self.assertEqual(expected,
+                             [chunk.text for chunk in self.chunks(source)],
+                             repr(source))
+
+    def test_spans(self):
+        first, second, third = self.chunks(
+            "def a := x;\n  # note; #\n  def b\n := y #c# ;;")
+
+        self.assertEqual(load.Chunk("def a := x", 1, 1, 1, 10), first)
+        self.assertEqual(load.Chunk("def b\n := y", 3, 3, 4, 5), second)
+        self.assertEqual(load.Chunk("", 4, 12, 4, 12), third)
+
+    def test_blocks(self):
+        """Chunks and comments may straddle the blocks read."""
+
+        source = "def a := x; # a comment; # def b\n := (y y);\n" * 20
+
+        with mock.patch.object(load, "_BLOCK", 3):
+            small = self.chunks(source)
+
+        self.assertEqual(self.chunks(source), small)
+        self.assertEqual(40, len(small))
+
+    def test_incremental(self):
+        """A chunk is ready as soon as its ';' is read."""
+
+        chunker = load._Chunker()
+
+        self.assertEqual([], chunker.feed("def a := "))
+        self.assertEqual(["def a := x"],
+                         [chunk.text for chunk in chunker.feed("x; def")])
+        self.assertEqual(["def"], [chunk.text for chunk in chunker.finish()])
+
+
+if __name__ == "__main__":
+    unittest.main()
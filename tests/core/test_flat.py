@@ -0,0 +1,64 @@
+import importlib.util
+import random
+import unittest
+
+import lbd.beta as beta
+from tests.core.aux import A, F, N, random_term
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+if HAVE_NUMPY:
+    import lbd.flat as flat
+
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy isn't installed")
+class TestFlatTerms(unittest.TestCase):
+    """Flat terms agree with their linked counterparts."""
+
+    def setUp(self):
+        rng = random.Random(2011)
+
+        self.pairs = [
+            (random_term(rng, rng.randrange(1, 40), 1),
+             random_term(rng, rng.randrange(1, 10), 0))
+            for _ in range(300)
+        ]
+
+    def test_layout(self):
+        laid_out = flat.from_ast(A(F(A(N(0), N(2))), N(1)))
+
+        self.assertEqual([2, 1, 2, 0, 0, 0], laid_out.tags.tolist())
+        self.assertEqual([0, 0, 0, 0, 2, 1], laid_out.indices.tolist())
+        self.assertEqual([6, 4, 3, 1, 1, 1], laid_out.sizes.tolist())
+        self.assertEqual([0, 0, 1, 1, 1, 0], laid_out.binders.tolist())
+
+    def test_round_trip(self):
+        for body, _ in self.pairs:
+            self.assertIs(body, flat.to_ast(flat.from_ast(body)))
+
+    def test_shift(self):
+        for body, _ in self.pairs:
+            shifted = flat.shift(flat.from_ast(body), 3, 1)
+            self.assertIs(beta._shift(body, 3, 1), flat.to_ast(shifted))
+
+    def test_replace(self):
+        for body, argument in self.pairs:
+            replaced = flat.replace(flat.from_ast(body),
+                                    flat.from_ast(argument), 1)
+
+            self.assertIs(beta.replace(body, argument, 1),
+                          flat.to_ast(replaced))
+
+    def test_contract(self):
+        for body, argument in self.pairs:
+            contracted = flat.contract(flat.from_ast(body),
+                                       flat.from_ast(argument))
+            expected = flat.from_ast(beta.contract(body, argument))
+
+            # The splice must get the layout right, not just the term.
+            self.assertEqual(expected.sizes.tolist(),
+                             contracted.sizes.tolist())
+            self.assertEqual(expected.binders.tolist(),
+                             contracted.binders.tolist())
+            self.assertIs(beta.contract(body, argument),
+                          flat.to_ast(contracted))
@@ -0,0 +1,65 @@
+import unittest
+
+import lbd.beta as beta
+import lbd.krivine as krivine
+from tests.core.aux import A, F, N
+
+identity = F(N(0))
+self_apply = F(A(N(0), N(0)))
+applyfn = F(F(A(N(1), N(0))))
+
+select_first = F(F(N(1)))
+select_second = F(F(N(0)))
+
+
+class TestKrivineMachine(unittest.TestCase):
+    """The Krivine machine agrees with normal order."""
+
+    def assertAgrees(self, term):
+        self.assertEqual(beta.beta_reduce(term), krivine.krivine_reduce(term))
+
+    def test_examples(self):
+        terms = [
+            A(identity, self_apply),
+            A(F(A(N(0), identity)), self_apply),
+            A(A(F(F(A(N(0), N(1)))), select_first), identity),
+            A(A(A(F(F(F(A(A(N(2), N(1)), N(0))))), applyfn), identity),
+              identity),
+            A(A(applyfn, A(identity, select_first)), identity),
+            A(A(A(F(F(F(A(N(2), A(N(1), N(0)))))), self_apply),
+                select_second),
+              select_first),
+        ]
+
+        for term in terms:
+            self.assertAgrees(term)
+
+    def test_unreduced_arguments(self):
+        """Arguments are read back as given, under any binders."""
+
+        term = A(F(F(A(A(N(0), N(1)), F(N(2))))), A(identity, identity))
+
+        self.assertAgrees(term)
+        self.assertEqual(F(A(A(N(0), A(identity, identity)),
+                             F(A(identity, identity)))),
+                         krivine.krivine_reduce(term))
+
+    def test_neutral_head(self):
+        """A stuck head keeps its arguments, reduced."""
+
+        term = F(A(N(0), A(identity, N(0))))
+
+        self.assertAgrees(A(term, F(F(A(N(0), N(1))))))
+        self.assertAgrees(A(term, F(A(N(0), A(identity, identity)))))
+
+    def test_long_spine(self):
+        term = identity
+
+        for _ in range(100_000):
+            term = A(term, identity)
+
+        self.assertEqual(identity, krivine.krivine_reduce(term))
+
+
+if __name__ == "__main__":
+    unittest.main()
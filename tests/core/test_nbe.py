@@ -0,0 +1,92 @@
+import unittest
+
+import lbd.beta as beta
+import lbd.nbe as nbe
+from lbd.stats import Stats
+from tests.core.aux import A, F, N
+
+identity = F(N(0))
+self_apply = F(A(N(0), N(0)))
+applyfn = F(F(A(N(1), N(0))))
+
+select_first = F(F(N(1)))
+select_second = F(F(N(0)))
+
+omega = A(self_apply, self_apply)
+
+
+class TestNormalization(unittest.TestCase):
+    """In strong mode, normalization by evaluation gives normal forms."""
+
+    def test_examples(self):
+        cases = [
+            (A(identity, self_apply), self_apply),
+            (A(A(applyfn, A(identity, select_first)), identity),
+             F(identity)),
+            (A(A(A(F(F(F(A(N(2), A(N(1), N(0)))))), self_apply),
+                 select_second),
+               select_first),
+             identity),
+        ]
+
+        for term, expected in cases:
+            self.assertEqual(nbe.nbe_reduce(term, strong=True), expected)
+
+    def test_under_binders(self):
+        cases = [
+            (F(A(identity, N(0))), identity),
+            (F(A(N(0), A(identity, identity))), F(A(N(0), identity))),
+            (F(F(A(A(F(N(0)), N(1)), N(0)))), F(F(A(N(1), N(0))))),
+        ]
+
+        for term, expected in cases:
+            self.assertEqual(nbe.nbe_reduce(term, strong=True), expected)
+
+    def test_no_capture(self):
+        # The argument N(0) refers to the outer binder, and must keep
+        # doing so once it's moved under the inner one.
+        term = F(A(select_first, N(0)))
+
+        self.assertEqual(nbe.nbe_reduce(term, strong=True), F(F(N(1))))
+
+    def test_unneeded_argument(self):
+        """An argument that's never used is never evaluated."""
+
+        term = A(A(select_second, omega), identity)
+
+        self.assertEqual(nbe.nbe_reduce(term, strong=True), identity)
+
+    def test_weak(self):
+        """Otherwise, it stops where normal order does."""
+
+        cases = [
+            F(A(identity, N(0))),
+            A(A(applyfn, A(identity, select_first)), identity),
+            A(select_first, omega),
+        ]
+
+        for term in cases:
+            self.assertEqual(nbe.nbe_reduce(term), beta.beta_reduce(term))
+
+        self.assertEqual(nbe.nbe_reduce(A(select_first, omega)), F(omega))
+
+    def test_deep(self):
+        """Neither deep terms nor long chains of thunks hit the recursion limit."""
+
+        term = identity
+
+        for _ in range(10000):
+            term = A(identity, term)
+
+        self.assertEqual(nbe.nbe_reduce(term, strong=True), identity)
+
+    def test_stats(self):
+        stats = Stats()
+        nbe.nbe_reduce(A(A(applyfn, identity), identity), stats=stats)
+
+        self.assertEqual(stats.contractions, 3)
+        self.assertEqual(stats.steps, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
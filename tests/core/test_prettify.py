@@ -1,7 +1,7 @@
 import re
 import unittest
 
-from lbd.prettify import prettify
+from lbd.prettify import Words, letters, prettify
 from tests.core.aux import A, F, N
 
 identity = F(N(0))
@@ -35,3 +35,42 @@ class TestPrettify(unittest.TestCase):
                 rf"\\(\w+)\.\\(\w+)\.\\(\w+)\.\{i + 1}", pretty)
 
             self.assertIsNotNone(mobj)
+
+    def test_letters(self):
+        """Binders are named after their depth, by default."""
+
+        names = [letters(depth) for depth in (0, 1, 25, 26, 27, 701, 702)]
+
+        self.assertEqual(["a", "b", "z", "aa", "ab", "zz", "aaa"], names)
+        self.assertEqual("\\a.\\b.\\c.b", prettify(selectors["second"]))
+        self.assertEqual("(\\a.a\n \\a.\\b.a)",
+                         prettify(A(identity, F(F(N(1))))))
+
+    def test_namer(self):
+        """A name already in scope is told apart with a suffix."""
+
+        pretty = prettify(selectors["first"], lambda depth: "x")
+
+        self.assertEqual("\\x.\\x1.\\x2.x", pretty)
+
+    def test_namer_everywhere(self):
+        """The namer given names every binder, whatever it's inside of."""
+
+        # \x.\y.(x \z.(z y))
+        term = F(F(A(N(1), F(A(N(0), N(1))))))
+        pretty = prettify(term, lambda depth: f"w{depth}")
+
+        self.assertEqual("\\w0.\\w1.(w0 \\w2.(w2 w1))",
+                         " ".join(pretty.split()))
+
+    def test_words(self):
+        """Random words can be asked for, and are repeatable if seeded."""
+
+        try:
+            first = prettify(selectors["third"], Words(seed=1))
+        except ImportError:
+            self.skipTest("wonderwords isn't installed")
+
+        self.assertEqual(first, prettify(selectors["third"], Words(seed=1)))
+        self.assertIsNotNone(re.fullmatch(
+            r"\\([a-z]+)\.\\([a-z]+)\.\\([a-z]+)\.\3", first))
@@ -0,0 +1,141 @@
+import gc
+import pickle
+import threading
+import unittest
+
+import lbd.term as term
+from tests.core.aux import A, F, N
+
+
+class TestInterning(unittest.TestCase):
+    """Terms are hash-consed."""
+
+    def test_identity(self):
+        """Structurally equal terms are the same object."""
+
+        self.assertIs(N(0), N(0))
+        self.assertIs(F(F(N(1))), F(F(N(1))))
+        self.assertIs(A(F(N(0)), N(3)), A(F(N(0)), N(3)))
+        self.assertIs(term.Empty(), term.Empty())
+
+        self.assertIsNot(F(F(N(1))), F(F(N(0))))
+        self.assertNotEqual(A(N(0), N(1)), A(N(1), N(0)))
+
+    def test_hash(self):
+        """Equal terms hash equally, and terms work as keys."""
+
+        first = F(F(N(1)))
+        table = {first: "first"}
+
+        self.assertEqual(hash(first), hash(F(F(N(1)))))
+        self.assertEqual("first", table[F(F(N(1)))])
+
+    def test_pickle(self):
+        """Unpickling a term yields the interned instance."""
+
+        pair = F(F(F(A(A(N(0), N(2)), N(1)))))
+
+        self.assertIs(pair, pickle.loads(pickle.dumps(pair)))
+
+    def test_store_is_weak(self):
+        """Terms no longer in use are dropped from the store."""
+
+        before = term.store_size()
+
+        terms = [F(A(N(1000 + i), N(0))) for i in range(100)]
+        self.assertGreaterEqual(term.store_size(), before + 300)
+
+        del terms
+        gc.collect()
+
+        self.assertLessEqual(term.store_size(), before)
+
+    def test_live(self):
+        """The count of live terms follows terms as they're built and die."""
+
+        gc.collect()
+        before = term.live()
+
+        self.assertEqual(term.store_size(), before)
+
+        terms = [F(A(N(2000 + i), N(0))) for i in range(100)]
+        self.assertEqual(before + 300, term.live())
+
+        del terms
+        gc.collect()
+
+        self.assertEqual(before, term.live())
+
+    def test_threads(self):
+        """Threads building the same terms at once get the same ones."""
+
+        built: list[list[term.AST]] = [[] for _ in range(4)]
+        barrier = threading.Barrier(len(built))
+
+        def build(terms: list[term.AST]):
+            barrier.wait()
+            terms.extend(F(A(N(2000 + i), N(i))) for i in range(2000))
+
+        threads = [threading.Thread(target=build, args=(terms,))
+                   for terms in built]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        for terms in built[1:]:
+            for first, other in zip(built[0], terms):
+                self.assertIs(first, other)
+
+    def test_negative_index(self):
+        with self.assertRaises(ValueError):
+            N(-1)
+
+
+class TestSize(unittest.TestCase):
+    def test_size(self):
+        self.assertEqual(1, N(0).size)
+        self.assertEqual(1, term.Empty().size)
+        self.assertEqual(4, F(A(N(0), N(0))).size)
+        self.assertEqual(6, term.Assignment(N(0), F(A(N(1), N(0)))).size)
+
+    def test_shared(self):
+        """Shared subterms count once per occurrence."""
+
+        ast = N(0)
+
+        for _ in range(100):
+            ast = A(ast, ast)
+
+        self.assertEqual(2 ** 101 - 1, ast.size)
+
+
+class TestDeepTerms(unittest.TestCase):
+    """Deep terms can be compared and written out."""
+
+    @classmethod
+    def setUpClass(cls):
+        ast = N(0)
+
+        for _ in range(10_000):
+            ast = F(A(ast, N(1)))
+
+        cls.ast = ast
+
+    def test_compare(self):
+        self.assertEqual(self.ast, self.ast)
+        self.assertNotEqual(self.ast, F(self.ast))
+
+    def test_format(self):
+        self.assertTrue(str(self.ast).startswith("F(A(F(A("))
+        self.assertTrue(repr(self.ast).endswith("right=Name(index=1)))"))
+
+    def test_examples(self):
+        ast = A(F(N(0)), term.Assignment(N(1), term.Empty()))
+
+        self.assertEqual("A(F(N(0)) <N(1), nil>)", str(ast))
+        self.assertEqual("Application(left=Abstraction(body=Name(index=0)), "
+                         "right=Assignment(name=Name(index=1), "
+                         "value=Empty()))", repr(ast))
@@ -1,7 +1,7 @@
 import unittest
 
 from lbd.token_defs import Tk
-from lbd.tokenize import Token, tokenize
+from lbd.tokenize import Token, iter_tokens, tokenize
 
 
 class TestTokenizer(unittest.TestCase):
@@ -57,3 +57,38 @@ class TestTokenizer(unittest.TestCase):
         ]
 
         self.assertEqual(expected, tokens)
+
+    def test_shared(self):
+        """Punctuation and keywords are shared between occurrences."""
+
+        tokens = tokenize("def f := ((f f) f)")
+
+        assert isinstance(tokens, list)
+
+        self.assertIs(tokens[3], tokens[4])
+        self.assertIs(tokens[0], tokenize("def g := g")[0])
+        self.assertIsNone(tokens[0].start)
+
+    def test_offsets(self):
+        """Names know where they start, but compare regardless."""
+
+        tokens = tokenize("(first\n  second)")
+
+        assert isinstance(tokens, list)
+
+        self.assertEqual([1, 9], [tokens[1].start, tokens[2].start])
+        self.assertEqual(Token(Tk.NAME, "first"), tokens[1])
+
+    def test_pieces(self):
+        """Tokens may be split between the pieces of the source."""
+
+        source = "letrec f x := (f\tx) in def y := (f \\x.x)"
+        expected = list(iter_tokens(source))
+
+        for cut in range(len(source) + 1):
+            pieces = [source[:cut], "", source[cut:]]
+            tokens = list(iter_tokens(iter(pieces)))
+
+            self.assertEqual(expected, tokens)
+            self.assertEqual([token.start for token in expected],
+                             [token.start for token in tokens])
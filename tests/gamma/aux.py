@@ -1,4 +1,16 @@
+import os
+
 import lbd.term as term
+import load
+
+PRELUDE = os.path.join(os.path.dirname(__file__), "..", "..", "prelude")
+
+
+def load_prelude() -> None:
+    """Load the prelude into gamma, without going through an image."""
+
+    error = load.load([PRELUDE], image=False)
+    assert error is None
 
 
 def A(left: term.AST, right: term.AST) -> term.Application:
@@ -0,0 +1,68 @@
+import itertools
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+from lbd.batch import eval_many
+from lbd.error import Err
+from tests.gamma.aux import load_prelude
+
+
+class TestEvalMany(unittest.TestCase):
+    def setUp(self):
+        load_prelude()
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def test_in_order(self):
+        """Results come back in the order of the expressions."""
+
+        expressions = [f"(add {a} {b})"
+                       for a in ("zero", "one", "two", "three")
+                       for b in ("zero", "one", "two", "three")]
+
+        results = list(eval_many(expressions, workers=2, strong=True,
+                                 chunksize=3))
+
+        for expression, result in zip(expressions, results, strict=True):
+            self.assertEqual(evl.eval_raw_term(expression, strong=True),
+                             result, expression)
+
+    def test_errors(self):
+        """A failing expression yields its error in its place."""
+
+        results = list(eval_many(["(succ zero)", "\\x.", "(zero))",
+                                  "(pred one)"], workers=2))
+
+        self.assertEqual(evl.eval_raw_term("(succ zero)"), results[0])
+        self.assertEqual(Err.INCOMPLETE, results[1].kind)
+        self.assertEqual(Err.MEANINGLESS, results[2].kind)
+        self.assertEqual(evl.eval_raw_term("(pred one)"), results[3])
+
+    def test_endless(self):
+        """Expressions are only read as far as results are wanted."""
+
+        results = eval_many(itertools.repeat("(pred one)"), workers=2,
+                            chunksize=4)
+
+        for result in itertools.islice(results, 20):
+            self.assertEqual(evl.eval_raw_term("zero"), result)
+
+        results.close()
+
+    def test_definitions(self):
+        """Expressions don't see each other's definitions."""
+
+        results = list(eval_many(["def one := zero", "(iszero one)"] * 4,
+                                 workers=1, chunksize=1))
+
+        for result in results[1::2]:
+            self.assertEqual(evl.eval_raw_term("second"), result)
+
+        self.assertEqual(evl.eval_raw_term("(iszero one)"),
+                         evl.eval_raw_term("second"))
+
+
+if __name__ == "__main__":
+    unittest.main()
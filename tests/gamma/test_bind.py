@@ -44,6 +44,18 @@ class TestBind(unittest.TestCase):
 
         self.assertEqual(expected, bound)
 
+    def test_bind_leaves_term_alone(self):
+        """Binding a name builds a new term, rather than modifying one."""
+
+        succ = evl.eval_raw_term("succ")
+        assert not isinstance(succ, LambdaError)
+
+        before = str(succ)
+        bind("false", succ)
+
+        self.assertEqual(before, str(succ))
+        self.assertEqual(succ, g.sym_find("succ"))
+
     def test_letrec(self):
         div1_raw = "let div1 x y := (if (greater y x) zero (succ (div1 (sub x y) y))) in div1"
 
@@ -0,0 +1,111 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+from lbd.cache import NormalFormCache
+from lbd.error import LambdaError
+from tests.gamma.aux import A, F, N, load_prelude
+
+
+class TestNormalFormCache(unittest.TestCase):
+    """The normal-form cache on its own."""
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def test_counters(self):
+        cache = NormalFormCache()
+        ast = A(F(N(0)), F(N(0)))
+
+        self.assertIsNone(cache.get(ast))
+        cache.put(ast, F(N(0)))
+        self.assertEqual(F(N(0)), cache.get(ast))
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_lru_eviction(self):
+        cache = NormalFormCache(maxsize=2)
+        terms = [A(N(i), N(i)) for i in range(3)]
+
+        cache.put(terms[0], N(0))
+        cache.put(terms[1], N(1))
+
+        # Touch the oldest entry, so that the next one in line is
+        # evicted instead.
+        cache.get(terms[0])
+        cache.put(terms[2], N(2))
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(N(0), cache.get(terms[0]))
+        self.assertIsNone(cache.get(terms[1]))
+        self.assertEqual(N(2), cache.get(terms[2]))
+
+    def test_cleared_by_definitions(self):
+        cache = NormalFormCache()
+        cache.put(A(N(0), N(0)), N(0))
+
+        g.sym_declare("x")
+        g.sym_set("x", F(N(0)))
+
+        self.assertEqual(0, len(cache))
+
+
+class TestCachedReduction(unittest.TestCase):
+    """Reduction through 'eval_raw_term' with a cache."""
+
+    def setUp(self):
+        load_prelude()
+
+        self.cache = NormalFormCache()
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def evaluate(self, raw_term, cache=None):
+        ast = evl.eval_raw_term(raw_term, cache)
+        assert not isinstance(ast, LambdaError)
+
+        return ast
+
+    def test_same_results(self):
+        """Cached and uncached reduction agree."""
+
+        for raw_term in ["(add two three)",
+                         "(equal (sub five three) two)",
+                         "(equal (mult three two) six)",
+                         "(equal (mult three two) five)"]:
+            self.assertEqual(self.evaluate(raw_term),
+                             self.evaluate(raw_term, self.cache))
+
+        self.assertGreater(self.cache.hits, 0)
+
+    def test_repeated_term(self):
+        """A term evaluated twice is found the second time round."""
+
+        # Writing back the values of the globals reduced along the way
+        # doesn't change what any term means, and so leaves the cache
+        # as it is.
+        first = self.evaluate("(equal (add two two) four)", self.cache)
+
+        hits = self.cache.hits
+        misses = self.cache.misses
+
+        second = self.evaluate("(equal (add two two) four)", self.cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual(hits + 1, self.cache.hits)
+        self.assertEqual(misses, self.cache.misses)
+
+    def test_redefinition(self):
+        """Redefining a global invalidates results that depend on it."""
+
+        self.evaluate("def pick := first")
+
+        before = self.evaluate("(pick one two)", self.cache)
+        self.assertEqual(self.evaluate("one"), before)
+
+        self.evaluate("def pick := second")
+
+        after = self.evaluate("(pick one two)", self.cache)
+        self.assertEqual(self.evaluate("two"), after)
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+from lbd.binary import Image, Op, save_gamma
+from lbd.error import LambdaError
+
+
+class TestGammaImage(unittest.TestCase):
+    def setUp(self):
+        prelude = [
+            "def zero := \\x.x",
+            "def first x y := x",
+            "def second x y := y",
+            "def false := second",
+            "def iszero n := (n first)",
+            "def succ n := \\s.(s false n)",
+            "def one := (succ zero)",
+            "def two := (succ one)",
+            "def größe := two",
+        ]
+
+        for line in prelude:
+            ast = evl.eval_raw_term(line)
+            assert not isinstance(ast, LambdaError)
+
+        evl.eval_raw_term("(iszero two)")
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "gamma.bin")
+
+    def tearDown(self):
+        g.clear_gamma()
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        expected = g.snapshot()
+        save_gamma(self.filename)
+        g.clear_gamma()
+
+        with Image(self.filename) as image:
+            image.restore()
+
+        self.assertEqual(expected, g.snapshot())
+        self.assertIsNotNone(g.sym_get(g.gamma("two")).value)
+        self.assertEqual(evl.eval_raw_term("(iszero zero)"),
+                         evl.eval_raw_term("first"))
+
+    def test_lazy(self):
+        """Definitions are decoded as they're asked for."""
+
+        save_gamma(self.filename)
+
+        with Image(self.filename) as image:
+            self.assertEqual(len(g.snapshot()), len(image))
+            self.assertEqual("größe", image.labels[-1])
+            self.assertEqual({}, image._terms)
+
+            index = image.labels.index("succ")
+
+            self.assertIs(g.sym_find("succ"), image.definition(index))
+            self.assertEqual(1, len(image._terms))
+            self.assertIsNone(image.value(index))
+
+    def test_damaged_term(self):
+        """A term that can't be decoded raises a ValueError."""
+
+        save_gamma(self.filename)
+
+        with Image(self.filename) as image:
+            offset = image._offsets[image.labels.index("succ")][0]
+
+        # A reference to a shared subterm that was never written out.
+        with open(self.filename, "r+b") as f:
+            f.seek(offset)
+            f.write(bytes([Op.SHARED, 100]))
+
+        with Image(self.filename) as image:
+            with self.assertRaises(ValueError):
+                image.restore()
+
+    def test_truncated(self):
+        """A file cut short anywhere raises a ValueError."""
+
+        save_gamma(self.filename, key=b"key", extra=b"extra")
+
+        with open(self.filename, "rb") as f:
+            data = f.read()
+
+        for length in range(1, len(data)):
+            with open(self.filename, "wb") as f:
+                f.write(data[:length])
+
+            with self.assertRaises(ValueError, msg=length):
+                Image(self.filename)
+
+    def test_not_gamma(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"def zero := \\x.x;" * 4)
+
+        with self.assertRaises(ValueError):
+            Image(self.filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
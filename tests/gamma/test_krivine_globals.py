@@ -0,0 +1,77 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+from lbd.error import LambdaError
+from lbd.evaluate import Strategy
+
+
+class TestKrivineGlobals(unittest.TestCase):
+    def setUp(self):
+        prelude = [
+            "def zero := \\x.x",
+            "def first x y := x",
+            "def second x y := y",
+            "def false := second",
+            "def iszero n := (n first)",
+            "def succ n := \\s.(s false n)",
+            "def if cond e1 e2 := (cond e1 e2)",
+            "def pred1 n := (n second)",
+            "def pred n := (if (iszero n) zero (pred1 n))",
+            "def one := (succ zero)",
+            "def two := (succ one)",
+            "def three := (succ two)",
+            "def add x y := (if (iszero y) x (add (succ x) (pred y)))",
+            "def mult x y := (if (iszero y) zero (add x (mult x (pred y))))",
+        ]
+
+        for line in prelude:
+            ast = evl.eval_raw_term(line)
+            assert not isinstance(ast, LambdaError)
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def test_same_results(self):
+        programs = [
+            "(pred (pred three))",
+            "(add two three)",
+            "(mult three two)",
+            "(if (iszero zero) one)",
+            "\\x.(x (add one one))",
+            "(undefined (pred one))",
+        ]
+
+        for program in programs:
+            expected = evl.eval_raw_term(program)
+            actual = evl.eval_raw_term(program, strategy=Strategy.KRIVINE)
+
+            self.assertEqual(expected, actual, program)
+
+    def test_write_back(self):
+        """Globals are resolved when reached, and their values cached."""
+
+        evl.eval_raw_term("def six := (mult three two)")
+        six = g.sym_get(g.gamma("six"))
+
+        assert six is not None
+        self.assertIsNone(six.value)
+
+        evl.eval_raw_term("(iszero six)", strategy=Strategy.KRIVINE)
+
+        self.assertEqual(evl.eval_raw_term("(mult three two)"), six.value)
+
+    def test_call_by_name(self):
+        """An argument used twice is reduced twice, as under normal order."""
+
+        program = "(\\x.((x x) first) def k := first)"
+        evl.eval_raw_term("def k := zero")
+
+        before = g.generation()
+        evl.eval_raw_term(program, strategy=Strategy.KRIVINE)
+
+        self.assertEqual(2, g.generation() - before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.term as term
+from lbd.error import Err, LambdaError
+from lbd.evaluate import Strategy
+from lbd.limits import Limits
+from load import load
+
+OMEGA = "(\\x.(x x) \\x.(x x))"
+
+# Each step of this reduction applies the recursion to a bigger term.
+GROWING = "(recursive \\r.\\a.(r (a a)) \\x.x)"
+
+
+class TestLimits(unittest.TestCase):
+    def tearDown(self):
+        g.clear_gamma()
+
+    def assertExceeds(self, kind, raw_term, limits):
+        for strategy in Strategy:
+            error = evl.eval_raw_term(raw_term, strategy=strategy,
+                                      limits=limits)
+
+            assert isinstance(error, LambdaError), strategy
+            self.assertEqual(kind, error.kind)
+            self.assertIsNotNone(error.stats)
+
+    def test_within_limits(self):
+        ast = evl.eval_raw_term("(\\x.x \\y.y)", limits=Limits(steps=1))
+        self.assertEqual(term.Abstraction(term.Name(0)), ast)
+
+    def test_steps(self):
+        self.assertExceeds(Err.STEP_LIMIT, OMEGA, Limits(steps=1000))
+
+        error = evl.eval_raw_term(OMEGA, limits=Limits(steps=1000))
+        assert isinstance(error, LambdaError) and error.stats is not None
+        self.assertEqual(1001, error.stats.steps)
+
+    def test_unfolding_counts_as_a_step(self):
+        evl.eval_raw_term("def loop := loop")
+
+        self.assertExceeds(Err.STEP_LIMIT, "loop", Limits(steps=1000))
+
+    def test_deadline(self):
+        self.assertExceeds(Err.DEADLINE, OMEGA, Limits(seconds=0.05))
+
+    def test_nodes(self):
+        evl.eval_raw_term("def recursive f := (\\s.(f (s s)) \\s.(f (s s)))")
+        limits = Limits(nodes=10_000)
+
+        # Call-by-need shares the growing argument rather than
+        # building it, and so is only held back by the other limits.
+        error = evl.eval_raw_term(GROWING, limits=limits)
+
+        assert isinstance(error, LambdaError)
+        self.assertEqual(Err.NODE_LIMIT, error.kind)
+
+    def test_nodes_already_alive(self):
+        """Terms alive before the reduction started don't count."""
+
+        alive = [term.Name(100_000 + i) for i in range(20_000)]
+
+        ast = evl.eval_raw_term("(\\x.x \\y.y)", limits=Limits(nodes=100))
+        self.assertEqual(term.Abstraction(term.Name(0)), ast)
+
+        del alive
+
+    def test_load(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".lbd",
+                                         delete=False) as f:
+            f.write(f"def one := \\s.\\z.(s z);\n{OMEGA};\n")
+
+        try:
+            error = load([f.name], Limits(steps=100))
+        finally:
+            os.remove(f.name)
+
+        assert isinstance(error, LambdaError)
+        self.assertEqual(Err.STEP_LIMIT, error.kind)
+        self.assertEqual(1, error.pos)
@@ -0,0 +1,155 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import load
+from lbd.binary import Image, Op
+from lbd.error import LambdaError
+
+SOURCE = """\
+# Booleans, and the naturals up to three. #
+def first x y := x; def second x y := y;
+def zero := \\x.x;
+def succ n := \\s.(s second n);
+def iszero n := (n first);
+let one := (succ zero) in def two := (succ one);
+def three := (succ two);
+"""
+
+
+class TestLoadImage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "prelude")
+
+        with open(self.filename, "w") as f:
+            f.write(SOURCE)
+
+    def tearDown(self):
+        g.clear_gamma()
+        load.forget()
+        self.directory.cleanup()
+
+    def reload(self) -> mock.MagicMock:
+        """Load the prelude afresh, returning a spy on the source loader."""
+
+        g.clear_gamma()
+
+        with mock.patch.object(load, "_load", wraps=load._load) as spy:
+            self.assertIsNone(load.load([self.filename], image=True))
+
+        return spy
+
+    def test_restored(self):
+        """A second load restores the image rather than the source."""
+
+        self.reload().assert_called_once()
+        self.assertTrue(os.path.exists(load.image_path([self.filename])))
+
+        expected = g.snapshot()
+
+        self.reload().assert_not_called()
+        self.assertEqual(expected, g.snapshot())
+        self.assertEqual(evl.eval_raw_term("(iszero three)"),
+                         evl.eval_raw_term("second"))
+
+    def test_reload_restored(self):
+        """A restored file is reloaded chunk by chunk, as a loaded one is."""
+
+        self.reload()
+        self.reload().assert_not_called()
+
+        with open(self.filename, "a") as f:
+            f.write("def four := (succ three);\n")
+
+        self.assertEqual(1, load.reload(self.filename))
+        self.assertIsNotNone(g.gamma("four"))
+
+    def test_records_restored(self):
+        """Restoring the image restores the chunks' records, unparsed."""
+
+        self.reload()
+        expected = load._loaded[os.path.abspath(self.filename)]
+        load.forget()
+
+        with mock.patch.object(load, "_parse", wraps=load._parse) as spy:
+            self.reload().assert_not_called()
+
+        spy.assert_not_called()
+        self.assertEqual(expected, load._loaded[os.path.abspath(self.filename)])
+
+    def test_changed(self):
+        """Changing the source makes the image stale."""
+
+        self.reload()
+
+        with open(self.filename, "a") as f:
+            f.write("def four := (succ three);\n")
+
+        self.reload().assert_called_once()
+        self.assertIsNotNone(g.gamma("four"))
+        self.reload().assert_not_called()
+
+    def test_interpreter_changed(self):
+        """Changing the interpreter makes the image stale too."""
+
+        self.reload()
+
+        with mock.patch.object(load, "_interpreter", b"other"):
+            self.reload().assert_called_once()
+
+    def test_opt_in(self):
+        """No image is saved unless asked for."""
+
+        self.assertIsNone(load.load([self.filename]))
+        self.assertFalse(os.path.exists(load.image_path([self.filename])))
+
+    def test_corrupt(self):
+        """A broken image is passed over."""
+
+        self.reload()
+
+        with open(load.image_path([self.filename]), "r+b") as f:
+            f.truncate(20)
+
+        self.reload().assert_called_once()
+        self.assertIsNotNone(g.gamma("three"))
+
+    def test_damaged_term(self):
+        """An image whose terms are damaged is passed over too."""
+
+        self.reload()
+        path = load.image_path([self.filename])
+
+        with Image(path) as image:
+            offset = image._offsets[-1][0]
+
+        with open(path, "r+b") as f:
+            f.seek(offset)
+            f.write(bytes([Op.SHARED, 100]))
+
+        self.reload().assert_called_once()
+        self.assertEqual(evl.eval_raw_term("(iszero three)"),
+                         evl.eval_raw_term("second"))
+
+    def test_not_empty(self):
+        """Nothing is saved when loading on top of other definitions."""
+
+        evl.eval_raw_term("def other := \\x.x")
+        self.assertIsNone(load.load([self.filename], image=True))
+
+        self.assertFalse(os.path.exists(load.image_path([self.filename])))
+
+    def test_error(self):
+        with open(self.filename, "a") as f:
+            f.write("def broken := (;\n")
+
+        self.assertIsInstance(load.load([self.filename], image=True), LambdaError)
+        self.assertFalse(os.path.exists(load.image_path([self.filename])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+from tests.gamma.aux import F, N
+
+
+class TestLookup(unittest.TestCase):
+    """Symbols are found by label through gamma's index."""
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def test_many_symbols(self):
+        labels = [f"sym{i}" for i in range(5000)]
+
+        for i, label in enumerate(labels):
+            self.assertEqual(i, g.sym_declare(label))
+
+        # Declaring a symbol again finds the existing one.
+        self.assertEqual(1234, g.sym_declare("sym1234"))
+        self.assertEqual(len(labels), len(g._gamma))
+
+        for i, label in enumerate(labels):
+            self.assertEqual(i, g.gamma(label))
+
+        self.assertIsNone(g.gamma("missing"))
+
+    def test_sym_set_at(self):
+        evl.eval_raw_term("def identity := \\x.x")
+        idx = g.gamma("identity")
+
+        assert idx is not None
+
+        before = g.generation()
+        g.sym_set_at(idx, F(F(N(1))))
+
+        self.assertEqual(F(F(N(1))), g.sym_find("identity"))
+        self.assertNotEqual(before, g.generation())
+
+    def test_cleared(self):
+        g.sym_declare("a")
+        g.clear_gamma()
+
+        self.assertIsNone(g.gamma("a"))
+        self.assertEqual(0, g.sym_declare("b"))
+
+    def test_sym_get_out_of_range(self):
+        self.assertIsNone(g.sym_get(0))
@@ -0,0 +1,145 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.native as native
+import lbd.term as term
+from lbd.error import LambdaError
+from lbd.evaluate import Strategy
+from tests.gamma.aux import load_prelude
+
+
+class TestNative(unittest.TestCase):
+    def setUp(self):
+        load_prelude()
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def role(self, label):
+        idx = g.gamma(label)
+        assert idx is not None
+
+        return native.role(idx)
+
+    def assertSameAsNBE(self, program):
+        expected = evl.eval_raw_term(program, strategy=Strategy.NBE,
+                                     strong=True)
+        actual = evl.eval_raw_term(program, strategy=Strategy.NATIVE,
+                                   strong=True)
+
+        assert not isinstance(expected, LambdaError)
+
+        self.assertEqual(expected, actual, program)
+
+    def test_roles(self):
+        self.assertEqual(native.Role.ADD, self.role("add"))
+        self.assertEqual(native.Role.FIRST, self.role("true"))
+        self.assertEqual(native.Role.EQUAL, self.role("equal"))
+        self.assertIsNone(self.role("two"))
+        self.assertIsNone(self.role("summation"))
+
+    def test_redefinition(self):
+        """A global only keeps its role while its definition fits it."""
+
+        evl.eval_raw_term("def add x y := (sub x y)")
+
+        self.assertIsNone(self.role("add"))
+        self.assertIsNone(self.role("mult"))
+        self.assertEqual(native.Role.SUB, self.role("sub"))
+
+    def test_arithmetic(self):
+        programs = [
+            "(mult ten ten)",
+            "(sub three five)",
+            "(pred zero)",
+            "(summation four)",
+            "(div (mult ten ten) four)",
+            "(equal (mult three three) nine)",
+            "(less two one)",
+            "(greater_or_equal two two)",
+            "\\x.(add x one)",
+            "(apply succ two)",
+        ]
+
+        for program in programs:
+            self.assertSameAsNBE(program)
+
+    def test_encoding(self):
+        four = evl.eval_raw_term("(add two two)", strategy=Strategy.NATIVE)
+
+        self.assertEqual(native.encode(4), four)
+        self.assertEqual(native.encode(True),
+                         evl.eval_raw_term("(iszero zero)",
+                                           strategy=Strategy.NATIVE))
+
+    def test_after_cached_value(self):
+        """Values cached by other strategies don't hide native numerals."""
+
+        evl.eval_raw_term("three", strategy=Strategy.NORMAL)
+
+        sym = g.sym_get(g.gamma("three"))
+        assert sym is not None
+        self.assertIsNotNone(sym.value)
+
+        self.assertEqual(native.encode(4),
+                         evl.eval_raw_term("(add three one)",
+                                           strategy=Strategy.NATIVE))
+
+    def test_numerals_kept(self):
+        """Numerals beyond those kept are built, but not kept."""
+
+        value = native._NUMERALS_LIMIT + 2
+        numeral = native.encode(value)
+
+        self.assertEqual(native._NUMERALS_LIMIT + 1, len(native._numerals))
+
+        # Peel off the successors down to the greatest numeral kept.
+        for _ in range(2):
+            assert isinstance(numeral, term.Abstraction)
+            assert isinstance(numeral.body, term.Application)
+            numeral = numeral.body.right
+
+        self.assertIs(native.encode(native._NUMERALS_LIMIT), numeral)
+
+    def test_not_native(self):
+        """Arguments that aren't native values are handled by definition."""
+
+        programs = [
+            "(succ \\x.x)",
+            "(add one \\s.(s second zero))",
+            "(iszero \\x.x)",
+            "(not identity)",
+        ]
+
+        for program in programs:
+            self.assertSameAsNBE(program)
+
+    def test_unneeded(self):
+        """Arguments an operation doesn't need are never evaluated."""
+
+        omega = "(\\x.(x x) \\x.(x x))"
+        programs = [
+            f"(mult {omega} zero)",
+            f"(mult {omega} (sub two two))",
+            f"(iszero (mult {omega} zero))",
+        ]
+
+        for program in programs:
+            self.assertSameAsNBE(program)
+
+    def test_applied(self):
+        """Native values applied to arguments act as their encodings."""
+
+        programs = [
+            "(two second)",
+            "((iszero one) one two)",
+            "(pred1 (add two two))",
+        ]
+
+        for program in programs:
+            self.assertSameAsNBE(program)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.nbe as nbe
+from lbd.error import LambdaError
+from lbd.evaluate import Strategy
+from tests.gamma.aux import load_prelude
+
+
+class TestNormalizationByEvaluation(unittest.TestCase):
+    def setUp(self):
+        load_prelude()
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def nbe(self, program):
+        return evl.eval_raw_term(program, strategy=Strategy.NBE, strong=True)
+
+    def test_agrees_with_normal_order(self):
+        """NBE gives the normal form of what normal order returns."""
+
+        programs = [
+            "(pred (pred three))",
+            "(add two three)",
+            "(mult three two)",
+            "(if (iszero zero) one)",
+            "\\x.(x (add one one))",
+        ]
+
+        for program in programs:
+            expected = evl.eval_raw_term(program)
+
+            assert not isinstance(expected, LambdaError)
+
+            self.assertEqual(self.nbe(program),
+                             nbe.nbe_reduce(expected, strong=True), program)
+
+    def test_weak(self):
+        """Without STRONG, NBE stops where normal order does."""
+
+        programs = [
+            "add",
+            "(add two)",
+            "(mult three two)",
+            "\\x.(x (add one one))",
+            "(undefined (pred one) add)",
+        ]
+
+        for program in programs:
+            self.assertEqual(evl.eval_raw_term(program),
+                             evl.eval_raw_term(program, strategy=Strategy.NBE),
+                             program)
+
+    def test_numerals(self):
+        """Equal numbers have the same normal form."""
+
+        self.assertEqual(self.nbe("(mult three two)"),
+                         self.nbe("(add three three)"))
+
+    def test_assignment(self):
+        ast = self.nbe("def four := (add two two)")
+        self.assertNotIsInstance(ast, LambdaError)
+
+        self.assertEqual(self.nbe("(succ three)"), self.nbe("four"))
+
+    def test_undefined(self):
+        """Undefined globals read back as nil, as with normal order."""
+
+        for program in ["undefined", "(succ undefined)"]:
+            expected = evl.eval_raw_term(program)
+
+            assert not isinstance(expected, LambdaError)
+
+            self.assertEqual(self.nbe(program),
+                             nbe.nbe_reduce(expected, strong=True), program)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.parallel as parallel
+import lbd.parse as parse
+import lbd.tokenize as tkz
+from lbd.error import LambdaError
+from lbd.stats import Stats
+from tests.gamma.aux import A, F, N, load_prelude
+
+
+def _parse(program: str):
+    tokens = tkz.tokenize(program)
+    assert not isinstance(tokens, LambdaError)
+
+    parsed = parse.parse_term(tokens, 0, [])
+    assert not isinstance(parsed, LambdaError)
+
+    return parsed[0]
+
+
+class TestParallel(unittest.TestCase):
+    programs = [
+        "(mult three two)",
+        "\\x.(x (mult three two) (add three three))",
+        "\\x.\\y.(y (x (pred three)) (add x one))",
+        "(undefined (pred one) (succ two))",
+    ]
+
+    def setUp(self):
+        load_prelude()
+
+    def tearDown(self):
+        parallel.close_pool()
+        g.clear_gamma()
+
+    def test_processes(self):
+        """Worker processes give the same results as 'beta_reduce'."""
+
+        for program in self.programs:
+            expected = evl.eval_raw_term(program, strong=True)
+            actual = parallel.parallel_reduce(_parse(program), 2, 1)
+
+            self.assertEqual(expected, actual, program)
+
+    def test_pool_reused(self):
+        """The pool is kept until gamma changes."""
+
+        ast = _parse(self.programs[1])
+
+        parallel.parallel_reduce(ast, 2, 1)
+        pool = parallel._pool
+
+        parallel.parallel_reduce(ast, 2, 1)
+        self.assertIs(pool, parallel._pool)
+
+        evl.eval_raw_term("def four := (succ three)")
+        parallel.parallel_reduce(ast, 2, 1)
+        self.assertIsNot(pool, parallel._pool)
+
+    def test_metered(self):
+        """Workers can't be given along with limits or stats."""
+
+        with self.assertRaises(ValueError):
+            evl.eval_raw_term(self.programs[1], strong=True, workers=2,
+                              stats=Stats())
+
+    def test_small(self):
+        """Below the threshold, no workers are started."""
+
+        with mock.patch.object(parallel._Pool, "_start") as start:
+            ast = evl.eval_raw_term("\\x.(x (add one one))", strong=True,
+                                    workers=2)
+
+        start.assert_not_called()
+        self.assertEqual(evl.eval_raw_term("(succ (succ zero))",
+                                           strong=True), ast.body.right)
+
+    def test_errors(self):
+        """Errors in a worker are raised by the caller."""
+
+        ast = A(N(0), A(F(N(0)), N(len(g._gamma) + 1)))
+
+        with self.assertRaises(ValueError):
+            parallel.parallel_reduce(F(ast), 2, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.term as term
+import load
+from lbd.error import Err, LambdaError
+from tests.gamma.aux import PRELUDE
+
+# Refers to globals of its own before defining them, and to one that's
+# never defined at all.
+EXTRA = """\
+def twice f x := (f (f x));
+def four := (twice twice_succ zero);
+def twice_succ := (twice succ);
+def nothing := undefined;
+letrec down n := (if (iszero n) n (down (pred n))) in def bottom := (down four);
+"""
+
+
+def labelled(ast: term.AST, depth: int = 0) -> str:
+    """Write out AST with its globals given by label, not index."""
+
+    match ast:
+        case term.Name(index=index) if index >= depth:
+            sym = g.sym_get(index - depth)
+            assert sym is not None
+
+            return sym.label
+
+        case term.Name(index=index):
+            return str(index)
+
+        case term.Abstraction(body=body):
+            return f"(\\ {labelled(body, depth + 1)})"
+
+        case term.Application(left=left, right=right):
+            return f"({labelled(left, depth)} {labelled(right, depth)})"
+
+        case term.Assignment(name=name, value=value):
+            return f"(:= {labelled(name, depth)} {labelled(value, depth)})"
+
+    return "nil"
+
+
+def definitions() -> dict[str, str]:
+    return {label: labelled(ast) for label, ast, _ in g.snapshot()}
+
+
+class TestParallelLoad(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.extra = os.path.join(self.directory.name, "extra")
+        self.write(EXTRA)
+
+    def tearDown(self):
+        g.clear_gamma()
+        load.forget()
+        self.directory.cleanup()
+
+    def write(self, source: str):
+        with open(self.extra, "w") as f:
+            f.write(source)
+
+    def test_same_as_serial(self):
+        """Both loaders leave the same definitions behind."""
+
+        filenames = [PRELUDE, self.extra]
+
+        self.assertIsNone(load.load(filenames, image=False))
+        serial = definitions()
+        records = dict(load._loaded)
+
+        g.clear_gamma()
+        load.forget()
+
+        self.assertIsNone(load.load(filenames, image=False, workers=2))
+        self.assertEqual(serial, definitions())
+        self.assertEqual(records, load._loaded)
+
+        self.assertEqual(evl.eval_raw_term("zero"),
+                         evl.eval_raw_term("bottom"))
+
+    def test_declared_first(self):
+        """What the files define is declared before anything else."""
+
+        self.assertIsNone(load.load([self.extra], image=False, workers=2))
+
+        labels = [label for label, _, _ in g.snapshot()]
+
+        self.assertEqual(["twice", "four", "twice_succ", "nothing",
+                          "bottom"], labels[:5])
+
+    def test_error(self):
+        """Loading stops at the first error, reported as it is serially."""
+
+        self.write(EXTRA.replace("def nothing := undefined",
+                                 "def nothing := (undefined"))
+
+        error = load.load([PRELUDE, self.extra], image=False, workers=2)
+
+        self.assertIsInstance(error, LambdaError)
+        assert isinstance(error, LambdaError)
+
+        self.assertEqual(Err.INCOMPLETE, error.kind)
+        self.assertIn("chunk 3 (line 4, column 1)", str(error))
+
+        # The chunks before the error were still evaluated.
+        self.assertEqual(evl.eval_raw_term("twice_succ"),
+                         evl.eval_raw_term("(twice succ)"))
+        self.assertNotIn(os.path.abspath(self.extra), load._loaded)
+
+    def test_workers(self):
+        """There has to be at least one worker."""
+
+        for workers in [0, -1]:
+            with self.assertRaises(ValueError):
+                load.load([self.extra], workers=workers)
+
+    def test_remap(self):
+        ast = term.Abstraction(term.Application(term.Name(0),
+                                                term.Name(3)))
+
+        self.assertIs(ast, load._remap(ast, 2, [2]))
+        self.assertEqual(term.Abstraction(term.Application(term.Name(0),
+                                                           term.Name(6))),
+                         load._remap(ast, 2, [5]))
+
+
+if __name__ == "__main__":
+    unittest.main()
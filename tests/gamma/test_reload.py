@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.term as term
+import load
+from lbd.error import LambdaError
+
+SOURCE = """\
+def first x y := x; def second x y := y;
+def zero := \\x.x;
+def succ n := \\s.(s second n);
+def iszero n := (n first);
+let one := (succ zero) in def two := (succ one);
+def three := (succ two);
+def answer := (iszero three);
+"""
+
+
+class TestReload(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "prelude")
+        self.write(SOURCE)
+
+        self.assertIsNone(load.load([self.filename], image=False))
+
+    def tearDown(self):
+        g.clear_gamma()
+        load.forget()
+        self.directory.cleanup()
+
+    def write(self, source: str):
+        with open(self.filename, "w") as f:
+            f.write(source)
+
+    def test_unchanged(self):
+        self.assertEqual(0, load.reload(self.filename))
+
+    def test_changed(self):
+        """A changed definition is evaluated again, with its users."""
+
+        self.write(SOURCE.replace("def zero := \\x.x", "def zero := first"))
+
+        # 'zero' itself, the 'let' using it, and 'three' and 'answer',
+        # which use what the 'let' defines.
+        self.assertEqual(4, load.reload(self.filename))
+        self.assertEqual(evl.eval_raw_term("first"),
+                         evl.eval_raw_term("zero"))
+
+    def test_values(self):
+        """Values cached from the old definitions are dropped."""
+
+        self.assertEqual(evl.eval_raw_term("second"),
+                         evl.eval_raw_term("answer"))
+
+        self.write(SOURCE.replace("def three := (succ two)",
+                                  "def three := zero"))
+
+        self.assertEqual(2, load.reload(self.filename))
+        self.assertEqual(evl.eval_raw_term("first"),
+                         evl.eval_raw_term("answer"))
+
+    def test_added_and_removed(self):
+        self.write(SOURCE.replace("def answer := (iszero three);",
+                                  "def four := (succ three);"))
+
+        self.assertEqual(1, load.reload(self.filename))
+        self.assertIsNotNone(g.sym_find("four"))
+        self.assertIs(term.Empty(), g.sym_find("answer"))
+
+    def test_error(self):
+        self.write(SOURCE + "def broken := (;\n")
+
+        error = load.reload(self.filename)
+
+        self.assertIsInstance(error, LambdaError)
+        self.assertEqual(8, error.pos)
+
+    def test_not_loaded(self):
+        """A file not loaded before is loaded in full."""
+
+        load.forget()
+
+        self.assertEqual(8, load.reload(self.filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import lbd.beta as beta
+import lbd.evaluate as evl
+import lbd.gamma as g
+from lbd.error import LambdaError
+from lbd.evaluate import Strategy
+from lbd.limits import Limits
+from lbd.stats import Stats
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        # Contractions done before are looked up rather than redone,
+        # which would hide their substitutions.
+        beta.clear_contractions()
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def test_contractions(self):
+        stats = Stats()
+        evl.eval_raw_term("(\\x.(x x) \\y.y)", stats=stats)
+
+        self.assertEqual(2, stats.steps)
+        self.assertEqual(2, stats.contractions)
+        self.assertEqual(3, stats.substitutions)
+        self.assertEqual(0, stats.lookups)
+        self.assertEqual(1, stats.max_spine)
+        self.assertGreater(stats.elapsed, 0)
+
+    def test_shifts(self):
+        stats = Stats()
+
+        # The argument is substituted under one binder, where its free
+        # name needs shifting.
+        evl.eval_raw_term("\\z.(\\x.\\y.(y x) z)", stats=stats)
+        self.assertEqual(0, stats.shifts)
+
+        evl.eval_raw_term("(\\x.\\y.(y x) \\z.\\w.(w z) \\v.v)", stats=stats)
+        self.assertEqual(1, stats.shifts)
+
+    def test_lookups(self):
+        evl.eval_raw_term("def identity x := x")
+
+        for strategy in Strategy:
+            # Reducing 'twice' caches its value, which would spare a
+            # second reduction the lookups, so define it afresh.
+            evl.eval_raw_term("def twice := (identity identity)")
+
+            stats = Stats()
+            evl.eval_raw_term("(twice identity)", strategy=strategy,
+                              stats=stats)
+
+            # 'twice', 'identity' inside it, and 'identity' once more
+            # after each of the two contractions.
+            self.assertEqual(4, stats.lookups, strategy)
+            self.assertEqual(6, stats.steps, strategy)
+            self.assertEqual(2, stats.contractions, strategy)
+
+    def test_spine(self):
+        stats = Stats()
+        evl.eval_raw_term("(\\x.x \\x.x \\x.x \\x.x)", stats=stats)
+
+        self.assertEqual(3, stats.max_spine)
+        self.assertEqual(3, stats.contractions)
+
+    def test_limits_share_stats(self):
+        stats = Stats()
+        error = evl.eval_raw_term("(\\x.(x x) \\x.(x x))",
+                                  limits=Limits(steps=10), stats=stats)
+
+        assert isinstance(error, LambdaError)
+        self.assertIs(stats, error.stats)
+        self.assertEqual(11, stats.contractions)
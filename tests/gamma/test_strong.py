@@ -0,0 +1,67 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+import lbd.term as term
+from lbd.evaluate import Strategy
+from tests.gamma.aux import load_prelude
+
+
+class TestStrong(unittest.TestCase):
+    def setUp(self):
+        load_prelude()
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def test_same_as_nbe(self):
+        programs = [
+            "(pred (pred three))",
+            "(add two three)",
+            "(mult three two)",
+            "\\x.(x (add one one))",
+            "\\x.(add x one)",
+            "(undefined (pred one))",
+        ]
+
+        for program in programs:
+            expected = evl.eval_raw_term(program, strategy=Strategy.NBE,
+                                         strong=True)
+            actual = evl.eval_raw_term(program, strong=True)
+
+            self.assertEqual(expected, actual, program)
+
+    def test_equal_numbers(self):
+        """Equal numbers compare equal once normalized."""
+
+        self.assertNotEqual(evl.eval_raw_term("\\x.(add one x)"),
+                            evl.eval_raw_term("\\x.(add x one)"))
+
+        self.assertEqual(evl.eval_raw_term("(mult three two)", strong=True),
+                         evl.eval_raw_term("(add three three)", strong=True))
+
+    def test_assignment(self):
+        """An assignment's value is normalized, but stored as given."""
+
+        ast = evl.eval_raw_term("def four := (add two two)", strong=True)
+
+        self.assertEqual(evl.eval_raw_term("(succ three)", strong=True), ast)
+
+        sym = g.sym_get(g.gamma("four"))
+        assert sym is not None
+
+        self.assertIsInstance(sym.ast, term.Application)
+
+    def test_values_cached(self):
+        """Globals reached at the top still have their values cached."""
+
+        evl.eval_raw_term("(iszero two)", strong=True)
+
+        sym = g.sym_get(g.gamma("two"))
+        assert sym is not None
+
+        self.assertEqual(evl.eval_raw_term("two"), sym.value)
+
+
+if __name__ == "__main__":
+    unittest.main()
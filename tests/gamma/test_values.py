@@ -0,0 +1,77 @@
+import unittest
+
+import lbd.evaluate as evl
+import lbd.gamma as g
+from lbd.error import LambdaError
+from lbd.evaluate import Strategy
+
+
+class TestCachedValues(unittest.TestCase):
+    """Globals keep their definitions apart from their cached values."""
+
+    def setUp(self):
+        prelude = [
+            "def zero := \\x.x",
+            "def first x y := x",
+            "def second x y := y",
+            "def false := second",
+            "def succ n := \\s.(s false n)",
+            "def one := (succ zero)",
+            "def two := (succ one)",
+            "def other := (first zero)",
+        ]
+
+        for line in prelude:
+            ast = evl.eval_raw_term(line)
+            assert not isinstance(ast, LambdaError)
+
+    def tearDown(self):
+        g.clear_gamma()
+
+    def symbol(self, label: str) -> g.Symbol:
+        idx = g.gamma(label)
+        assert idx is not None
+
+        sym = g.sym_get(idx)
+        assert sym is not None
+
+        return sym
+
+    def test_definition_kept(self):
+        source = self.symbol("two").ast
+        value = evl.eval_raw_term("two")
+
+        self.assertIs(source, self.symbol("two").ast)
+        self.assertEqual(value, self.symbol("two").value)
+
+    def test_uses(self):
+        uses = {g.gamma("succ"), g.gamma("one")}
+
+        self.assertEqual(uses, self.symbol("two").uses)
+
+    def test_redefinition(self):
+        # NBE never writes the values cached in gamma.
+        for strategy in (Strategy.NORMAL, Strategy.NEED):
+            evl.eval_raw_term("(two other)", strategy=strategy)
+            self.assertIsNotNone(self.symbol("one").value)
+
+            # Redefining 'succ' affects 'one' directly, and 'two' both
+            # directly and through 'one', but leaves 'other' alone.
+            evl.eval_raw_term("def succ n := \\s.(s first n)")
+
+            self.assertIsNone(self.symbol("one").value)
+            self.assertIsNone(self.symbol("two").value)
+            self.assertIsNotNone(self.symbol("other").value)
+
+            expected = evl.eval_raw_term("\\s.(s first one)")
+            self.assertEqual(expected,
+                             evl.eval_raw_term("two", strategy=strategy))
+
+            evl.eval_raw_term("def succ n := \\s.(s false n)")
+
+    def test_transitive(self):
+        evl.eval_raw_term("two")
+        evl.eval_raw_term("def zero := \\y.\\x.x")
+
+        # 'two' doesn't mention 'zero', but relies on it through 'one'.
+        self.assertIsNone(self.symbol("two").value)